@@ -1,66 +1,102 @@
 # Apps untuk telaah Arus Kas Bulanan
 import streamlit as st
-import pandas as pd
-import numpy as np
-import requests
-import json
-
-# --- Fungsi Helper untuk Format Angka ---
-def format_currency(value):
-    """Format angka menjadi string dengan pemisah ribuan (titik)"""
-    if value is None or value == "":
-        return ""
-    try:
-        # Konversi ke int jika masih string
-        num = int(float(value))
-        return f"{num:,}".replace(",", ".")
-    except (ValueError, TypeError):
-        return ""
-
-def parse_currency(input_str):
-    """Parse string angka dengan titik sebagai pemisah ribuan menjadi integer"""
-    if not input_str:
-        return 0
-    # Hapus semua titik
-    cleaned = input_str.replace(".", "").strip()
-    try:
-        return int(cleaned)
-    except ValueError:
-        return 0
-
-def format_indo_currency(amount):
-    """Format angka menjadi string dengan Rp dan pemisah ribuan (titik)"""
-    return f"Rp {amount:,.0f}".replace(",", ".")
-
-# Konfigurasi API Groq - Mengambil dari secrets
-GROQ_API_KEY = st.secrets["GROQ_API_KEY"]  # API Key Groq dari secrets
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"  # Fixed trailing space
-# Menggunakan model yang tersedia di Groq
-MODEL_NAME = "openai/gpt-oss-120b"
-# Fungsi untuk mendapatkan respons dari model Groq
-def get_groq_response(prompt, max_tokens=4096):
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    data = {
-        "model": MODEL_NAME,
-        "messages": [{"role": "user", "content": prompt}],
-        "max_tokens": max_tokens,
-        "temperature": 0.7,
-        "top_p": 0.9
-    }
+import os
+# Hanya modul ringan yang diimpor saat start; NumPy (engine/profil) dan requests (groq_client)
+# dimuat saat pertama kali dibutuhkan, yaitu ketika tombol Analisa ditekan
+from arkasbul import chat, metrik, sesi
+from arkasbul.kategori import KATEGORI, RENTANG_MIN, RENTANG_MAX
+from arkasbul.teks import (
+    format_currency, parse_currency, format_indo_currency, susun_ringkasan_markdown, susun_saran_markdown,
+    susun_prompt_analisis, susun_prompt_chat, generate_simple_analysis
+)
 
+# Konfigurasi API Groq: endpoint (GROQ_API_URL) di arkasbul.groq_client; model dan max_tokens dipilih
+# per jenis permintaan oleh arkasbul.rute (analisa: model besar, chat: model cepat)
+# Analisis precomputed per kelas profil (dibuat dengan: python -m arkasbul.precompute)
+# "fallback": dipakai menggantikan analisis sederhana saat API gagal; "serve": langsung ditampilkan tanpa memanggil API
+PRECOMPUTED_MODE = os.environ.get("ARKASBUL_PRECOMPUTED_MODE", "fallback")
+# Interval (detik) bagian hasil memeriksa tugas LLM yang sedang berjalan di pool pekerja
+INTERVAL_TUGAS = float(os.environ.get("ARKASBUL_TASK_POLL", "0.5"))
+
+# API key dibaca dari secrets (atau env GROQ_API_KEY) saat panggilan API pertama,
+# sehingga halaman tetap tampil walau secret belum dikonfigurasi
+def get_groq_api_key():
+    from arkasbul import groq_client
     try:
-        response = requests.post(GROQ_API_URL, headers=headers, json=data)
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"]
-        else:
-            return f"Error: {response.status_code}, {response.text}"
+        api_key = st.secrets["GROQ_API_KEY"]
+    except (KeyError, FileNotFoundError):
+        api_key = os.environ.get("GROQ_API_KEY")
+    if not api_key:
+        raise groq_client.GroqError("Error: GROQ_API_KEY belum dikonfigurasi")
+    return api_key
+
+@st.cache_resource
+def muat_analisis_profil():
+    from arkasbul.profil import muat_berkas
+    return muat_berkas()
+
+# Fungsi untuk mendapatkan respons dari model Groq secara streaming: yield potongan teks begitu diterima dari API
+# Cache, single-flight, hedging dan penjadwal RPM/TPM ditangani arkasbul.llm (jalur yang sama dengan API HTTP)
+# jenis: "analisa" atau "chat" (default) menentukan model, max_tokens dan hedging (arkasbul.rute)
+# history: pesan multi-turn sebelumnya (format OpenAI) yang dikirim sebelum prompt
+# api_key: diisi pemanggil di luar script thread (tugas latar); None = dibaca dari secrets saat dipanggil
+# batal: event pembatalan tugas latar; menghentikan penantian antrian dan slot API
+def stream_groq_response(prompt, max_tokens=None, history=None, prioritas=None, jenis="chat", api_key=None, batal=None):
+    from arkasbul import llm
+    yield from llm.stream_jawaban(prompt, jenis=jenis, api_key=api_key or get_groq_api_key(),
+                                  max_tokens=max_tokens, history=history, prioritas=prioritas, batal=batal)
+
+# Versi blocking: teks lengkap, atau pesan error sebagai teks (untuk pemanggil tanpa streaming)
+def get_groq_response(prompt, max_tokens=None, prioritas=None, jenis="chat"):
+    from arkasbul import groq_client
+    try:
+        return "".join(stream_groq_response(prompt, max_tokens=max_tokens, prioritas=prioritas, jenis=jenis))
+    except groq_client.GroqError as e:
+        return str(e)
     except Exception as e:
         return f"Error connecting to Groq API: {str(e)}"
 
+# Kirim panggilan LLM streaming ke pool pekerja bersama; script thread langsung kembali tanpa menunggu API
+# data: konteks yang dibutuhkan saat tugas selesai (disimpan di objek Tugas)
+def kirim_tugas(jenis, prompt, data=None, **kwargs):
+    from arkasbul import groq_client, tugas
+    # Secrets dibaca di script thread; thread pekerja tidak memiliki konteks script Streamlit.
+    # Tanpa API key tugas langsung gagal sehingga halaman menampilkan error-nya dan memakai cadangan
+    try:
+        kwargs["api_key"] = get_groq_api_key()
+    except groq_client.GroqError as e:
+        return tugas.tugas_gagal(jenis, e, data)
+    return tugas.get_pool().kirim(jenis, lambda batal: stream_groq_response(prompt, jenis=jenis, batal=batal, **kwargs), data)
+
+# Batalkan tugas yang masih berjalan di session state (digantikan permintaan baru atau dibatalkan pengguna)
+def batalkan_tugas(kunci):
+    tugas = st.session_state.get(kunci)
+    if tugas is not None:
+        tugas.batalkan()
+        st.session_state[kunci] = None
+
+# Teks hasil tugas yang selesai, atau (None, pesan error) jika gagal; fallback dicatat di metrik
+def hasil_tugas(tugas, jalur, **label):
+    from arkasbul import groq_client
+    teks = tugas.teks
+    if tugas.galat is None and teks.strip():
+        return teks, None
+    galat = tugas.galat or groq_client.GroqError("Error: respons kosong dari API")
+    if isinstance(galat, groq_client.GroqError):
+        pesan, sebab = str(galat), "api"
+    else:
+        pesan, sebab = f"Error saat mengakses API: {str(galat)}", "exception"
+    metrik.tambah("fallback_total", jalur=jalur, sebab=sebab, **label)
+    return None, pesan
+
+# Tampilkan teks yang sudah diterima dari tugas yang masih berjalan
+def tampilkan_progres(tugas, pesan_tunggu):
+    teks = tugas.teks
+    if teks:
+        st.markdown(teks + "▌")
+    else:
+        st.caption(f"⏳ {pesan_tunggu}")
+
 # Inisialisasi session state untuk menyimpan data
 if 'has_analyzed' not in st.session_state:
     st.session_state.has_analyzed = False
@@ -74,66 +110,371 @@ if 'gaji' not in st.session_state:
     st.session_state.gaji = 5000000
 if 'insentif' not in st.session_state:
     st.session_state.insentif = 0
-if 'persentase_dari_gaji' not in st.session_state:
-    st.session_state.persentase_dari_gaji = []
+if 'hasil_analisis' not in st.session_state:
+    st.session_state.hasil_analisis = None
+if 'saran_alokasi' not in st.session_state:
+    st.session_state.saran_alokasi = None
+if 'saldo_keranjang' not in st.session_state:
+    st.session_state.saldo_keranjang = 0
+if 'simulasi_keranjang' not in st.session_state:
+    st.session_state.simulasi_keranjang = None
 if 'previous_question' not in st.session_state:
     st.session_state.previous_question = ""
+# Kategori yang dipertahankan pada saran alokasi (nilai widget multiselect; default: cicilan)
+if 'kategori_tetap' not in st.session_state:
+    st.session_state.kategori_tetap = [KATEGORI[1]]
+# Tugas LLM yang sedang berjalan (arkasbul.tugas) dan pesan error terakhir yang belum ditampilkan
+if 'tugas_analisa' not in st.session_state:
+    st.session_state.tugas_analisa = None
+if 'tugas_chat' not in st.session_state:
+    st.session_state.tugas_chat = None
+if 'pesan_analisis' not in st.session_state:
+    st.session_state.pesan_analisis = None
+if 'pesan_chat' not in st.session_state:
+    st.session_state.pesan_chat = None
+# Ringkasan bergulir giliran lama, jumlah giliran yang sudah diringkas/dibuang, dan halaman tampilan chat
+if 'ringkasan_chat' not in st.session_state:
+    st.session_state.ringkasan_chat = ""
+if 'chat_terangkum' not in st.session_state:
+    st.session_state.chat_terangkum = 0
+if 'chat_dibuang' not in st.session_state:
+    st.session_state.chat_dibuang = 0
+if 'halaman_chat' not in st.session_state:
+    st.session_state.halaman_chat = 1
+
+# Sesi persisten: pulihkan input, analisis dan chat sebelumnya berdasarkan token di URL (?sesi=...)
+def pulihkan_sesi():
+    toko = sesi.get_toko()
+    if toko is None:
+        return None
+    token = st.query_params.get("sesi")
+    if sesi.token_valid(token):
+        data = toko.muat(token)
+        if data is not None:
+            sesi.terapkan(st.session_state, data)
+            st.session_state.sesi_tersimpan = data
+            metrik.tambah("sesi_dipulihkan_total")
+    else:
+        token = sesi.buat_token()
+        st.query_params["sesi"] = token
+    return token
+
+# Titipkan potret sesi ke penyimpanan (ditulis di thread latar) jika berubah sejak penyimpanan terakhir
+def simpan_sesi():
+    token = st.session_state.token_sesi
+    # Analisis yang masih berjalan baru disimpan setelah selesai
+    if token is None or not st.session_state.has_analyzed or st.session_state.tugas_analisa is not None:
+        return
+    data = sesi.potret(st.session_state)
+    if data != st.session_state.get("sesi_tersimpan"):
+        sesi.get_toko().simpan(token, data)
+        st.session_state.sesi_tersimpan = data
+
+if 'token_sesi' not in st.session_state:
+    st.session_state.token_sesi = pulihkan_sesi()
+
+# Jawaban cadangan jika API chat tidak tersedia
+def jawaban_chat_sederhana(user_question):
+    return f"Untuk pertanyaan '{user_question}': Untuk mengelola keuangan dengan lebih baik, pertimbangkan untuk membuat anggaran bulanan yang detail dan melacak semua pengeluaran Anda. Prioritaskan pembayaran hutang dan tabungan darurat sebelum meningkatkan pengeluaran gaya hidup."
+
+# Susun prompt chat dari data keuangan di session state
+def buat_prompt_chat(user_question):
+    return susun_prompt_chat(st.session_state.gaji, st.session_state.insentif, st.session_state.hasil_analisis, user_question)
 
 # Callback untuk memproses pertanyaan chat
+# Pertanyaan langsung dikirim sebagai tugas latar; jawaban dipantau di bagian Konsultasi
 def process_chat_question():
     if st.session_state.chat_input and st.session_state.chat_input != st.session_state.previous_question:
+        from arkasbul import rute
         user_question = st.session_state.chat_input
         st.session_state.previous_question = user_question
 
-        chat_prompt = f"""
-        Berdasarkan data keuangan berikut:
+        # Pertanyaan baru menggantikan pertanyaan yang jawabannya masih berjalan
+        batalkan_tugas("tugas_chat")
+        # Giliran sebelumnya dikirim sebagai konteks: ringkasan bergulir + giliran terbaru dalam anggaran token
+        history = chat.pesan_konteks(st.session_state.chat_history, st.session_state.ringkasan_chat, st.session_state.chat_terangkum)
+        # Batas jawaban menyesuaikan panjang pertanyaan
+        st.session_state.tugas_chat = kirim_tugas(
+            "chat", buat_prompt_chat(user_question), {"pertanyaan": user_question},
+            max_tokens=rute.batas_token(rute.RUTE["chat"], user_question), history=history
+        )
 
-        Gaji bulanan: Rp {st.session_state.gaji:,.0f}
-        Insentif/lembur: Rp {st.session_state.insentif:,.0f}
+        # Reset input field
+        st.session_state.chat_input = ""
 
-        Alokasi dana pengguna:
-        """
+# Callback tombol untuk membatalkan jawaban chat yang sedang berjalan
+def batalkan_chat():
+    batalkan_tugas("tugas_chat")
+    # Pertanyaan yang sama boleh dikirim ulang
+    st.session_state.previous_question = ""
 
-        for i, kategori_item in enumerate(kategori):
-            if i < len(st.session_state.persentase_dari_gaji) and i < len(st.session_state.user_inputs_rp):
-                chat_prompt += f"- {kategori_item}: {st.session_state.persentase_dari_gaji[i]:.2f}% (Rp {int(st.session_state.user_inputs_rp[i]):,.0f})\n"
+# Pindahkan jawaban tugas chat yang selesai ke riwayat chat (cadangan sederhana jika API gagal)
+def selesaikan_chat():
+    tugas = st.session_state.tugas_chat
+    st.session_state.tugas_chat = None
+    user_question = tugas.data["pertanyaan"]
+    response, pesan = hasil_tugas(tugas, "chat")
+    if pesan is not None:
+        # Fallback ke respons sederhana
+        st.session_state.pesan_chat = pesan
+        response = jawaban_chat_sederhana(user_question)
+
+    # Tambahkan ke riwayat chat, lalu padatkan agar konteks dan transkrip tetap terbatas
+    riwayat, ringkasan, terangkum, dibuang = chat.padatkan_riwayat(
+        st.session_state.chat_history + [(user_question, response)],
+        st.session_state.ringkasan_chat,
+        st.session_state.chat_terangkum
+    )
+    st.session_state.chat_history = riwayat
+    st.session_state.ringkasan_chat = ringkasan
+    st.session_state.chat_terangkum = terangkum
+    st.session_state.chat_dibuang += dibuang
+
+# Jawaban yang sedang berjalan dipantau berkala; hanya bagian ini yang di-render ulang sampai tugas selesai,
+# lalu seluruh halaman di-render sekali agar jawaban masuk riwayat dan pemantauan berhenti
+@st.fragment(run_every=INTERVAL_TUGAS)
+def pantau_chat():
+    tugas = st.session_state.tugas_chat
+    if tugas is None or tugas.selesai:
+        st.rerun()
+    st.markdown(f"**Pertanyaan {st.session_state.chat_dibuang + len(st.session_state.chat_history) + 1}:**")
+    st.markdown(f"{tugas.data['pertanyaan']}")
+    st.markdown(f"**Jawaban:**")
+    tampilkan_progres(tugas, "Memproses pertanyaan Anda...")
+    st.button("Batalkan", key="batal_chat", on_click=batalkan_chat)
+    st.markdown("---")
+
+# Callback tombol untuk memuat satu halaman riwayat chat yang lebih lama
+def tambah_halaman_chat():
+    st.session_state.halaman_chat += 1
 
-        chat_prompt += f"""
-        Pertanyaan pengguna: {user_question}
+# Definisi kategori pengeluaran (global untuk digunakan dalam callback)
+kategori = KATEGORI
 
-        Berikan jawaban yang informatif dan bermanfaat dalam Bahasa Indonesia:
-        """
+# Tampilkan ringkasan alokasi, metrik total dan peringatan defisit dari AnalysisResult
+def tampilkan_ringkasan(hasil):
+    gaji = hasil.gaji
+    st.write(f"Insentif/lembur sebesar Rp {hasil.insentif:,.0f} adalah {hasil.persen_insentif:.2f}% dari gaji bulanan.")
 
-        try:
-            with st.spinner("Memproses pertanyaan Anda..."):
-                response = get_groq_response(chat_prompt)
-                if response.startswith("Error"):
-                    st.error(response)
-                    # Fallback ke respons sederhana
-                    response = f"Untuk pertanyaan '{user_question}': Untuk mengelola keuangan dengan lebih baik, pertimbangkan untuk membuat anggaran bulanan yang detail dan melacak semua pengeluaran Anda. Prioritaskan pembayaran hutang dan tabungan darurat sebelum meningkatkan pengeluaran gaya hidup."
-        except Exception as e:
-            st.error(f"Error saat mengakses API: {str(e)}")
-            # Fallback ke respons sederhana
-            response = f"Untuk pertanyaan '{user_question}': Untuk mengelola keuangan dengan lebih baik, pertimbangkan untuk membuat anggaran bulanan yang detail dan melacak semua pengeluaran Anda. Prioritaskan pembayaran hutang dan tabungan darurat sebelum meningkatkan pengeluaran gaya hidup."
+    # Tampilkan ringkasan alokasi
+    st.subheader("Ringkasan Alokasi Dana")
+    # Tabel 7 baris di-render sebagai Markdown sehingga tidak perlu memuat pandas
+    st.markdown(susun_ringkasan_markdown(hasil.pengeluaran, hasil.persentase))
 
-        # Tambahkan ke riwayat chat
-        st.session_state.chat_history.append((user_question, response))
+    # Total pengeluaran dan persentase
+    total_pengeluaran = hasil.total_pengeluaran
+    total_persen = hasil.total_persen
 
-        # Reset input field
-        st.session_state.chat_input = ""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Gaji", format_indo_currency(int(gaji)))
+    with col2:
+        # Modifikasi 1: Ubah warna panah berdasarkan apakah pengeluaran melebihi gaji
+        delta_pengeluaran = hasil.delta_pengeluaran
+        delta_color = "inverse" if delta_pengeluaran > 0 else "normal"
+        st.metric(
+            "Total Pengeluaran",
+            format_indo_currency(int(total_pengeluaran)),
+            format_indo_currency(int(delta_pengeluaran)),
+            delta_color=delta_color
+        )
+    with col3:
+        # Modifikasi 1: Ubah warna panah berdasarkan apakah persentase melebihi 100%
+        delta_persen = hasil.delta_persen
+        delta_color = "inverse" if delta_persen > 0 else "normal"
+        st.metric(
+            "Total Persentase",
+            f"{total_persen:.2f}%",
+            f"{delta_persen:.2f}%",
+            delta_color=delta_color
+        )
 
-# Definisi kategori pengeluaran (global untuk digunakan dalam callback)
-kategori = [
-    "Investasi atau tabungan untuk masa depan",
-    "Cicilan, pinjaman, Asuransi, arisan, dll",
-    "Pengeluaran Rumah Tangga",
-    "Penguatan Dana \"Keranjang Aman\"",
-    "Zakat dan biaya sosial",
-    "Biaya pendidikan anak",
-    "Hidup Gaya"
-]
+    # Peringatan jika total pengeluaran melebihi gaji
+    if hasil.defisit:
+        st.warning(f"Total pengeluaran ({format_indo_currency(int(total_pengeluaran))}) melebihi gaji bulanan ({format_indo_currency(int(gaji))}). Pertimbangkan untuk mengurangi beberapa pengeluaran.")
+
+# Tampilkan saran alokasi terdekat yang masuk rentang rujukan (SaranAlokasi dari arkasbul.optimasi)
+def tampilkan_saran(hasil, saran):
+    if saran is None:
+        return
+    st.subheader("Saran Alokasi")
+    if not any(saran.selisih):
+        st.success("Alokasi Anda sudah berada dalam rentang rujukan dan tidak melebihi gaji.")
+        return
+    st.markdown(susun_saran_markdown(hasil.pengeluaran, saran))
+    if saran.layak:
+        st.caption(f"Perubahan sekecil mungkin agar semua item masuk rentang rujukan; sisa gaji {format_indo_currency(saran.sisa)}.")
+    else:
+        st.warning("Pengeluaran yang dipertahankan terlalu besar sehingga tidak semua item dapat masuk rentang rujukan.")
+
+# Tampilkan peluang dana Keranjang Aman habis (SimulasiKeranjang dari arkasbul.simulasi)
+def tampilkan_simulasi(simulasi):
+    if simulasi is None:
+        return
+    st.subheader("Ketahanan Dana Keranjang Aman")
+    kolom = st.columns(len(simulasi.horizon))
+    for kol, bulan, peluang, median in zip(kolom, simulasi.horizon, simulasi.peluang_habis, simulasi.saldo_median):
+        with kol:
+            st.metric(f"Peluang habis dalam {bulan} bulan", f"{peluang * 100:.1f}%", f"median saldo {format_indo_currency(median)}", delta_color="off")
+    st.caption(
+        f"Simulasi {format_currency(simulasi.jalur)} skenario dari saldo {format_indo_currency(simulasi.saldo_awal)}: "
+        "kehilangan gaji sementara, insentif bervariasi, fluktuasi pengeluaran per kategori, dan biaya tak terduga."
+    )
+
+# Callback tombol untuk membatalkan analisis yang sedang berjalan: analisis cadangan langsung ditampilkan
+def batalkan_analisis():
+    tugas = st.session_state.tugas_analisa
+    batalkan_tugas("tugas_analisa")
+    if tugas is not None:
+        st.session_state.analysis_result = tugas.data["cadangan"]
+        st.session_state.pesan_analisis = None
+
+# Simpan hasil tugas analisis yang selesai (fallback ke analisis precomputed atau sederhana jika gagal)
+def selesaikan_analisis():
+    tugas = st.session_state.tugas_analisa
+    st.session_state.tugas_analisa = None
+    analisis, pesan = hasil_tugas(tugas, "analisa", sumber=tugas.data["sumber"])
+    st.session_state.analysis_result = tugas.data["cadangan"] if analisis is None else analisis
+    st.session_state.pesan_analisis = pesan
+
+# Analisis yang sedang berjalan dipantau berkala tanpa me-render ulang seluruh halaman
+@st.fragment(run_every=INTERVAL_TUGAS)
+def pantau_analisis():
+    tugas = st.session_state.tugas_analisa
+    if tugas is None or tugas.selesai:
+        st.rerun()
+    tampilkan_progres(tugas, "Menganalisis data keuangan...")
+    st.button("Batalkan", key="batal_analisa", on_click=batalkan_analisis)
+
+# Tampilkan hasil analisis, atau pantau tugasnya jika masih berjalan
+def tampilkan_analisis():
+    if st.session_state.tugas_analisa is not None and st.session_state.tugas_analisa.selesai:
+        selesaikan_analisis()
+    if st.session_state.tugas_analisa is not None:
+        pantau_analisis()
+        return
+    if st.session_state.pesan_analisis:
+        st.error(st.session_state.pesan_analisis)
+        st.session_state.pesan_analisis = None
+    st.write(st.session_state.analysis_result)
+
+# Bagian konsultasi dijalankan sebagai fragment: mengirim pertanyaan hanya me-render ulang bagian ini
+@st.fragment
+def tampilkan_konsultasi():
+    stopwatch = metrik.stopwatch("rerun_seconds", jenis="fragment_konsultasi")
+    st.subheader("Konsultasi Keuangan")
+
+    # Jawaban yang sudah selesai di pool pekerja dipindahkan ke riwayat sebelum di-render
+    if st.session_state.tugas_chat is not None and st.session_state.tugas_chat.selesai:
+        selesaikan_chat()
+
+    # Hanya halaman terbaru yang di-render; halaman lama dimuat saat diminta
+    riwayat = st.session_state.chat_history
+    mulai = chat.awal_halaman(len(riwayat), st.session_state.halaman_chat)
+    if mulai > 0:
+        st.button(
+            f"Tampilkan {min(chat.CHAT_PER_HALAMAN, mulai)} pertanyaan sebelumnya",
+            key="chat_halaman_sebelumnya",
+            on_click=tambah_halaman_chat
+        )
+    nomor_awal = st.session_state.chat_dibuang + mulai
+
+    # Modifikasi 2: Tampilkan riwayat chat secara langsung tanpa expander
+    for i, (q, a) in enumerate(riwayat[mulai:], start=nomor_awal):
+        st.markdown(f"**Pertanyaan {i+1}:**")
+        st.markdown(f"{q}")
+        st.markdown(f"**Jawaban:**")
+        st.markdown(f"{a}")
+        st.markdown("---")  # Garis pemisah antar pertanyaan
+
+    # Error API pada jawaban terakhir (jawaban cadangan sudah masuk riwayat)
+    if st.session_state.pesan_chat:
+        st.error(st.session_state.pesan_chat)
+        st.session_state.pesan_chat = None
+
+    # Jawaban pertanyaan baru tampil bertahap tepat di bawah riwayat
+    if st.session_state.tugas_chat is not None:
+        pantau_chat()
+
+    # Input pertanyaan baru dengan callback
+    st.text_input(
+        "Tanyakan tentang keuangan Anda (tekan Enter untuk mengirim):",
+        key="chat_input",
+        on_change=process_chat_question
+    )
+
+    # Tambahkan disclaimer di bawah kolom chat
+    st.info("""
+    **Disclaimer:**
+    - Sistem ini menggunakan AI-LLM dan dapat menghasilkan jawaban yang tidak selalu akurat.
+    - Mohon verifikasi informasi penting dengan sumber terpercaya, seperti perencana keuangan, dan profesional lainnya.
+    """)
+    # Satu-satunya titik penyimpanan sesi: berjalan di setiap render penuh yang memiliki analisis (sesi
+    # tanpa analisis tidak disimpan) maupun saat fragment ini di-render ulang sendiri
+    simpan_sesi()
+    stopwatch.selesai()
+
+# Berkas transaksi hanya dibaca sekali per unggahan (file_id); hasilnya berupa total per bulan yang kecil
+@st.cache_data(max_entries=16, show_spinner="Membaca berkas transaksi...")
+def muat_riwayat_berkas(file_id, nama, _berkas, gaji_default):
+    from arkasbul.riwayat import muat_riwayat
+    _berkas.seek(0)
+    return muat_riwayat(_berkas, nama, gaji_default)
+
+# Riwayat multi-bulan sebagai fragment: unggah berkas dan ubah jendela tanpa me-render ulang seluruh halaman
+@st.fragment
+def tampilkan_riwayat():
+    stopwatch = metrik.stopwatch("rerun_seconds", jenis="fragment_riwayat")
+    st.subheader("Riwayat Arus Kas Multi-Bulan")
+    berkas = st.file_uploader(
+        "Unggah catatan transaksi (CSV atau Excel) dengan kolom tanggal, kategori/keterangan, dan jumlah",
+        type=["csv", "txt", "xlsx", "xlsm"],
+        key="berkas_riwayat"
+    )
+    if berkas is None:
+        stopwatch.selesai()
+        return
+
+    try:
+        riwayat = muat_riwayat_berkas(berkas.file_id, berkas.name, berkas, st.session_state.gaji)
+    except (ValueError, ImportError) as e:
+        st.error(str(e))
+        stopwatch.selesai()
+        return
+
+    import numpy as np
+    import pandas as pd
+    from arkasbul.riwayat import rata_rata_bergulir, ringkasan_tren
+    from arkasbul.rupiah import format_indo_currency_vektor
+
+    statistik = riwayat.statistik
+    st.caption(
+        f"{format_currency(statistik['baris'])} baris dibaca, {format_currency(statistik['terpetakan'])} terpetakan, "
+        f"{format_currency(statistik['tidak_terpetakan'])} tidak dikenali, {format_currency(statistik['tidak_valid'])} tidak valid "
+        f"— {len(riwayat.bulan)} bulan"
+    )
+
+    jendela = st.slider("Jendela rata-rata bergulir (bulan)", 1, 12, 3, key="jendela_riwayat")
+    hasil = riwayat.hasil
+    st.line_chart(pd.DataFrame(rata_rata_bergulir(hasil.persentase, jendela), index=riwayat.bulan, columns=kategori))
+    st.dataframe(ringkasan_tren(riwayat, jendela), hide_index=True)
+
+    with st.expander("Rincian per bulan"):
+        st.dataframe(pd.DataFrame({
+            "Bulan": riwayat.bulan,
+            "Gaji": format_indo_currency_vektor(np.trunc(riwayat.gaji)),
+            "Insentif": format_indo_currency_vektor(np.trunc(riwayat.insentif)),
+            "Total Pengeluaran": format_indo_currency_vektor(np.trunc(hasil.total_pengeluaran)),
+            "Total Persentase (%)": hasil.total_persen.round(2),
+            "Defisit": hasil.defisit,
+        }), hide_index=True)
+    stopwatch.selesai()
 
 def main():
+    # Durasi tiap fase rerun (no-op jika ARKASBUL_METRICS tidak di-set)
+    metrik.mulai_server()
+    stopwatch = metrik.stopwatch("rerun_seconds", jenis="halaman")
+
     st.set_page_config(
         page_title="Aplikasi Manajemen Keuangan",
         page_icon="💰",
@@ -153,357 +494,198 @@ def main():
         alokasi dana berdasarkan persentase yang disarankan.
         """)
 
-    # Input gaji dan insentif (dengan format ribuan)
-    col1, col2 = st.columns(2)
-    with col1:
-        default_gaji_display = format_currency(st.session_state.gaji)
-        gaji_input = st.text_input(
-            "Besar Gaji per Bulan (Rp)",
-            value=default_gaji_display,
-            key="gaji_input",
-            help="Masukkan angka tanpa titik atau gunakan format 1.000.000"
-        )
-        gaji = parse_currency(gaji_input)
-        st.session_state.gaji = gaji
-    with col2:
-        default_insentif_display = format_currency(st.session_state.insentif)
-        insentif_input = st.text_input(
-            "Insentif/Lembur Rata-rata (Rp)",
-            value=default_insentif_display,
-            key="insentif_input",
-            help="Masukkan angka tanpa titik atau gunakan format 1.000.000"
-        )
-        insentif = parse_currency(insentif_input)
-        st.session_state.insentif = insentif
-
-    # Definisi contoh untuk setiap kategori
-    contoh = [
-        "Dana yang rutin disisihkan setiap bulan untuk beli LM, nabung, saham, dll. Bila tidak menentu masukan rata-rata setahun berapa dan bagilah dengan 12",
-        "Cicilan motor, KPR, premi asuransi, arisan, kartu kredit dlsb. yang biasa di keluarkan per bulan saat ini",
-        "Listrik, air, iuran RT/lingkungan, operasional rumah tangga, ART, Makan, transport sekeluarga, dlsb. setiap bulannya",
-        "Uang jaga-jaga, tabungan yang disediakan secara khusus untuk menghadapi situasi darurat atau yang tidak biasanya. Bedakan dengan tabungan yang umumnya memang untuk \"dihabiskan\" misal tabungan motor/mobil, haji, liburan dlsb",
-        "Zakat/perpuluhan, sumbangan, dll",
-        "Uang sekolah/kuliah/SKS, les/bimba, kursus dll",
-        "Nongkrong di kafe, beli barang mewah, hobby dlsb"
-    ]
-
-    rentang = [
-        "10-20%",
-        "15-25%",
-        "30-40%",
-        "5-10%",
-        "5-10%",
-        "10-20%",
-        "5-10%"
-    ]
-
-    # Buat rentang minimum dan maksimum
-    rentang_min = [10, 15, 30, 5, 5, 10, 5]
-    rentang_max = [20, 25, 40, 10, 10, 20, 10]
-
-    # Buat container untuk tabel input
-    st.subheader("Alokasi Dana per Kategori")
-
-    # Buat kolom untuk header tabel dengan urutan yang diubah
-    cols = st.columns([1, 3, 5, 3])
-    cols[0].markdown("**No**")
-    cols[1].markdown("**Item**")
-    cols[2].markdown("**Contoh**")
-    cols[3].markdown("**Besar Pengeluaran per Bulan (Rp)**")
-
-    # Inisialisasi user_inputs_rp jika belum ada
-    if len(st.session_state.user_inputs_rp) != len(kategori):
-        # Hitung nilai default berdasarkan rentang
-        st.session_state.user_inputs_rp = []
-        for min_val, max_val in zip(rentang_min, rentang_max):
-            default_value = int(gaji * ((min_val + max_val) / 2) / 100)
-            st.session_state.user_inputs_rp.append(default_value)
-
-    # Buat baris untuk setiap kategori
-    user_inputs_rp = []
-    for i, (kat, cont) in enumerate(zip(kategori, contoh)):
+    # Seluruh input dikumpulkan dalam satu form: mengetik tidak memicu rerun,
+    # semua nilai dikirim sekaligus saat tombol Analisa ditekan
+    with st.form("form_alokasi", border=False):
+        # Input gaji dan insentif (dengan format ribuan)
+        col1, col2 = st.columns(2)
+        with col1:
+            default_gaji_display = format_currency(st.session_state.gaji)
+            gaji_input = st.text_input(
+                "Besar Gaji per Bulan (Rp)",
+                value=default_gaji_display,
+                key="gaji_input",
+                help="Masukkan angka tanpa titik atau gunakan format 1.000.000"
+            )
+            gaji = parse_currency(gaji_input)
+            st.session_state.gaji = gaji
+        with col2:
+            default_insentif_display = format_currency(st.session_state.insentif)
+            insentif_input = st.text_input(
+                "Insentif/Lembur Rata-rata (Rp)",
+                value=default_insentif_display,
+                key="insentif_input",
+                help="Masukkan angka tanpa titik atau gunakan format 1.000.000"
+            )
+            insentif = parse_currency(insentif_input)
+            st.session_state.insentif = insentif
+
+        # Definisi contoh untuk setiap kategori
+        contoh = [
+            "Dana yang rutin disisihkan setiap bulan untuk beli LM, nabung, saham, dll. Bila tidak menentu masukan rata-rata setahun berapa dan bagilah dengan 12",
+            "Cicilan motor, KPR, premi asuransi, arisan, kartu kredit dlsb. yang biasa di keluarkan per bulan saat ini",
+            "Listrik, air, iuran RT/lingkungan, operasional rumah tangga, ART, Makan, transport sekeluarga, dlsb. setiap bulannya",
+            "Uang jaga-jaga, tabungan yang disediakan secara khusus untuk menghadapi situasi darurat atau yang tidak biasanya. Bedakan dengan tabungan yang umumnya memang untuk \"dihabiskan\" misal tabungan motor/mobil, haji, liburan dlsb",
+            "Zakat/perpuluhan, sumbangan, dll",
+            "Uang sekolah/kuliah/SKS, les/bimba, kursus dll",
+            "Nongkrong di kafe, beli barang mewah, hobby dlsb"
+        ]
+
+        # Buat rentang minimum dan maksimum
+        rentang_min = RENTANG_MIN
+        rentang_max = RENTANG_MAX
+
+        # Buat container untuk tabel input
+        st.subheader("Alokasi Dana per Kategori")
+
+        # Buat kolom untuk header tabel dengan urutan yang diubah
         cols = st.columns([1, 3, 5, 3])
-        cols[0].write(f"{i+1}")
-        cols[1].write(kat)
-        cols[2].write(cont)
-
-        # Ambil nilai default dari session state atau hitung
-        default_value = st.session_state.user_inputs_rp[i] if i < len(st.session_state.user_inputs_rp) else int(gaji * ((rentang_min[i] + rentang_max[i]) / 2) / 100)
-        default_display = format_currency(default_value)
-
-        # Gunakan text_input untuk input manual dengan format ribuan
-        input_key = f"input_rp_{i}"
-        input_str = cols[3].text_input(
-            f"Pengeluaran untuk {kat} (Rp)",
-            value=default_display,
-            key=input_key,
-            label_visibility="collapsed",
-            help="Masukkan angka tanpa titik atau gunakan format 1.000.000"
-        )
+        cols[0].markdown("**No**")
+        cols[1].markdown("**Item**")
+        cols[2].markdown("**Contoh**")
+        cols[3].markdown("**Besar Pengeluaran per Bulan (Rp)**")
+
+        # Inisialisasi user_inputs_rp jika belum ada
+        if len(st.session_state.user_inputs_rp) != len(kategori):
+            # Hitung nilai default berdasarkan rentang
+            st.session_state.user_inputs_rp = []
+            for min_val, max_val in zip(rentang_min, rentang_max):
+                default_value = int(gaji * ((min_val + max_val) / 2) / 100)
+                st.session_state.user_inputs_rp.append(default_value)
+
+        # Buat baris untuk setiap kategori
+        user_inputs_rp = []
+        for i, (kat, cont) in enumerate(zip(kategori, contoh)):
+            cols = st.columns([1, 3, 5, 3])
+            cols[0].write(f"{i+1}")
+            cols[1].write(kat)
+            cols[2].write(cont)
+
+            # Ambil nilai default dari session state atau hitung
+            default_value = st.session_state.user_inputs_rp[i] if i < len(st.session_state.user_inputs_rp) else int(gaji * ((rentang_min[i] + rentang_max[i]) / 2) / 100)
+            default_display = format_currency(default_value)
+
+            # Gunakan text_input untuk input manual dengan format ribuan
+            input_key = f"input_rp_{i}"
+            input_str = cols[3].text_input(
+                f"Pengeluaran untuk {kat} (Rp)",
+                value=default_display,
+                key=input_key,
+                label_visibility="collapsed",
+                help="Masukkan angka tanpa titik atau gunakan format 1.000.000"
+            )
 
-        # Parse input menjadi integer
-        parsed_value = parse_currency(input_str)
-        user_inputs_rp.append(parsed_value)
+            # Parse input menjadi integer
+            parsed_value = parse_currency(input_str)
+            user_inputs_rp.append(parsed_value)
 
-    # Tombol analisa
-    if st.button("Analisa", type="primary"):
-        # Simpan input pengguna ke session state
-        st.session_state.user_inputs_rp = user_inputs_rp
-
-        # Hitung persentase insentif terhadap gaji
-        if gaji > 0:
-            persen_insentif = (insentif / gaji) * 100
-        else:
-            persen_insentif = 0
+        # Kategori yang tidak diubah saat menyusun saran alokasi (nilai awal di session state, ikut disimpan di sesi)
+        kategori_tetap = st.multiselect(
+            "Pengeluaran yang tidak dapat diubah (dipertahankan pada saran alokasi)",
+            kategori,
+            key="kategori_tetap"
+        )
 
-        st.write(f"Insentif/lembur sebesar Rp {insentif:,.0f} adalah {persen_insentif:.2f}% dari gaji bulanan.")
+        # Saldo dana darurat untuk simulasi ketahanan Keranjang Aman
+        saldo_input = st.text_input(
+            "Saldo Dana \"Keranjang Aman\" Saat Ini (Rp)",
+            value=format_currency(st.session_state.saldo_keranjang),
+            key="saldo_keranjang_input",
+            help="Masukkan angka tanpa titik atau gunakan format 1.000.000"
+        )
+        saldo_keranjang = parse_currency(saldo_input)
+        st.session_state.saldo_keranjang = saldo_keranjang
 
-        # Hitung persentase dari gaji untuk setiap input
-        persentase_dari_gaji = []
-        for pengeluaran in user_inputs_rp:
-            if gaji > 0:
-                persentase = (pengeluaran / gaji) * 100
-            else:
-                persentase = 0
-            persentase_dari_gaji.append(persentase)
+        # Tombol analisa
+        analisa = st.form_submit_button("Analisa", type="primary")
 
-        # Simpan persentase ke session state
-        st.session_state.persentase_dari_gaji = persentase_dari_gaji
+    stopwatch.tandai("input")
 
-        # Tampilkan ringkasan alokasi
-        st.subheader("Ringkasan Alokasi Dana")
+    if analisa:
+        # Modul berat dimuat pada klik Analisa pertama (sekali per proses)
+        from arkasbul.engine import AnalysisResult
+        from arkasbul.optimasi import saran_alokasi
+        from arkasbul.profil import kelas_profil
+        from arkasbul.simulasi import simulasi_keranjang
 
-        # Buat dataframe untuk ringkasan
-        ringkasan_df = pd.DataFrame({
-            "No": range(1, len(kategori) + 1),
-            "Item": kategori,
-            "Besar Pengeluaran (Rp)": [format_indo_currency(int(val)) for val in user_inputs_rp],
-            "Rujukan (%)": rentang,
-            "Hasil Simulasi (%)": [f"{val:.2f}%" for val in persentase_dari_gaji]
-        })
+        # Simpan input pengguna ke session state
+        st.session_state.user_inputs_rp = user_inputs_rp
 
-        st.dataframe(ringkasan_df, use_container_width=True, hide_index=True)
+        # Hitung hasil alokasi; jika sudah ada hasil sebelumnya hanya kategori yang berubah yang dihitung ulang
+        hasil_lama = st.session_state.hasil_analisis
+        if hasil_lama is not None:
+            hasil = hasil_lama.perbarui(gaji, insentif, user_inputs_rp)
+        else:
+            hasil = AnalysisResult.hitung(gaji, insentif, user_inputs_rp)
+        st.session_state.hasil_analisis = hasil
 
-        # Hitung total pengeluaran dan persentase
-        total_pengeluaran = sum(user_inputs_rp)
-        total_persen = sum(persentase_dari_gaji)
+        persen_insentif = hasil.persen_insentif
+        total_pengeluaran = hasil.total_pengeluaran
 
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Gaji", format_indo_currency(int(gaji)))
-        with col2:
-            # Modifikasi 1: Ubah warna panah berdasarkan apakah pengeluaran melebihi gaji
-            delta_pengeluaran = total_pengeluaran - gaji
-            delta_color = "inverse" if delta_pengeluaran > 0 else "normal"
-            st.metric(
-                "Total Pengeluaran",
-                format_indo_currency(int(total_pengeluaran)),
-                format_indo_currency(int(delta_pengeluaran)),
-                delta_color=delta_color
-            )
-        with col3:
-            # Modifikasi 1: Ubah warna panah berdasarkan apakah persentase melebihi 100%
-            delta_persen = total_persen - 100
-            delta_color = "inverse" if delta_persen > 0 else "normal"
-            st.metric(
-                "Total Persentase",
-                f"{total_persen:.2f}%",
-                f"{delta_persen:.2f}%",
-                delta_color=delta_color
-            )
+        # Saran alokasi dihitung lokal; targetnya ikut dikirim ke LLM sehingga model tidak perlu berhitung
+        saran = saran_alokasi(hasil, tetap=[kategori.index(k) for k in kategori_tetap])
+        st.session_state.saran_alokasi = saran
+        # Peluang dana darurat habis (Monte Carlo, di-cache per input)
+        simulasi = simulasi_keranjang(gaji, insentif, hasil.pengeluaran, saldo_keranjang)
+        st.session_state.simulasi_keranjang = simulasi
 
-        # Peringatan jika total pengeluaran melebihi gaji
-        if total_pengeluaran > gaji:
-            st.warning(f"Total pengeluaran ({format_indo_currency(int(total_pengeluaran))}) melebihi gaji bulanan ({format_indo_currency(int(gaji))}). Pertimbangkan untuk mengurangi beberapa pengeluaran.")
+        tampilkan_ringkasan(hasil)
+        tampilkan_saran(hasil, saran)
+        tampilkan_simulasi(simulasi)
 
         # Analisis dan saran
         st.subheader("Analisis Keuangan")
 
         # Identifikasi item yang melebihi rentang
-        items_melebihi = []
-        items_dibawah = []
-        for i, (min_val, max_val, persen, kat) in enumerate(zip(rentang_min, rentang_max, persentase_dari_gaji, kategori)):
-            if persen > max_val:
-                items_melebihi.append((kat, persen, max_val))
-            elif persen < min_val:
-                items_dibawah.append((kat, persen, min_val))
+        items_melebihi, items_dibawah = hasil.di_luar_rentang()
 
         # Buat prompt untuk model LLM
-        prompt = f"""
-        Analisis keuangan berdasarkan data berikut:
-
-        Gaji bulanan: Rp {gaji:,.0f}
-        Insentif/lembur: Rp {insentif:,.0f} ({persen_insentif:.2f}% dari gaji)
-        Total pendapatan: Rp {(gaji + insentif):,.0f}
-
-        Alokasi dana berdasarkan input pengguna:
-        """
-
-        for i, kategori_item in enumerate(kategori):
-            prompt += f"- {kategori_item}: Rp {int(user_inputs_rp[i]):,.0f} ({persentase_dari_gaji[i]:.2f}% dari gaji, rujukan: {rentang[i]})\n"
-
-        if items_melebihi:
-            prompt += "\nItem yang melebihi rentang rujukan:\n"
-            for item, persen, max_val in items_melebihi:
-                prompt += f"- {item}: {persen:.2f}% (melebihi batas atas {max_val}%)\n"
-
-        if items_dibawah:
-            prompt += "\nItem yang di bawah rentang rujukan:\n"
-            for item, persen, min_val in items_dibawah:
-                prompt += f"- {item}: {persen:.2f}% (di bawah batas bawah {min_val}%)\n"
-
-        if total_pengeluaran > gaji:
-            prompt += f"\nTotal pengeluaran (Rp {int(total_pengeluaran):,}) melebihi gaji bulanan (Rp {int(gaji):,}).\n"
-
-        prompt += """
-        Berikan analisis singkat tentang alokasi keuangan ini dan saran untuk perbaikan.
-        Fokus pada item yang melebihi atau di bawah rentang rujukan jika ada.
-        Berikan juga saran pemanfaatan insentif/lembur yang optimal.
-        Berikan jawaban dalam Bahasa Indonesia.
-        """
-
-        # Gunakan API Groq untuk mendapatkan analisis
-        with st.spinner("Menganalisis data keuangan..."):
-            try:
-                analisis = get_groq_response(prompt)
-                if analisis.startswith("Error"):
-                    st.error(analisis)
-                    # Fallback ke analisis sederhana
-                    analisis = generate_simple_analysis(gaji, insentif, persen_insentif, items_melebihi, items_dibawah, total_pengeluaran)
-            except Exception as e:
-                st.error(f"Error saat mengakses API: {str(e)}")
-                # Fallback ke analisis sederhana
-                analisis = generate_simple_analysis(gaji, insentif, persen_insentif, items_melebihi, items_dibawah, total_pengeluaran)
-
-        # Simpan hasil analisis ke session state
-        st.session_state.analysis_result = analisis
-        st.session_state.has_analyzed = True
+        prompt = susun_prompt_analisis(hasil, saran=saran, simulasi=simulasi)
 
-        # Tampilkan analisis
-        st.write(analisis)
+        # Cari analisis precomputed untuk kelas profil pengguna
+        berkas_profil = muat_analisis_profil()
+        analisis_profil = berkas_profil.get(int(kelas_profil(hasil)[0])) if berkas_profil is not None else None
 
-    # Jika sudah pernah dianalisis, tampilkan hasil sebelumnya
-    elif st.session_state.has_analyzed:
-        # Hitung persentase insentif terhadap gaji
-        if gaji > 0:
-            persen_insentif = (insentif / gaji) * 100
+        # Analisa baru menggantikan (membatalkan) analisa sebelumnya yang masih berjalan
+        batalkan_tugas("tugas_analisa")
+        if analisis_profil is not None and PRECOMPUTED_MODE == "serve":
+            metrik.tambah("precomputed_served_total")
+            st.session_state.analysis_result = analisis_profil
         else:
-            persen_insentif = 0
-
-        st.write(f"Insentif/lembur sebesar Rp {insentif:,.0f} adalah {persen_insentif:.2f}% dari gaji bulanan.")
-
-        # Tampilkan ringkasan alokasi
-        st.subheader("Ringkasan Alokasi Dana")
-
-        # Buat dataframe untuk ringkasan
-        ringkasan_df = pd.DataFrame({
-            "No": range(1, len(kategori) + 1),
-            "Item": kategori,
-            "Besar Pengeluaran (Rp)": [format_indo_currency(int(val)) for val in st.session_state.user_inputs_rp],
-            "Rujukan (%)": rentang,
-            "Hasil Simulasi (%)": [f"{val:.2f}%" for val in st.session_state.persentase_dari_gaji]
-        })
-
-        st.dataframe(ringkasan_df, use_container_width=True, hide_index=True)
-
-        # Hitung total pengeluaran dan persentase
-        total_pengeluaran = sum(st.session_state.user_inputs_rp)
-        total_persen = sum(st.session_state.persentase_dari_gaji)
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Gaji", format_indo_currency(int(gaji)))
-        with col2:
-            # Modifikasi 1: Ubah warna panah berdasarkan apakah pengeluaran melebihi gaji
-            delta_pengeluaran = total_pengeluaran - gaji
-            delta_color = "inverse" if delta_pengeluaran > 0 else "normal"
-            st.metric(
-                "Total Pengeluaran",
-                format_indo_currency(int(total_pengeluaran)),
-                format_indo_currency(int(delta_pengeluaran)),
-                delta_color=delta_color
-            )
-        with col3:
-            # Modifikasi 1: Ubah warna panah berdasarkan apakah persentase melebihi 100%
-            delta_persen = total_persen - 100
-            delta_color = "inverse" if delta_persen > 0 else "normal"
-            st.metric(
-                "Total Persentase",
-                f"{total_persen:.2f}%",
-                f"{delta_persen:.2f}%",
-                delta_color=delta_color
-            )
+            # Gunakan API Groq di pool pekerja; token tampil bertahap lewat pemantauan bagian hasil.
+            # Cadangan: analisis precomputed, atau analisis sederhana jika tidak tersedia
+            st.session_state.tugas_analisa = kirim_tugas("analisa", prompt, {
+                "cadangan": analisis_profil or generate_simple_analysis(gaji, insentif, persen_insentif, items_melebihi, items_dibawah, total_pengeluaran, saran, simulasi),
+                "sumber": "precomputed" if analisis_profil else "sederhana",
+            })
+            st.session_state.analysis_result = ""
+        st.session_state.pesan_analisis = None
+        st.session_state.has_analyzed = True
+        tampilkan_analisis()
+        stopwatch.tandai("analisa")
 
-        # Peringatan jika total pengeluaran melebihi gaji
-        if total_pengeluaran > gaji:
-            st.warning(f"Total pengeluaran ({format_indo_currency(int(total_pengeluaran))}) melebihi gaji bulanan ({format_indo_currency(int(gaji))}). Pertimbangkan untuk mengurangi beberapa pengeluaran.")
+    # Jika sudah pernah dianalisis, tampilkan hasil sebelumnya
+    elif st.session_state.has_analyzed:
+        # Rerun biasa: render langsung dari hasil yang tersimpan, tanpa menghitung ulang
+        tampilkan_ringkasan(st.session_state.hasil_analisis)
+        tampilkan_saran(st.session_state.hasil_analisis, st.session_state.saran_alokasi)
+        tampilkan_simulasi(st.session_state.simulasi_keranjang)
 
         # Analisis dan saran
         st.subheader("Analisis Keuangan")
-        st.write(st.session_state.analysis_result)
+        tampilkan_analisis()
+        stopwatch.tandai("ringkasan")
 
     # Tampilkan kolom chat jika sudah dianalisis
     if st.session_state.has_analyzed:
-        st.subheader("Konsultasi Keuangan")
-
-        # Modifikasi 2: Tampilkan riwayat chat secara langsung tanpa expander
-        for i, (q, a) in enumerate(st.session_state.chat_history):
-            st.markdown(f"**Pertanyaan {i+1}:**")
-            st.markdown(f"{q}")
-            st.markdown(f"**Jawaban:**")
-            st.markdown(f"{a}")
-            st.markdown("---")  # Garis pemisah antar pertanyaan
-
-        # Input pertanyaan baru dengan callback
-        st.text_input(
-            "Tanyakan tentang keuangan Anda (tekan Enter untuk mengirim):",
-            key="chat_input",
-            on_change=process_chat_question
-        )
-
-        # Tambahkan disclaimer di bawah kolom chat
-        st.info("""
-        **Disclaimer:**
-        - Sistem ini menggunakan AI-LLM dan dapat menghasilkan jawaban yang tidak selalu akurat.
-        - Mohon verifikasi informasi penting dengan sumber terpercaya, seperti perencana keuangan, dan profesional lainnya.
-        """)
+        tampilkan_konsultasi()
+        stopwatch.tandai("konsultasi")
 
-def generate_simple_analysis(gaji, insentif, persen_insentif, items_melebihi, items_dibawah, total_pengeluaran):
-    """Fungsi untuk menghasilkan analisis sederhana jika API tidak tersedia"""
-    analisis = f"""
-    Berdasarkan gaji bulanan Anda sebesar Rp {gaji:,.0f} dan insentif/lembur sebesar Rp {insentif:,.0f}, berikut adalah analisis keuangan Anda:
-
-    1. Total pendapatan: Rp {(gaji + insentif):,.0f}
-    2. Total pengeluaran: Rp {int(total_pengeluaran):,.0f}
-    """
-
-    if total_pengeluaran > gaji:
-        analisis += f"\nTotal pengeluaran Anda melebihi gaji bulanan sebesar Rp {int(total_pengeluaran - gaji):,.0f}. Sebaiknya kurangi beberapa pengeluaran atau gunakan insentif/lembur untuk menutupi kekurangan.\n"
-    else:
-        analisis += f"\nAnda memiliki sisa gaji sebesar Rp {int(gaji - total_pengeluaran):,.0f} yang dapat dialokasikan untuk tabungan tambahan atau kebutuhan lain.\n"
-
-    if items_melebihi:
-        analisis += "\nItem yang melebihi rentang rujukan:\n"
-        for item, persen, max_val in items_melebihi:
-            analisis += f"- {item}: {persen:.2f}% (melebihi batas atas {max_val}%)\n"
-        analisis += "\nSebaiknya Anda mengurangi alokasi untuk item-item tersebut dan menyesuaikannya dengan rentang yang direkomendasikan.\n"
-
-    if items_dibawah:
-        analisis += "\nItem yang di bawah rentang rujukan:\n"
-        for item, persen, min_val in items_dibawah:
-            analisis += f"- {item}: {persen:.2f}% (di bawah batas bawah {min_val}%)\n"
-        analisis += "\nSebaiknya Anda meningkatkan alokasi untuk item-item tersebut agar sesuai dengan rentang yang direkomendasikan.\n"
-
-    analisis += f"""
-    Rekomendasi:
-    - Jika Anda memiliki cicilan yang besar, pertimbangkan untuk mengurangi pengeluaran gaya hidup
-    - Pastikan dana "Keranjang Aman" mencukupi untuk 3-6 bulan pengeluaran
-    - Investasi jangka panjang sangat penting untuk masa depan finansial Anda
-
-    Dengan insentif/lembur sebesar {persen_insentif:.2f}% dari gaji, Anda dapat mengalokasikan tambahan ini untuk mempercepat pembayaran hutang atau meningkatkan investasi.
-    """
+    # Riwayat berkas tidak bergantung pada Analisa
+    tampilkan_riwayat()
+    stopwatch.tandai("riwayat")
 
-    return analisis
+    stopwatch.selesai()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,6 @@
+# Modul pendukung untuk Apps telaah Arus Kas Bulanan (HG_arkasbul.py)
+import os
+
+# Folder aplikasi (tempat HG_arkasbul.py); berkas data dan cache default diletakkan relatif terhadapnya,
+# bukan terhadap direktori kerja proses (streamlit/uvicorn dapat dijalankan dari folder mana pun)
+AKAR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,384 @@
+# API HTTP asinkron (JSON) untuk analisis alokasi dana, tanpa Streamlit
+#
+# Contoh:
+#   GROQ_API_KEY=... python -m arkasbul.api --port 8000
+#   curl -X POST http://127.0.0.1:8000/v1/analisis \
+#        -d '{"gaji": 10000000, "insentif": 500000, "pengeluaran": [1500000, 2000000, 3500000, 700000, 500000, 1000000, 500000]}'
+#
+# Perhitungan memakai mesin alokasi vektor yang sama dengan halaman; satu batch dihitung dengan
+# satu panggilan hitung_alokasi. Panggilan LLM (groq_client berbasis requests) dijalankan di thread
+# pool berkapasitas terbatas sehingga event loop tidak pernah terblokir, dan tetap melewati
+# penjadwal RPM/TPM, single-flight serta cache respons yang sama dengan halaman.
+import argparse
+import asyncio
+import logging
+import math
+import os
+import sys
+import time
+
+import anyio
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from arkasbul import groq_client, llm, metrik, penjadwal
+from arkasbul.engine import AnalysisResult, hitung_alokasi
+from arkasbul.kategori import KATEGORI, RENTANG, JUMLAH_KATEGORI
+from arkasbul.optimasi import KATEGORI_TETAP, baris_saran, optimasi_alokasi
+from arkasbul.profil import kelas_profil, muat_berkas
+from arkasbul.simulasi import baris_simulasi, simulasi_batch
+from arkasbul.teks import susun_prompt_analisis, generate_simple_analysis
+
+PRECOMPUTED_MODE = os.environ.get("ARKASBUL_PRECOMPUTED_MODE", "fallback")
+
+# Jumlah panggilan LLM yang berjalan bersamaan (thread) per proses
+KONKURENSI_LLM = int(os.environ.get("ARKASBUL_API_LLM_CONCURRENCY", str(groq_client.MAX_CONCURRENCY)))
+# Permintaan HTTP yang sedang diproses; lebih dari ini langsung dijawab 503
+MAKS_INFLIGHT = int(os.environ.get("ARKASBUL_API_MAX_INFLIGHT", "512"))
+# Jumlah item maksimum per permintaan batch
+MAKS_BATCH = int(os.environ.get("ARKASBUL_API_MAX_BATCH", "1000"))
+
+# Mode analisis teks: "llm" (dengan cadangan precomputed/sederhana), "sederhana", atau "tidak"
+MODE_ANALISIS = ("llm", "sederhana", "tidak")
+
+# Pesan tetap untuk klien saat analisis LLM gagal; detail galat (bisa memuat isi respons hulu) hanya dicatat di log
+ERROR_ANALISIS = {
+    "api": "llm_gagal: layanan LLM tidak merespons dengan benar",
+    "exception": "llm_error: kesalahan internal saat meminta analisis LLM",
+}
+
+_log = logging.getLogger("arkasbul.api")
+
+_limiter = None
+_profil = ...
+
+
+def _get_limiter():
+    # CapacityLimiter harus dibuat di dalam event loop
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(KONKURENSI_LLM)
+    return _limiter
+
+
+def _get_profil():
+    global _profil
+    if _profil is ...:
+        _profil = muat_berkas()
+    return _profil
+
+
+def _angka(nilai, nama):
+    """Nilai Rupiah dari angka JSON atau teks berformat 1.000.000; lempar ValueError jika tidak valid"""
+    if isinstance(nilai, str):
+        teks = nilai.replace(".", "").strip()
+        if teks.lower().startswith("rp"):
+            teks = teks[2:].strip()
+        try:
+            nilai = int(teks)
+        except ValueError:
+            raise ValueError(f"{nama} bukan angka yang valid: {nilai!r}")
+    if isinstance(nilai, bool) or not isinstance(nilai, (int, float)) or not math.isfinite(nilai):
+        raise ValueError(f"{nama} harus berupa angka")
+    if nilai < 0:
+        raise ValueError(f"{nama} tidak boleh negatif")
+    return int(nilai)
+
+
+def _indeks_kategori(kunci):
+    """Indeks kategori dari nomor 1-7 atau nama kategori"""
+    teks = str(kunci).strip()
+    if teks.isdigit() and 1 <= int(teks) <= JUMLAH_KATEGORI:
+        return int(teks) - 1
+    for j, nama in enumerate(KATEGORI):
+        if nama.lower() == teks.lower():
+            return j
+    raise ValueError(f"Kategori tidak dikenal: {kunci!r}")
+
+
+def baca_input(data):
+    """Validasi satu objek input; kembalikan (gaji, insentif, pengeluaran, tetap, saldo) atau lempar ValueError
+
+    pengeluaran berupa list 7 angka (urutan kategori) atau objek {nomor 1-7 / nama kategori: angka}.
+    tetap (opsional): list nomor/nama kategori yang dipertahankan pada saran alokasi.
+    saldo_keranjang (opsional): saldo dana darurat; jika diisi, hasil memuat simulasi Keranjang Aman.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Input harus berupa objek JSON")
+    if data.get("gaji") is None:
+        raise ValueError("gaji wajib diisi")
+    gaji = _angka(data["gaji"], "gaji")
+    insentif = _angka(data.get("insentif") or 0, "insentif")
+
+    mentah = data.get("pengeluaran")
+    if isinstance(mentah, dict):
+        pengeluaran = [0] * JUMLAH_KATEGORI
+        for kunci, nilai in mentah.items():
+            pengeluaran[_indeks_kategori(kunci)] = _angka(nilai, f"pengeluaran[{kunci}]")
+    elif isinstance(mentah, list) and len(mentah) == JUMLAH_KATEGORI:
+        pengeluaran = [_angka(nilai, f"pengeluaran[{j}]") for j, nilai in enumerate(mentah)]
+    else:
+        raise ValueError(f"pengeluaran harus berupa list {JUMLAH_KATEGORI} angka atau objek per kategori")
+
+    tetap = data.get("tetap")
+    if tetap is None:
+        tetap = KATEGORI_TETAP
+    elif isinstance(tetap, list):
+        tetap = tuple(sorted({_indeks_kategori(kunci) for kunci in tetap}))
+    else:
+        raise ValueError("tetap harus berupa list nomor atau nama kategori")
+
+    saldo = data.get("saldo_keranjang")
+    if saldo is not None:
+        saldo = _angka(saldo, "saldo_keranjang")
+    return gaji, insentif, pengeluaran, tetap, saldo
+
+
+def _susun_simulasi(simulasi):
+    """Objek JSON untuk SimulasiKeranjang"""
+    return {
+        "saldo_awal": simulasi.saldo_awal,
+        "jalur": simulasi.jalur,
+        "horizon": [
+            {"bulan": bulan, "peluang_habis": round(peluang, 4), "saldo_median": median, "saldo_p10": p10}
+            for bulan, peluang, median, p10 in zip(simulasi.horizon, simulasi.peluang_habis,
+                                                   simulasi.saldo_median, simulasi.saldo_p10)
+        ],
+    }
+
+
+def _susun_hasil(hasil, i, persentase, melebihi, dibawah, saran):
+    """Objek JSON untuk baris ke-i HasilAlokasi (persentase/melebihi/dibawah sudah berupa list, saran SaranAlokasi)"""
+    status = ["melebihi" if melebihi[i][j] else "di_bawah" if dibawah[i][j] else "sesuai" for j in range(JUMLAH_KATEGORI)]
+    pengeluaran = hasil.pengeluaran[i].tolist()
+    return {
+        "gaji": int(hasil.gaji[i]),
+        "insentif": int(hasil.insentif[i]),
+        "persen_insentif": round(float(hasil.persen_insentif[i]), 4),
+        "total_pengeluaran": int(hasil.total_pengeluaran[i]),
+        "total_persen": round(float(hasil.total_persen[i]), 4),
+        "defisit": bool(hasil.defisit[i]),
+        "kategori": [
+            {"item": KATEGORI[j], "pengeluaran": int(pengeluaran[j]), "persen": round(persentase[i][j], 4),
+             "rentang": RENTANG[j], "status": status[j]}
+            for j in range(JUMLAH_KATEGORI)
+        ],
+        "items_melebihi": [KATEGORI[j] for j in range(JUMLAH_KATEGORI) if status[j] == "melebihi"],
+        "items_dibawah": [KATEGORI[j] for j in range(JUMLAH_KATEGORI) if status[j] == "di_bawah"],
+        "saran": {
+            "layak": saran.layak,
+            "sisa": saran.sisa,
+            "tetap": [KATEGORI[j] for j in saran.tetap],
+            "kategori": [
+                {"item": KATEGORI[j], "pengeluaran": saran.saran[j], "perubahan": saran.selisih[j],
+                 "persen": round(saran.persentase[j], 4)}
+                for j in range(JUMLAH_KATEGORI)
+            ],
+        },
+    }
+
+
+def minta_analisis_llm(prompt):
+    """Analisis dari LLM (blocking, dijalankan di thread); melempar GroqError jika gagal
+
+    Melewati cache, single-flight, hedging dan penjadwal yang sama dengan halaman (arkasbul.llm);
+    item identik di batch/permintaan lain yang sedang berjalan berbagi satu panggilan API.
+    """
+    return llm.jawab(prompt, jenis="analisa", mode="api")
+
+
+async def _lengkapi_analisis(item, hasil, saran, simulasi, mode, kelas):
+    """Isi item["analisis"] dan item["sumber_analisis"] sesuai mode"""
+    items_melebihi, items_dibawah = hasil.di_luar_rentang()
+
+    def sederhana():
+        return generate_simple_analysis(hasil.gaji, hasil.insentif, hasil.persen_insentif,
+                                        items_melebihi, items_dibawah, hasil.total_pengeluaran, saran, simulasi)
+
+    if mode == "sederhana":
+        item["analisis"], item["sumber_analisis"] = sederhana(), "sederhana"
+        return
+
+    profil = _get_profil()
+    analisis_profil = profil.get(kelas) if profil is not None else None
+    if analisis_profil is not None and PRECOMPUTED_MODE == "serve":
+        metrik.tambah("precomputed_served_total")
+        item["analisis"], item["sumber_analisis"] = analisis_profil, "precomputed"
+        return
+
+    try:
+        item["analisis"] = await anyio.to_thread.run_sync(minta_analisis_llm, susun_prompt_analisis(hasil, saran=saran, simulasi=simulasi), limiter=_get_limiter())
+        item["sumber_analisis"] = "llm"
+    except Exception as e:
+        sumber = "precomputed" if analisis_profil else "sederhana"
+        sebab = "api" if isinstance(e, groq_client.GroqError) else "exception"
+        metrik.tambah("fallback_total", jalur="api", sebab=sebab, sumber=sumber)
+        _log.warning("Analisis LLM gagal, memakai analisis %s", sumber, exc_info=e)
+        item["error_analisis"] = ERROR_ANALISIS[sebab]
+        item["analisis"], item["sumber_analisis"] = analisis_profil or sederhana(), sumber
+
+
+async def analisis_batch(daftar, mode="llm"):
+    """Hitung alokasi untuk daftar input sekaligus; item tidak valid diganti {"error": ...}"""
+    keluaran = [None] * len(daftar)
+    valid = []
+    for i, data in enumerate(daftar):
+        try:
+            valid.append((i, baca_input(data)))
+        except ValueError as e:
+            keluaran[i] = {"error": str(e)}
+    if not valid:
+        return keluaran
+
+    gaji = np.array([v[1][0] for v in valid], dtype=np.float64)
+    insentif = np.array([v[1][1] for v in valid], dtype=np.float64)
+    hasil = hitung_alokasi(gaji, insentif, [v[1][2] for v in valid])
+    tetap = np.zeros(hasil.pengeluaran.shape, dtype=bool)
+    for baris, (_, masukan) in enumerate(valid):
+        tetap[baris, list(masukan[3])] = True
+    optimasi = optimasi_alokasi(gaji, insentif, hasil.pengeluaran, tetap=tetap)
+    persentase = hasil.persentase.tolist()
+    melebihi = hasil.items_melebihi.tolist()
+    dibawah = hasil.items_dibawah.tolist()
+    kelas = kelas_profil(hasil).tolist() if mode == "llm" else None
+
+    # Simulasi Keranjang Aman untuk item yang mengisi saldo_keranjang: satu panggilan vektor, di thread
+    # agar event loop tetap melayani permintaan lain
+    disimulasikan = [baris for baris, (_, masukan) in enumerate(valid) if masukan[4] is not None]
+    simulasi = {}
+    if disimulasikan:
+        saldo = np.array([valid[baris][1][4] for baris in disimulasikan], dtype=np.float64)
+        hasil_simulasi = await anyio.to_thread.run_sync(
+            simulasi_batch, gaji[disimulasikan], insentif[disimulasikan], hasil.pengeluaran[disimulasikan], saldo
+        )
+        for k, baris in enumerate(disimulasikan):
+            simulasi[baris] = baris_simulasi(hasil_simulasi, k, saldo[k])
+
+    tugas = []
+    for baris, (i, (g, ins, p, t, _)) in enumerate(valid):
+        saran = baris_saran(optimasi, baris, t)
+        item = keluaran[i] = _susun_hasil(hasil, baris, persentase, melebihi, dibawah, saran)
+        if baris in simulasi:
+            item["simulasi_keranjang"] = _susun_simulasi(simulasi[baris])
+        if mode != "tidak":
+            hasil_baris = AnalysisResult(g, ins, p, persentase[baris], float(hasil.persen_insentif[baris]),
+                                         melebihi[baris], dibawah[baris])
+            tugas.append(_lengkapi_analisis(item, hasil_baris, saran, simulasi.get(baris), mode, kelas[baris] if kelas else None))
+    if tugas:
+        await asyncio.gather(*tugas)
+    return keluaran
+
+
+def _error(pesan, status=400):
+    return JSONResponse({"error": pesan}, status_code=status)
+
+
+async def _baca_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise ValueError("Body bukan JSON yang valid")
+
+
+def _mode(data):
+    mode = data.get("analisis", "llm") if isinstance(data, dict) else "llm"
+    if mode not in MODE_ANALISIS:
+        raise ValueError(f"analisis harus salah satu dari {', '.join(MODE_ANALISIS)}")
+    return mode
+
+
+async def endpoint_analisis(request):
+    try:
+        data = await _baca_json(request)
+        mode = _mode(data)
+    except ValueError as e:
+        return _error(str(e), 422)
+    item = (await analisis_batch([data], mode))[0]
+    return JSONResponse(item, status_code=422 if "error" in item else 200)
+
+
+async def endpoint_batch(request):
+    try:
+        data = await _baca_json(request)
+        mode = _mode(data)
+    except ValueError as e:
+        return _error(str(e), 422)
+    daftar = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(daftar, list):
+        return _error("items harus berupa list input", 422)
+    if len(daftar) > MAKS_BATCH:
+        return _error(f"Maksimum {MAKS_BATCH} item per batch", 413)
+    keluaran = await analisis_batch(daftar, mode)
+    gagal = sum(1 for item in keluaran if "error" in item)
+    return JSONResponse({"jumlah": len(keluaran), "gagal": gagal, "items": keluaran})
+
+
+async def endpoint_health(request):
+    return JSONResponse({"status": "ok", "antrian_llm": penjadwal.get_penjadwal().panjang_antrian()})
+
+
+async def endpoint_metrik(request):
+    if not metrik.AKTIF:
+        return _error("Metrik tidak aktif (set ARKASBUL_METRICS)", 404)
+    return PlainTextResponse(metrik.ekspor_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+class BatasKonkurensi:
+    """Middleware ASGI: jawab 503 jika permintaan yang sedang diproses mencapai batas, dan ukur durasi"""
+
+    def __init__(self, app, maks=MAKS_INFLIGHT):
+        self.app = app
+        self.maks = maks
+        self.aktif = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.aktif >= self.maks:
+            metrik.tambah("api_ditolak_total")
+            respons = JSONResponse({"error": "Server sedang sibuk, silakan coba lagi"}, status_code=503,
+                                   headers={"Retry-After": "1"})
+            await respons(scope, receive, send)
+            return
+        self.aktif += 1
+        mulai = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.aktif -= 1
+            metrik.amati("api_request_seconds", time.perf_counter() - mulai, endpoint=scope["path"])
+
+
+def buat_app(maks_inflight=MAKS_INFLIGHT):
+    """Aplikasi ASGI (Starlette) dengan batas permintaan bersamaan"""
+    app = Starlette(routes=[
+        Route("/v1/analisis", endpoint_analisis, methods=["POST"]),
+        Route("/v1/analisis/batch", endpoint_batch, methods=["POST"]),
+        Route("/health", endpoint_health, methods=["GET"]),
+        Route("/metrics", endpoint_metrik, methods=["GET"]),
+    ])
+    return BatasKonkurensi(app, maks_inflight)
+
+
+app = buat_app()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON analisis alokasi dana HGarkasbul")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses; kuota RPM/TPM berlaku per proses (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run("arkasbul.api:app", host=args.host, port=args.port, workers=args.workers,
+                log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# Cache respons LLM berbasis hash konten
+# Tingkat 1: LRU di memori proses; tingkat 2: SQLite di disk dengan TTL dan batas ukuran.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from arkasbul import AKAR, metrik
+
+CACHE_DB = os.environ.get("ARKASBUL_CACHE_DB", os.path.join(AKAR, ".cache", "llm_cache.sqlite3"))
+CACHE_MEMORI_MAKS = int(os.environ.get("ARKASBUL_CACHE_MEM_ENTRIES", "512"))
+CACHE_TTL = float(os.environ.get("ARKASBUL_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_DISK_MAKS_BYTES = int(os.environ.get("ARKASBUL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_NONAKTIF = os.environ.get("ARKASBUL_CACHE_DISABLED", "") not in ("", "0")
+
+# Eviction disk dijalankan setiap sekian kali tulis agar set() tetap murah
+_EVICT_SETIAP = 50
+
+
+def normalisasi_prompt(prompt):
+    """Samakan prompt yang hanya berbeda indentasi/spasi di tepi baris"""
+    baris = (b.strip() for b in prompt.strip().splitlines())
+    return "\n".join(b for b in baris if b)
+
+
+def buat_kunci(prompt, model, **params):
+    """Kunci cache: SHA-256 dari prompt ternormalisasi, nama model dan parameter sampling"""
+    isi = json.dumps(
+        {"prompt": normalisasi_prompt(prompt), "model": model, "params": params},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(isi.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Cache dua tingkat (LRU memori + SQLite) dengan penghitung hit/miss"""
+
+    def __init__(self, path=CACHE_DB, max_memori=CACHE_MEMORI_MAKS, ttl=CACHE_TTL, max_bytes=CACHE_DISK_MAKS_BYTES):
+        self.path = path
+        self.max_memori = max_memori
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memori = OrderedDict()  # kunci -> (nilai, dibuat)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._tulis = 0
+        self.stats = {"hit_memori": 0, "hit_disk": 0, "miss": 0, "set": 0, "evict": 0}
+
+    def _db(self):
+        """Buka koneksi SQLite saat pertama kali dibutuhkan"""
+        if self._conn is None and self.path:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "kunci TEXT PRIMARY KEY, nilai TEXT NOT NULL, dibuat REAL NOT NULL, "
+                "diakses REAL NOT NULL, ukuran INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_diakses ON llm_cache (diakses)")
+            self._conn = conn
+        return self._conn
+
+    def _simpan_memori(self, kunci, nilai, dibuat):
+        self._memori[kunci] = (nilai, dibuat)
+        self._memori.move_to_end(kunci)
+        while len(self._memori) > self.max_memori:
+            self._memori.popitem(last=False)
+
+    def get(self, kunci):
+        """Ambil nilai dari cache, None jika tidak ada atau kedaluwarsa"""
+        with self._lock:
+            sekarang = time.time()
+            entri = self._memori.get(kunci)
+            if entri is not None:
+                # TTL dihitung dari waktu entri dibuat, sama dengan tingkat disk
+                if sekarang - entri[1] <= self.ttl:
+                    self._memori.move_to_end(kunci)
+                    self.stats["hit_memori"] += 1
+                    return entri[0]
+                del self._memori[kunci]
+
+            db = self._db()
+            if db is not None:
+                baris = db.execute("SELECT nilai, dibuat FROM llm_cache WHERE kunci = ?", (kunci,)).fetchone()
+                if baris is not None and sekarang - baris[1] <= self.ttl:
+                    db.execute("UPDATE llm_cache SET diakses = ? WHERE kunci = ?", (sekarang, kunci))
+                    self._simpan_memori(kunci, baris[0], baris[1])
+                    self.stats["hit_disk"] += 1
+                    return baris[0]
+
+            self.stats["miss"] += 1
+            return None
+
+    def set(self, kunci, nilai):
+        """Simpan nilai ke memori dan disk"""
+        with self._lock:
+            sekarang = time.time()
+            self._simpan_memori(kunci, nilai, sekarang)
+            self.stats["set"] += 1
+            db = self._db()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (kunci, nilai, dibuat, diakses, ukuran) VALUES (?, ?, ?, ?, ?)",
+                (kunci, nilai, sekarang, sekarang, len(nilai.encode("utf-8")))
+            )
+            self._tulis += 1
+            if self._tulis % _EVICT_SETIAP == 0:
+                self._evict(db, sekarang)
+
+    def _evict(self, db, sekarang):
+        """Hapus entri kedaluwarsa, lalu entri paling lama tidak diakses sampai di bawah max_bytes"""
+        hapus = db.execute("DELETE FROM llm_cache WHERE dibuat < ?", (sekarang - self.ttl,)).rowcount
+        total = db.execute("SELECT COALESCE(SUM(ukuran), 0) FROM llm_cache").fetchone()[0]
+        if total > self.max_bytes:
+            lebih = total - self.max_bytes
+            kunci_hapus = []
+            for kunci, ukuran in db.execute("SELECT kunci, ukuran FROM llm_cache ORDER BY diakses"):
+                kunci_hapus.append((kunci,))
+                lebih -= ukuran
+                if lebih <= 0:
+                    break
+            db.executemany("DELETE FROM llm_cache WHERE kunci = ?", kunci_hapus)
+            hapus += len(kunci_hapus)
+        self.stats["evict"] += hapus
+
+    def hit_rate(self):
+        """Rasio hit (memori + disk) terhadap total pencarian"""
+        hit = self.stats["hit_memori"] + self.stats["hit_disk"]
+        total = hit + self.stats["miss"]
+        return hit / total if total else 0.0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _kolektor_metrik():
+    """Statistik cache sebagai gauge untuk ekspor metrik"""
+    if _cache is None:
+        return []
+    data = [("llm_cache_requests", {"hasil": k}, _cache.stats[k]) for k in ("hit_memori", "hit_disk", "miss")]
+    data.append(("llm_cache_hit_ratio", {}, round(_cache.hit_rate(), 4)))
+    return data
+
+
+def get_cache():
+    """Ambil cache bersama per proses, None jika cache dinonaktifkan"""
+    global _cache
+    if CACHE_NONAKTIF:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+                metrik.daftarkan_kolektor(_kolektor_metrik)
+    return _cache
@@ -0,0 +1,97 @@
+# Pengelolaan riwayat chat konsultasi
+# Konteks multi-turn dibatasi anggaran token: giliran terbaru dikirim utuh, giliran lama
+# dipadatkan ke ringkasan bergulir, dan transkrip yang disimpan diberi batas keras.
+import os
+import re
+
+# Anggaran token untuk giliran terbaru yang dikirim utuh ke model
+CHAT_TOKEN_BUDGET = int(os.environ.get("ARKASBUL_CHAT_TOKEN_BUDGET", "2000"))
+# Anggaran token untuk ringkasan bergulir giliran lama
+CHAT_RINGKASAN_BUDGET = int(os.environ.get("ARKASBUL_CHAT_SUMMARY_BUDGET", "500"))
+# Batas keras jumlah giliran yang disimpan di session state
+CHAT_MAKS_GILIRAN = int(os.environ.get("ARKASBUL_CHAT_MAX_TURNS", "50"))
+# Jumlah giliran per halaman tampilan
+CHAT_PER_HALAMAN = int(os.environ.get("ARKASBUL_CHAT_PAGE_SIZE", "5"))
+
+_AKHIR_KALIMAT = re.compile(r"(?<=[.!?])\s")
+
+
+def estimasi_token(teks):
+    """Perkiraan kasar jumlah token (~4 karakter per token)"""
+    return len(teks) // 4 + 1
+
+
+def _potong(teks, maks):
+    teks = " ".join(teks.split())
+    return teks if len(teks) <= maks else teks[:maks - 3].rstrip() + "..."
+
+
+def ringkas_giliran(pertanyaan, jawaban):
+    """Satu baris ringkasan ekstraktif: pertanyaan dan kalimat pertama jawaban"""
+    inti = _AKHIR_KALIMAT.split(" ".join(jawaban.split()), maxsplit=1)[0]
+    return f"- Pengguna bertanya: {_potong(pertanyaan, 160)} | Inti jawaban: {_potong(inti, 240)}"
+
+
+def _batasi_ringkasan(ringkasan, budget):
+    """Buang baris ringkasan tertua sampai muat dalam anggaran token"""
+    baris = ringkasan.splitlines()
+    while len(baris) > 1 and estimasi_token("\n".join(baris)) > budget:
+        baris.pop(0)
+    return "\n".join(baris)
+
+
+def padatkan_riwayat(riwayat, ringkasan, jumlah_terangkum, budget=CHAT_TOKEN_BUDGET,
+                     budget_ringkasan=CHAT_RINGKASAN_BUDGET, maks_giliran=CHAT_MAKS_GILIRAN):
+    """Padatkan riwayat setelah giliran baru ditambahkan
+
+    riwayat: list (pertanyaan, jawaban); jumlah_terangkum: banyaknya giliran awal yang
+    sudah masuk ringkasan. Mengembalikan (riwayat, ringkasan, jumlah_terangkum, jumlah_dibuang).
+    """
+    # Cari giliran terbaru yang masih muat dalam anggaran token
+    awal_jendela = len(riwayat)
+    terpakai = 0
+    while awal_jendela > jumlah_terangkum:
+        q, a = riwayat[awal_jendela - 1]
+        biaya = estimasi_token(q) + estimasi_token(a)
+        if terpakai + biaya > budget and awal_jendela < len(riwayat):
+            break
+        terpakai += biaya
+        awal_jendela -= 1
+
+    # Giliran di luar jendela dilipat ke ringkasan bergulir
+    if awal_jendela > jumlah_terangkum:
+        baris_baru = [ringkas_giliran(q, a) for q, a in riwayat[jumlah_terangkum:awal_jendela]]
+        ringkasan = "\n".join(([ringkasan] if ringkasan else []) + baris_baru)
+        ringkasan = _batasi_ringkasan(ringkasan, budget_ringkasan)
+        jumlah_terangkum = awal_jendela
+
+    # Batas keras transkrip: giliran tertua dibuang (sudah terwakili di ringkasan)
+    jumlah_dibuang = max(0, len(riwayat) - maks_giliran)
+    if jumlah_dibuang:
+        if jumlah_dibuang > jumlah_terangkum:
+            baris_baru = [ringkas_giliran(q, a) for q, a in riwayat[jumlah_terangkum:jumlah_dibuang]]
+            ringkasan = _batasi_ringkasan("\n".join(([ringkasan] if ringkasan else []) + baris_baru), budget_ringkasan)
+            jumlah_terangkum = jumlah_dibuang
+        riwayat = riwayat[jumlah_dibuang:]
+        jumlah_terangkum -= jumlah_dibuang
+
+    return riwayat, ringkasan, jumlah_terangkum, jumlah_dibuang
+
+
+def pesan_konteks(riwayat, ringkasan, jumlah_terangkum):
+    """Susun pesan multi-turn (format OpenAI) dari ringkasan dan giliran yang belum diringkas"""
+    pesan = []
+    if ringkasan:
+        pesan.append({
+            "role": "system",
+            "content": "Ringkasan percakapan konsultasi sebelumnya:\n" + ringkasan
+        })
+    for q, a in riwayat[jumlah_terangkum:]:
+        pesan.append({"role": "user", "content": q})
+        pesan.append({"role": "assistant", "content": a})
+    return pesan
+
+
+def awal_halaman(jumlah_giliran, halaman, per_halaman=CHAT_PER_HALAMAN):
+    """Indeks giliran pertama yang ditampilkan saat `halaman` halaman terbaru dimuat"""
+    return max(0, jumlah_giliran - per_halaman * halaman)
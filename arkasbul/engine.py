@@ -0,0 +1,182 @@
+# Mesin perhitungan alokasi dana (vektorisasi NumPy)
+# Dipakai oleh halaman Streamlit (N=1) maupun analisis massal data HR (N rumah tangga)
+from collections import namedtuple
+
+import numpy as np
+
+from arkasbul.kategori import KATEGORI, RENTANG_MIN, RENTANG_MAX
+
+HasilAlokasi = namedtuple("HasilAlokasi", [
+    "gaji",               # (N,) gaji bulanan
+    "insentif",           # (N,) insentif/lembur
+    "pengeluaran",        # (N, 7) besar pengeluaran per kategori
+    "persentase",         # (N, 7) persentase pengeluaran terhadap gaji
+    "persen_insentif",    # (N,) persentase insentif terhadap gaji
+    "items_melebihi",     # (N, 7) bool, di atas rentang_max
+    "items_dibawah",      # (N, 7) bool, di bawah rentang_min
+    "total_pengeluaran",  # (N,)
+    "total_persen",       # (N,)
+    "delta_pengeluaran",  # (N,) total_pengeluaran - gaji
+    "defisit",            # (N,) bool, total_pengeluaran > gaji
+])
+
+
+def _persen(pembilang, gaji):
+    """Hitung pembilang / gaji * 100, bernilai 0 jika gaji <= 0"""
+    gaji_aman = np.where(gaji > 0, gaji, 1.0)
+    return np.where(gaji > 0, pembilang / gaji_aman * 100, 0.0)
+
+
+def hitung_alokasi(gaji, insentif, pengeluaran, rentang_min=RENTANG_MIN, rentang_max=RENTANG_MAX):
+    """Hitung persentase, item di luar rentang, total dan defisit untuk N rumah tangga sekaligus
+
+    gaji dan insentif boleh skalar atau vektor (N,); pengeluaran berbentuk (N, 7)
+    atau (7,) untuk satu rumah tangga.
+    """
+    pengeluaran = np.atleast_2d(np.asarray(pengeluaran, dtype=np.float64))
+    if pengeluaran.shape[1] != len(rentang_min):
+        raise ValueError(f"Pengeluaran harus memiliki {len(rentang_min)} kolom kategori, bukan {pengeluaran.shape[1]}")
+    n = pengeluaran.shape[0]
+    gaji = np.broadcast_to(np.asarray(gaji, dtype=np.float64), (n,))
+    insentif = np.broadcast_to(np.asarray(insentif, dtype=np.float64), (n,))
+
+    persentase = _persen(pengeluaran, gaji[:, None])
+    persen_insentif = _persen(insentif, gaji)
+
+    items_melebihi = persentase > np.asarray(rentang_max, dtype=np.float64)
+    items_dibawah = persentase < np.asarray(rentang_min, dtype=np.float64)
+
+    total_pengeluaran = pengeluaran.sum(axis=1)
+    total_persen = persentase.sum(axis=1)
+    delta_pengeluaran = total_pengeluaran - gaji
+
+    return HasilAlokasi(
+        gaji=gaji,
+        insentif=insentif,
+        pengeluaran=pengeluaran,
+        persentase=persentase,
+        persen_insentif=persen_insentif,
+        items_melebihi=items_melebihi,
+        items_dibawah=items_dibawah,
+        total_pengeluaran=total_pengeluaran,
+        total_persen=total_persen,
+        delta_pengeluaran=delta_pengeluaran,
+        defisit=delta_pengeluaran > 0,
+    )
+
+
+class AnalysisResult:
+    """Hasil perhitungan alokasi satu pengguna; immutable dan ringkas (__slots__, tuple float)
+
+    Dibuat sekali per kombinasi input dan disimpan di session state sehingga jalur
+    Analisa maupun rerun biasa cukup me-render dari objek ini.
+    """
+
+    __slots__ = (
+        "gaji", "insentif", "pengeluaran", "persentase", "persen_insentif",
+        "items_melebihi", "items_dibawah", "total_pengeluaran", "total_persen"
+    )
+
+    def __init__(self, gaji, insentif, pengeluaran, persentase, persen_insentif, items_melebihi, items_dibawah):
+        tulis = object.__setattr__
+        tulis(self, "gaji", gaji)
+        tulis(self, "insentif", insentif)
+        tulis(self, "pengeluaran", tuple(pengeluaran))
+        tulis(self, "persentase", tuple(persentase))
+        tulis(self, "persen_insentif", persen_insentif)
+        tulis(self, "items_melebihi", tuple(items_melebihi))
+        tulis(self, "items_dibawah", tuple(items_dibawah))
+        tulis(self, "total_pengeluaran", sum(self.pengeluaran))
+        tulis(self, "total_persen", sum(self.persentase))
+
+    def __setattr__(self, nama, nilai):
+        raise AttributeError("AnalysisResult tidak dapat diubah, gunakan perbarui()")
+
+    def __delattr__(self, nama):
+        raise AttributeError("AnalysisResult tidak dapat diubah, gunakan perbarui()")
+
+    def __reduce__(self):
+        return (AnalysisResult, (
+            self.gaji, self.insentif, self.pengeluaran, self.persentase,
+            self.persen_insentif, self.items_melebihi, self.items_dibawah
+        ))
+
+    @classmethod
+    def hitung(cls, gaji, insentif, pengeluaran):
+        """Hitung hasil lengkap lewat mesin alokasi (N=1)"""
+        hasil = hitung_alokasi(gaji, insentif, pengeluaran)
+        return cls(
+            gaji,
+            insentif,
+            [int(p) for p in pengeluaran],
+            hasil.persentase[0].tolist(),
+            float(hasil.persen_insentif[0]),
+            hasil.items_melebihi[0].tolist(),
+            hasil.items_dibawah[0].tolist(),
+        )
+
+    def kunci(self):
+        """Tuple input yang menentukan hasil ini"""
+        return (self.gaji, self.insentif, self.pengeluaran)
+
+    def perbarui(self, gaji, insentif, pengeluaran):
+        """Kembalikan hasil untuk input baru, hanya menghitung ulang kategori yang berubah
+
+        Jika input sama persis, objek ini sendiri yang dikembalikan. Perubahan gaji
+        mengubah semua persentase sehingga dihitung ulang penuh.
+        """
+        pengeluaran = tuple(int(p) for p in pengeluaran)
+        if gaji != self.gaji or len(pengeluaran) != len(self.pengeluaran):
+            return AnalysisResult.hitung(gaji, insentif, pengeluaran)
+        if insentif == self.insentif and pengeluaran == self.pengeluaran:
+            return self
+
+        persen_insentif = self.persen_insentif
+        if insentif != self.insentif:
+            persen_insentif = float(_persen(np.float64(insentif), np.float64(gaji)))
+
+        persentase = list(self.persentase)
+        items_melebihi = list(self.items_melebihi)
+        items_dibawah = list(self.items_dibawah)
+        for j, (lama, baru) in enumerate(zip(self.pengeluaran, pengeluaran)):
+            if lama != baru:
+                persentase[j] = float(_persen(np.float64(baru), np.float64(gaji)))
+                items_melebihi[j] = persentase[j] > RENTANG_MAX[j]
+                items_dibawah[j] = persentase[j] < RENTANG_MIN[j]
+
+        return AnalysisResult(gaji, insentif, pengeluaran, persentase, persen_insentif, items_melebihi, items_dibawah)
+
+    @property
+    def delta_pengeluaran(self):
+        return self.total_pengeluaran - self.gaji
+
+    @property
+    def delta_persen(self):
+        return self.total_persen - 100
+
+    @property
+    def defisit(self):
+        return self.total_pengeluaran > self.gaji
+
+    def di_luar_rentang(self, kategori=KATEGORI):
+        """Daftar (item, persen, batas) untuk item yang melebihi dan di bawah rentang"""
+        items_melebihi = [
+            (kategori[j], self.persentase[j], RENTANG_MAX[j])
+            for j, lebih in enumerate(self.items_melebihi) if lebih
+        ]
+        items_dibawah = [
+            (kategori[j], self.persentase[j], RENTANG_MIN[j])
+            for j, kurang in enumerate(self.items_dibawah) if kurang
+        ]
+        return items_melebihi, items_dibawah
+
+    def __eq__(self, lain):
+        if not isinstance(lain, AnalysisResult):
+            return NotImplemented
+        return self.kunci() == lain.kunci()
+
+    def __hash__(self):
+        return hash(self.kunci())
+
+    def __repr__(self):
+        return f"AnalysisResult(gaji={self.gaji}, insentif={self.insentif}, pengeluaran={self.pengeluaran})"
@@ -0,0 +1,243 @@
+# Klien HTTP untuk API Groq (OpenAI-compatible)
+# Satu pool koneksi keep-alive per proses, batas waktu connect/read, retry dengan
+# backoff eksponensial + jitter, dan pembatasan jumlah panggilan bersamaan.
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from arkasbul import metrik
+
+# Endpoint chat completions; dapat diarahkan ke server tiruan untuk uji beban (benchmarks/mock_groq.py)
+GROQ_API_URL = os.environ.get("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+
+# Konfigurasi default, dapat diubah lewat environment variable
+CONNECT_TIMEOUT = float(os.environ.get("GROQ_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("GROQ_READ_TIMEOUT", "60"))
+MAX_RETRIES = int(os.environ.get("GROQ_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("GROQ_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("GROQ_BACKOFF_MAX", "10"))
+MAX_CONCURRENCY = int(os.environ.get("GROQ_MAX_CONCURRENCY", "16"))
+# Lama menunggu slot konkurensi sebelum menyerah
+ANTRIAN_TIMEOUT = float(os.environ.get("GROQ_QUEUE_TIMEOUT", "30"))
+# Selang (detik) pemeriksaan pembatalan selama menunggu slot, backoff atau antrian penjadwal
+JEDA_CEK_BATAL = 0.1
+
+# Status HTTP yang layak dicoba ulang
+STATUS_RETRY = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+_slot = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+
+class GroqBusyError(Exception):
+    """Semua slot panggilan bersamaan sedang terpakai"""
+
+
+class GroqError(Exception):
+    """API mengembalikan status gagal atau stream terputus di tengah jalan"""
+
+
+class GroqBatalError(GroqError):
+    """Permintaan dibatalkan pemanggil sebelum selesai"""
+
+    def __init__(self, pesan="Error: permintaan dibatalkan"):
+        super().__init__(pesan)
+
+
+def periksa_batal(batal):
+    """Lempar GroqBatalError jika batal (objek dengan is_set(), mis. threading.Event) sudah di-set"""
+    if batal is not None and batal.is_set():
+        raise GroqBatalError()
+
+
+def _tunggu(detik, batal):
+    """Tidur selama `detik`; berhenti lebih awal dengan GroqBatalError jika dibatalkan"""
+    if batal is None:
+        time.sleep(detik)
+        return
+    batas = time.monotonic() + detik
+    while True:
+        periksa_batal(batal)
+        sisa = batas - time.monotonic()
+        if sisa <= 0:
+            return
+        time.sleep(min(sisa, JEDA_CEK_BATAL))
+
+
+def _ambil_slot(batal):
+    """Ambil slot konkurensi dalam ANTRIAN_TIMEOUT; False jika habis waktu"""
+    if batal is None:
+        return _slot.acquire(timeout=ANTRIAN_TIMEOUT)
+    batas = time.monotonic() + ANTRIAN_TIMEOUT
+    while True:
+        periksa_batal(batal)
+        sisa = batas - time.monotonic()
+        if sisa <= 0:
+            return False
+        if _slot.acquire(timeout=min(sisa, JEDA_CEK_BATAL)):
+            return True
+
+
+def get_session():
+    """Ambil requests.Session bersama (dibuat sekali per proses)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _retry_after(response):
+    """Baca header Retry-After (detik atau tanggal HTTP), None jika tidak ada/tidak valid"""
+    nilai = response.headers.get("Retry-After")
+    if not nilai:
+        return None
+    try:
+        return max(0.0, float(nilai))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(nilai).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(percobaan):
+    """Jeda full-jitter: acak antara 0 dan base * 2^percobaan (dibatasi BACKOFF_MAX)"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** percobaan)))
+
+
+def _lepas_saat_ditutup(response):
+    """Slot konkurensi dilepas saat response stream ditutup (body selesai dibaca atau dibatalkan)"""
+    tutup = response.close
+    dilepas = threading.Lock()
+
+    def close():
+        try:
+            tutup()
+        finally:
+            if dilepas.acquire(blocking=False):
+                _slot.release()
+
+    response.close = close
+    return response
+
+
+def post_chat(url, api_key, payload, timeout=None, max_retries=None, stream=False, batal=None):
+    """Kirim payload ke endpoint chat completions dan kembalikan requests.Response terakhir
+
+    Retry dilakukan untuk error koneksi/timeout serta status 429/5xx. Jika semua
+    percobaan gagal karena koneksi, exception terakhir dilempar kembali.
+    Dengan stream=True body tidak dibaca, sehingga retry hanya terjadi sebelum byte pertama; slot
+    konkurensi tetap dipegang sampai response ditutup, jadi pemanggil wajib menutupnya (mis. `with response:`).
+    batal: objek dengan is_set(); penantian slot dan jeda retry berhenti dengan GroqBatalError jika di-set.
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    max_retries = MAX_RETRIES if max_retries is None else max_retries
+    session = get_session()
+
+    percobaan = 0
+    while True:
+        if not _ambil_slot(batal):
+            raise GroqBusyError(f"Terlalu banyak panggilan bersamaan (maks {MAX_CONCURRENCY})")
+        lepas = True
+        try:
+            response = session.post(url, headers=headers, json=payload, timeout=timeout, stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if percobaan >= max_retries:
+                metrik.tambah("llm_errors_total", jenis=type(e).__name__)
+                raise
+            metrik.tambah("llm_retry_total", sebab=type(e).__name__)
+            jeda = _backoff(percobaan)
+        else:
+            if response.status_code not in STATUS_RETRY or percobaan >= max_retries:
+                if response.status_code != 200:
+                    metrik.tambah("llm_errors_total", jenis=str(response.status_code))
+                if stream:
+                    lepas = False
+                    return _lepas_saat_ditutup(response)
+                return response
+            metrik.tambah("llm_retry_total", sebab=str(response.status_code))
+            jeda = _backoff(percobaan)
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                jeda = max(jeda, min(retry_after, BACKOFF_MAX))
+            response.close()
+        finally:
+            if lepas:
+                _slot.release()
+
+        _tunggu(jeda, batal)
+        percobaan += 1
+
+
+def catat_usage(usage, mode):
+    """Catat jumlah token prompt/completion dari field `usage` respons API"""
+    if not usage:
+        return
+    for jenis in ("prompt", "completion"):
+        jumlah = usage.get(f"{jenis}_tokens")
+        if jumlah is not None:
+            metrik.tambah("llm_tokens_total", jumlah, jenis=jenis, mode=mode)
+            metrik.amati(f"llm_{jenis}_tokens", jumlah, mode=mode)
+
+
+def stream_chat(url, api_key, payload, timeout=None, max_retries=None, on_usage=None, mode="stream", batal=None):
+    """Generator potongan teks dari mode streaming (SSE) chat completions
+
+    Melempar GroqError jika status bukan 200, API mengirim event error, atau
+    stream berakhir tanpa penanda [DONE]. on_usage dipanggil dengan dict usage jika API mengirimnya.
+    mode: label metrik latensi dan token.
+    batal: objek dengan is_set(); diperiksa selama menunggu slot/retry dan setiap baris stream.
+    """
+    payload = dict(payload, stream=True)
+    mulai = time.perf_counter()
+    response = post_chat(url, api_key, payload, timeout=timeout, max_retries=max_retries, stream=True, batal=batal)
+    with response:
+        if response.status_code != 200:
+            raise GroqError(f"Error: {response.status_code}, {response.text}")
+        response.encoding = "utf-8"
+        token_pertama = True
+        for baris in response.iter_lines(decode_unicode=True):
+            periksa_batal(batal)
+            if not baris or not baris.startswith("data:"):
+                continue
+            isi = baris[5:].strip()
+            if isi == "[DONE]":
+                metrik.amati("llm_latency_seconds", time.perf_counter() - mulai, mode=mode)
+                return
+            event = json.loads(isi)
+            if "error" in event:
+                metrik.tambah("llm_errors_total", jenis="stream_event")
+                raise GroqError(f"Error: {event['error']}")
+            # Groq mengirim usage di x_groq pada event terakhir; API OpenAI di field usage
+            usage = event.get("usage") or (event.get("x_groq") or {}).get("usage")
+            if usage:
+                catat_usage(usage, mode)
+                if on_usage is not None:
+                    on_usage(usage)
+            for choice in event.get("choices", []):
+                token = (choice.get("delta") or {}).get("content")
+                if token:
+                    if token_pertama:
+                        metrik.amati("llm_ttfb_seconds", time.perf_counter() - mulai, mode=mode)
+                        token_pertama = False
+                    yield token
+    metrik.tambah("llm_errors_total", jenis="stream_terputus")
+    raise GroqError("Error: stream terputus sebelum selesai")
@@ -0,0 +1,27 @@
+# Definisi kategori pengeluaran beserta rentang rujukannya
+# Modul ini sengaja tanpa dependensi agar halaman dapat di-render tanpa memuat NumPy/pandas.
+KATEGORI = [
+    "Investasi atau tabungan untuk masa depan",
+    "Cicilan, pinjaman, Asuransi, arisan, dll",
+    "Pengeluaran Rumah Tangga",
+    "Penguatan Dana \"Keranjang Aman\"",
+    "Zakat dan biaya sosial",
+    "Biaya pendidikan anak",
+    "Hidup Gaya"
+]
+
+RENTANG = [
+    "10-20%",
+    "15-25%",
+    "30-40%",
+    "5-10%",
+    "5-10%",
+    "10-20%",
+    "5-10%"
+]
+
+# Batas bawah dan atas rentang (persen terhadap gaji)
+RENTANG_MIN = [10, 15, 30, 5, 5, 10, 5]
+RENTANG_MAX = [20, 25, 40, 10, 10, 20, 10]
+
+JUMLAH_KATEGORI = len(KATEGORI)
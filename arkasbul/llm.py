@@ -0,0 +1,85 @@
+# Jalur panggilan LLM bersama untuk halaman Streamlit dan API HTTP
+#
+# Urutan: cache respons -> single-flight (permintaan identik berbagi satu panggilan) -> hedging
+# model per rute -> penjadwal RPM/TPM -> groq_client (pool koneksi, timeout, retry). Hanya jawaban
+# model utama yang selesai utuh yang disimpan ke cache karena kuncinya memakai model utama.
+import os
+import time
+
+from arkasbul import groq_client, penjadwal, rute
+from arkasbul.cache import buat_kunci, get_cache
+
+TEMPERATURE = 0.7
+TOP_P = 0.9
+
+
+def prioritas_jenis(jenis):
+    """Prioritas antrian penjadwal per jenis permintaan"""
+    return penjadwal.PRIORITAS_ANALISA if jenis == "analisa" else penjadwal.PRIORITAS_CHAT
+
+
+def api_key_env():
+    """API key dari env GROQ_API_KEY; melempar GroqError jika belum dikonfigurasi"""
+    api_key = os.environ.get("GROQ_API_KEY")
+    if not api_key:
+        raise groq_client.GroqError("Error: GROQ_API_KEY belum dikonfigurasi")
+    return api_key
+
+
+def stream_jawaban(prompt, jenis="chat", api_key=None, max_tokens=None, history=None, prioritas=None, mode="stream",
+                   batal=None):
+    """Generator potongan teks jawaban LLM untuk prompt
+
+    jenis: "analisa" atau "chat" menentukan model, max_tokens dan hedging (arkasbul.rute).
+    history: pesan multi-turn sebelumnya (format OpenAI) yang dikirim sebelum prompt.
+    api_key: None = dibaca dari env saat API benar-benar dipanggil (bukan saat cache hit).
+    mode: label metrik panggilan ("stream" dari halaman, "api" dari server analisis).
+    batal: threading.Event pemanggil; menghentikan penantian antrian penjadwal, slot koneksi dan retry
+    (GroqBatalError) selama tidak ada permintaan identik lain yang ikut membaca.
+    Melempar GroqError jika API gagal.
+    """
+    jalur = rute.RUTE[jenis]
+    max_tokens = max_tokens or jalur.max_tokens
+    prioritas = prioritas_jenis(jenis) if prioritas is None else prioritas
+    messages = list(history or []) + [{"role": "user", "content": prompt}]
+
+    # Prompt identik (model, parameter dan riwayat sama) dilayani dari cache tanpa memanggil API
+    kunci = buat_kunci(prompt, rute.tingkat_utama(jalur).model, max_tokens=max_tokens, temperature=TEMPERATURE,
+                       top_p=TOP_P, **({"history": history} if history else {}))
+    cache = get_cache()
+    if cache is not None:
+        tersimpan = cache.get(kunci)
+        if tersimpan is not None:
+            yield tersimpan
+            return
+
+    def panggil_api(tingkat, peran, batal):
+        kunci_api = api_key or api_key_env()
+        data = {"model": tingkat.model, "messages": messages, "max_tokens": max_tokens,
+                "temperature": TEMPERATURE, "top_p": TOP_P}
+        # Tunggu giliran dan kuota RPM/TPM bersama; cadangan token dikoreksi dengan usage sebenarnya
+        with penjadwal.get_penjadwal().izin(prioritas, penjadwal.estimasi_token(messages, max_tokens), batal=batal) as izin:
+            usage = {}
+            mulai = time.perf_counter()
+            yield from groq_client.stream_chat(groq_client.GROQ_API_URL, kunci_api, data, on_usage=usage.update,
+                                               mode=mode, batal=batal)
+            rute.catat(jalur, tingkat, time.perf_counter() - mulai, usage, peran)
+            izin.selesai(usage.get("total_tokens"))
+
+    def hulu(batal_hulu):
+        # Model cadangan dikirim jika model utama terlambat (hedging)
+        penjawab = {}
+        potongan = []
+        for token in rute.lindungi(jalur, lambda tingkat, peran: panggil_api(tingkat, peran, batal_hulu), penjawab):
+            potongan.append(token)
+            yield token
+        if cache is not None and potongan and penjawab.get("tingkat") == rute.tingkat_utama(jalur):
+            cache.set(kunci, "".join(potongan))
+
+    # Permintaan identik yang sedang berjalan di sesi/batch lain ikut membaca stream yang sama
+    yield from penjadwal.bersama(kunci, hulu, batal=batal)
+
+
+def jawab(prompt, jenis="chat", **kwargs):
+    """Versi blocking stream_jawaban: teks lengkap; melempar GroqError jika gagal"""
+    return "".join(stream_jawaban(prompt, jenis=jenis, **kwargs))
@@ -0,0 +1,202 @@
+# Instrumentasi ringan: counter dan histogram per proses
+# Diaktifkan lewat ARKASBUL_METRICS=prometheus|json. Jika tidak diaktifkan semua fungsi
+# langsung kembali sehingga biaya di jalur panas hanya satu pemeriksaan boolean.
+#
+# prometheus: metrik dapat dibaca lewat ekspor_prometheus(), atau di-scrape dari
+#             http://<ARKASBUL_METRICS_HOST>:<ARKASBUL_METRICS_PORT>/metrics jika port di-set
+# json:       setiap observasi juga ditulis sebagai satu baris JSON ke logger "arkasbul.metrik"
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+MODE = os.environ.get("ARKASBUL_METRICS", "").lower()
+AKTIF = MODE in ("prometheus", "json")
+PORT = os.environ.get("ARKASBUL_METRICS_PORT")
+# Alamat bind endpoint metrik; default hanya lokal, set 0.0.0.0 agar dapat di-scrape dari host lain
+HOST = os.environ.get("ARKASBUL_METRICS_HOST", "127.0.0.1")
+PREFIX = "arkasbul_"
+
+# Batas bucket histogram (detik untuk durasi, jumlah untuk token)
+BUCKET_DURASI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BUCKET_TOKEN = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+_BUCKET = {
+    "llm_prompt_tokens": BUCKET_TOKEN,
+    "llm_completion_tokens": BUCKET_TOKEN,
+}
+
+_lock = threading.Lock()
+_counter = {}     # (nama, label) -> nilai
+_histogram = {}   # (nama, label) -> [jumlah per bucket..., sum, count]
+_kolektor = []    # fungsi tanpa argumen yang mengembalikan [(nama, label_dict, nilai)] untuk gauge
+_server = None
+
+_log = logging.getLogger("arkasbul.metrik")
+
+
+def _kunci_label(label):
+    return tuple(sorted(label.items()))
+
+
+def _log_json(jenis, nama, nilai, label):
+    if not _log.handlers and not logging.getLogger().handlers:
+        _log.addHandler(logging.StreamHandler())
+        _log.setLevel(logging.INFO)
+    _log.info(json.dumps({"ts": round(time.time(), 3), "jenis": jenis, "metrik": PREFIX + nama, "nilai": nilai, "label": label}))
+
+
+def tambah(nama, nilai=1, **label):
+    """Tambah counter"""
+    if not AKTIF:
+        return
+    kunci = (nama, _kunci_label(label))
+    with _lock:
+        _counter[kunci] = _counter.get(kunci, 0) + nilai
+    if MODE == "json":
+        _log_json("counter", nama, nilai, label)
+
+
+def amati(nama, nilai, **label):
+    """Catat satu observasi histogram"""
+    if not AKTIF:
+        return
+    bucket = _BUCKET.get(nama, BUCKET_DURASI)
+    kunci = (nama, _kunci_label(label))
+    with _lock:
+        data = _histogram.get(kunci)
+        if data is None:
+            data = _histogram[kunci] = [0] * (len(bucket) + 1) + [0.0, 0]
+        data[bisect_left(bucket, nilai)] += 1
+        data[-2] += nilai
+        data[-1] += 1
+    if MODE == "json":
+        _log_json("histogram", nama, nilai, label)
+
+
+def daftarkan_kolektor(fungsi):
+    """Daftarkan sumber gauge yang dibaca saat ekspor (mis. statistik cache)"""
+    if AKTIF:
+        with _lock:
+            _kolektor.append(fungsi)
+
+
+class _StopwatchNonaktif:
+    def tandai(self, fase):
+        pass
+
+    def selesai(self):
+        pass
+
+
+_STOPWATCH_NONAKTIF = _StopwatchNonaktif()
+
+
+class Stopwatch:
+    """Mencatat durasi tiap fase secara berurutan ke histogram `nama{fase=...}` plus fase total"""
+
+    __slots__ = ("nama", "label", "mulai", "terakhir")
+
+    def __init__(self, nama, **label):
+        self.nama = nama
+        self.label = label
+        self.mulai = self.terakhir = time.perf_counter()
+
+    def tandai(self, fase):
+        sekarang = time.perf_counter()
+        amati(self.nama, sekarang - self.terakhir, fase=fase, **self.label)
+        self.terakhir = sekarang
+
+    def selesai(self):
+        amati(self.nama, time.perf_counter() - self.mulai, fase="total", **self.label)
+
+
+def stopwatch(nama, **label):
+    """Buat Stopwatch, atau objek no-op jika instrumentasi nonaktif"""
+    if not AKTIF:
+        return _STOPWATCH_NONAKTIF
+    return Stopwatch(nama, **label)
+
+
+def _format_label(label, tambahan=()):
+    pasangan = list(label) + list(tambahan)
+    if not pasangan:
+        return ""
+    isi = ",".join(f'{k}="{str(v)}"' for k, v in pasangan)
+    return "{" + isi + "}"
+
+
+def ekspor_prometheus():
+    """Semua metrik dalam format teks eksposisi Prometheus"""
+    baris = []
+    with _lock:
+        counter = dict(_counter)
+        histogram = {k: list(v) for k, v in _histogram.items()}
+        kolektor = list(_kolektor)
+
+    for nama in sorted({n for n, _ in counter}):
+        baris.append(f"# TYPE {PREFIX}{nama} counter")
+        for (n, label), nilai in sorted(counter.items()):
+            if n == nama:
+                baris.append(f"{PREFIX}{nama}{_format_label(label)} {nilai}")
+
+    for nama in sorted({n for n, _ in histogram}):
+        bucket = _BUCKET.get(nama, BUCKET_DURASI)
+        baris.append(f"# TYPE {PREFIX}{nama} histogram")
+        for (n, label), data in sorted(histogram.items()):
+            if n != nama:
+                continue
+            kumulatif = 0
+            for batas, jumlah in zip(list(bucket) + ["+Inf"], data[:-2]):
+                kumulatif += jumlah
+                baris.append(f"{PREFIX}{nama}_bucket{_format_label(label, [('le', batas)])} {kumulatif}")
+            baris.append(f"{PREFIX}{nama}_sum{_format_label(label)} {data[-2]}")
+            baris.append(f"{PREFIX}{nama}_count{_format_label(label)} {data[-1]}")
+
+    gauge = {}
+    for fungsi in kolektor:
+        for nama, label, nilai in fungsi():
+            gauge.setdefault(nama, []).append((_kunci_label(label), nilai))
+    for nama in sorted(gauge):
+        baris.append(f"# TYPE {PREFIX}{nama} gauge")
+        for label, nilai in gauge[nama]:
+            baris.append(f"{PREFIX}{nama}{_format_label(label)} {nilai}")
+
+    return "\n".join(baris) + "\n"
+
+
+def mulai_server():
+    """Jalankan endpoint /metrics di thread latar (sekali per proses) jika ARKASBUL_METRICS_PORT di-set"""
+    global _server
+    if not AKTIF or not PORT or _server is not None:
+        return
+    # http.server hanya dimuat jika endpoint memang dijalankan
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _HandlerMetrik(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = ekspor_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _lock:
+        if _server is not None:
+            return
+        try:
+            _server = ThreadingHTTPServer((HOST, int(PORT)), _HandlerMetrik)
+        except OSError as e:
+            # Port dipakai proses lain (mis. beberapa worker di satu host); metrik tetap dicatat
+            _log.warning("Endpoint metrik tidak dapat dijalankan di %s:%s: %s", HOST, PORT, e)
+            return
+    threading.Thread(target=_server.serve_forever, name="arkasbul-metrik", daemon=True).start()
@@ -0,0 +1,163 @@
+# Saran alokasi lokal: alokasi terdekat yang masuk rentang rujukan dan tidak melebihi pendapatan
+#
+# Untuk setiap rumah tangga dicari x yang meminimalkan sum(bobot * (x - pengeluaran)^2) dengan
+# batas rentang_min <= x/gaji*100 <= rentang_max dan sum(x) <= anggaran (gaji, opsional + insentif).
+# Solusinya x = clip(pengeluaran - lambda/bobot, batas_bawah, batas_atas) dengan lambda >= 0 terkecil
+# yang memenuhi anggaran. Total sebagai fungsi lambda linear per potong dengan paling banyak 14 titik
+# patah, sehingga lambda didapat tepat dari titik patah terurut tanpa iterasi; N baris sekaligus.
+from collections import namedtuple
+
+import numpy as np
+
+from arkasbul.kategori import RENTANG_MIN, RENTANG_MAX, JUMLAH_KATEGORI
+
+# Kategori yang secara default dipertahankan (indeks): cicilan biasanya terikat kontrak
+KATEGORI_TETAP = (1,)
+
+# Bobot default per kategori; bobot lebih besar = kategori lebih dipertahankan mendekati nilai semula
+BOBOT = (1.0,) * JUMLAH_KATEGORI
+
+HasilOptimasi = namedtuple("HasilOptimasi", [
+    "saran",        # (N, 7) alokasi yang disarankan, rupiah penuh
+    "selisih",      # (N, 7) saran - pengeluaran
+    "persentase",   # (N, 7) saran terhadap gaji
+    "anggaran",     # (N,) batas total (gaji, atau gaji + insentif)
+    "sisa",         # (N,) anggaran - total saran
+    "layak",        # (N,) bool, semua kategori yang tidak tetap masuk rentang dan total <= anggaran (sebelum pembulatan)
+])
+
+# Saran untuk satu pengguna dengan tipe Python biasa (disimpan di session state / dikirim ke prompt)
+SaranAlokasi = namedtuple("SaranAlokasi", ["saran", "selisih", "persentase", "anggaran", "sisa", "layak", "tetap"])
+
+
+def _proyeksi(awal, bawah, atas, langkah, anggaran):
+    """x = clip(awal - lambda * langkah, bawah, atas) dengan lambda >= 0 terkecil sehingga sum(x) <= anggaran
+
+    Kembalikan (x, cukup); cukup False jika batas bawah sendiri sudah melebihi anggaran
+    (x berisi pengurangan maksimum).
+    """
+    aktif = langkah > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        titik = np.concatenate([
+            np.where(aktif, (awal - atas) / langkah, 0.0),
+            np.where(aktif, (awal - bawah) / langkah, 0.0),
+        ], axis=1)
+    titik = np.sort(np.maximum(titik, 0.0), axis=1)
+    titik = np.concatenate([np.zeros((len(titik), 1)), titik], axis=1)
+
+    # Total di setiap titik patah (menurun terhadap lambda)
+    total = np.stack([
+        np.clip(awal - titik[:, k, None] * langkah, bawah, atas).sum(axis=1)
+        for k in range(titik.shape[1])
+    ], axis=1)
+    toleransi = 1e-9 * np.maximum(np.abs(anggaran), 1.0)
+    memenuhi = total <= (anggaran + toleransi)[:, None]
+    cukup = memenuhi[:, -1]
+
+    # Potongan pertama yang memenuhi anggaran, lalu interpolasi linear di dalam potongan itu
+    k = np.where(cukup, np.argmax(memenuhi, axis=1), titik.shape[1] - 1)
+    baris = np.arange(len(titik))
+    sebelum = np.maximum(k - 1, 0)
+    t0, t1 = titik[baris, sebelum], titik[baris, k]
+    f0, f1 = total[baris, sebelum], total[baris, k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lamda = np.where((k > 0) & cukup & (f0 > f1), t0 + (f0 - anggaran) / (f0 - f1) * (t1 - t0), t1)
+    return np.clip(awal - lamda[:, None] * langkah, bawah, atas), cukup
+
+
+def optimasi_alokasi(gaji, insentif, pengeluaran, tetap=None, bobot=BOBOT,
+                     rentang_min=RENTANG_MIN, rentang_max=RENTANG_MAX, sertakan_insentif=False):
+    """Saran alokasi terdekat di dalam rentang rujukan untuk N rumah tangga sekaligus
+
+    gaji dan insentif boleh skalar atau vektor (N,); pengeluaran berbentuk (N, 7) atau (7,).
+    tetap: mask bool (7,) atau (N, 7) kategori yang dipertahankan apa adanya (default KATEGORI_TETAP).
+    bobot: (7,) atau (N, 7), makin besar makin sedikit kategori tersebut diubah.
+    Jika pengeluaran tetap terlalu besar sehingga rentang tidak mungkin dipenuhi, batas bawah
+    kategori lain diperkecil secara proporsional dan layak bernilai False.
+    """
+    pengeluaran = np.atleast_2d(np.asarray(pengeluaran, dtype=np.float64))
+    if pengeluaran.shape[1] != len(rentang_min):
+        raise ValueError(f"Pengeluaran harus memiliki {len(rentang_min)} kolom kategori, bukan {pengeluaran.shape[1]}")
+    n = pengeluaran.shape[0]
+    gaji = np.broadcast_to(np.asarray(gaji, dtype=np.float64), (n,))
+    insentif = np.broadcast_to(np.asarray(insentif, dtype=np.float64), (n,))
+    if tetap is None:
+        tetap = np.isin(np.arange(len(rentang_min)), KATEGORI_TETAP)
+    tetap = np.broadcast_to(np.asarray(tetap, dtype=bool), pengeluaran.shape)
+    bobot = np.broadcast_to(np.asarray(bobot, dtype=np.float64), pengeluaran.shape)
+    if np.any(bobot <= 0):
+        raise ValueError("Bobot harus lebih besar dari 0")
+
+    gaji_aman = np.maximum(gaji, 0.0)[:, None]
+    bawah = np.where(tetap, pengeluaran, np.asarray(rentang_min, dtype=np.float64) * gaji_aman / 100)
+    atas = np.where(tetap, pengeluaran, np.asarray(rentang_max, dtype=np.float64) * gaji_aman / 100)
+    langkah = np.where(tetap, 0.0, 1.0 / bobot)
+    anggaran = np.maximum(gaji + insentif if sertakan_insentif else gaji, 0.0)
+
+    x, cukup = _proyeksi(pengeluaran, bawah, atas, langkah, anggaran)
+    if not cukup.all():
+        # Rentang tidak dapat dipenuhi karena pengeluaran tetap terlalu besar: batas bawah kategori
+        # lain diperkecil secara proporsional sehingga totalnya sama dengan sisa anggaran
+        ulang = ~cukup
+        bawah_bebas = np.where(tetap[ulang], 0.0, bawah[ulang])
+        sisa_bebas = np.maximum(anggaran[ulang] - np.where(tetap[ulang], pengeluaran[ulang], 0.0).sum(axis=1), 0.0)
+        jumlah_bawah = bawah_bebas.sum(axis=1)
+        skala = np.where(jumlah_bawah > 0, sisa_bebas / np.where(jumlah_bawah > 0, jumlah_bawah, 1.0), 0.0)
+        x[ulang], _ = _proyeksi(pengeluaran[ulang], np.where(tetap[ulang], pengeluaran[ulang], bawah_bebas * skala[:, None]),
+                                atas[ulang], langkah[ulang], anggaran[ulang])
+
+    # Kelayakan dinilai dari solusi sebelum pembulatan
+    toleransi = 1e-9 * np.maximum(gaji_aman, 1.0)
+    dalam_rentang = tetap | ((x >= bawah - toleransi) & (x <= atas + toleransi))
+    layak = cukup & (x.sum(axis=1) <= anggaran + toleransi[:, 0]) & dalam_rentang.all(axis=1)
+
+    # Rupiah penuh: dibulatkan ke bawah, tetapi tidak di bawah batas bawah yang dibulatkan ke atas
+    bawah_bulat = np.ceil(bawah - 1e-6)
+    saran = np.floor(x + 1e-6)
+    saran = np.where(cukup[:, None] & ~tetap, np.maximum(saran, bawah_bulat), saran)
+    saran = np.where(tetap, pengeluaran, saran)
+    # Kelebihan 1-2 rupiah akibat pembulatan ke atas diambil dari kategori yang masih di atas batas
+    # bawahnya; jika tidak ada, dari kategori di batas bawah (kurang dari 1 rupiah per kategori)
+    lebih = np.where(cukup, np.maximum(np.ceil(saran.sum(axis=1) - anggaran - 1e-6), 0.0), 0.0)
+    if lebih.any():
+        for batas in (bawah_bulat, np.zeros_like(bawah_bulat)):
+            for j in range(saran.shape[1]):
+                ambil = np.minimum(lebih, np.where(tetap[:, j], 0.0, np.maximum(saran[:, j] - batas[:, j], 0.0)))
+                saran[:, j] -= ambil
+                lebih -= ambil
+
+    gaji_kolom = np.where(gaji > 0, gaji, 1.0)[:, None]
+    persentase = np.where(gaji[:, None] > 0, saran / gaji_kolom * 100, 0.0)
+    sisa = anggaran - saran.sum(axis=1)
+    return HasilOptimasi(
+        saran=saran,
+        selisih=saran - pengeluaran,
+        persentase=persentase,
+        anggaran=anggaran,
+        sisa=sisa,
+        layak=layak,
+    )
+
+
+def baris_saran(hasil, baris=0, tetap=None):
+    """Ambil SaranAlokasi satu baris dari HasilOptimasi"""
+    if tetap is None:
+        tetap = KATEGORI_TETAP
+    return SaranAlokasi(
+        saran=tuple(int(v) for v in hasil.saran[baris]),
+        selisih=tuple(int(v) for v in hasil.selisih[baris]),
+        persentase=tuple(hasil.persentase[baris].tolist()),
+        anggaran=int(hasil.anggaran[baris]),
+        sisa=int(hasil.sisa[baris]),
+        layak=bool(hasil.layak[baris]),
+        tetap=tuple(sorted(int(j) for j in tetap)),
+    )
+
+
+def saran_alokasi(hasil, tetap=KATEGORI_TETAP, bobot=BOBOT, sertakan_insentif=False):
+    """Saran alokasi untuk satu AnalysisResult; tetap berupa indeks kategori yang dipertahankan"""
+    tetap = tuple(tetap)
+    mask = np.isin(np.arange(JUMLAH_KATEGORI), tetap)
+    optimasi = optimasi_alokasi(hasil.gaji, hasil.insentif, hasil.pengeluaran, tetap=mask, bobot=bobot,
+                                sertakan_insentif=sertakan_insentif)
+    return baris_saran(optimasi, 0, tetap)
@@ -0,0 +1,366 @@
+# Penjadwal panggilan LLM per proses
+# Semua sesi berbagi satu GROQ_API_KEY, sehingga kuota requests/menit (RPM) dan tokens/menit (TPM)
+# dijaga di satu tempat dengan token bucket. Permintaan menunggu di antrian prioritas
+# (Analisa didahulukan dari chat) dengan batas waktu tunggu; permintaan yang diperkirakan
+# tidak akan dilayani sebelum batas waktunya langsung ditolak agar halaman bisa memakai fallback.
+# Permintaan identik yang sedang berjalan digabung (single-flight) menjadi satu panggilan API.
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from arkasbul import metrik
+from arkasbul.groq_client import JEDA_CEK_BATAL, GroqBatalError, GroqError, periksa_batal
+
+# Kuota provider; 0 berarti tidak dibatasi
+RPM = float(os.environ.get("ARKASBUL_RPM", "30"))
+TPM = float(os.environ.get("ARKASBUL_TPM", "60000"))
+# Token completion yang dicadangkan per permintaan; dikoreksi dengan usage sebenarnya setelah selesai
+ESTIMASI_COMPLETION = int(os.environ.get("ARKASBUL_TPM_COMPLETION_ESTIMATE", "1024"))
+
+# Prioritas: angka kecil dilayani lebih dulu
+PRIORITAS_ANALISA = 0
+PRIORITAS_CHAT = 1
+NAMA_PRIORITAS = {PRIORITAS_ANALISA: "analisa", PRIORITAS_CHAT: "chat"}
+
+# Batas lama menunggu di antrian per prioritas (detik)
+BATAS_TUNGGU = {
+    PRIORITAS_ANALISA: float(os.environ.get("ARKASBUL_QUEUE_WAIT_ANALISA", "20")),
+    PRIORITAS_CHAT: float(os.environ.get("ARKASBUL_QUEUE_WAIT_CHAT", "10")),
+}
+
+
+class GroqShedError(GroqError):
+    """Permintaan ditolak penjadwal karena kuota tidak akan tersedia sebelum batas waktu tunggu"""
+
+
+class TokenBucket:
+    """Ember token dengan kapasitas satu menit kuota yang terisi ulang merata"""
+
+    def __init__(self, per_menit):
+        self.kapasitas = float(per_menit)
+        self.laju = self.kapasitas / 60.0
+        self.isi = self.kapasitas
+        self.terakhir = time.monotonic()
+
+    def _isi_ulang(self, sekarang):
+        if sekarang > self.terakhir:
+            self.isi = min(self.kapasitas, self.isi + (sekarang - self.terakhir) * self.laju)
+            self.terakhir = sekarang
+
+    def waktu_tunggu(self, jumlah, sekarang):
+        """Detik sampai `jumlah` token tersedia (permintaan lebih besar dari kapasitas dibatasi ke kapasitas)"""
+        if self.laju <= 0:
+            return 0.0
+        self._isi_ulang(sekarang)
+        kurang = min(jumlah, self.kapasitas) - self.isi
+        return kurang / self.laju if kurang > 0 else 0.0
+
+    def ambil(self, jumlah):
+        self.isi -= jumlah
+
+    def sesuaikan(self, selisih):
+        """Kembalikan (positif) atau bebankan (negatif) token setelah pemakaian sebenarnya diketahui"""
+        self.isi = min(self.kapasitas, self.isi + selisih)
+
+
+class Izin:
+    """Hak untuk melakukan satu panggilan API; panggil selesai() dengan token terpakai jika diketahui"""
+
+    __slots__ = ("_penjadwal", "token")
+
+    def __init__(self, penjadwal, token):
+        self._penjadwal = penjadwal
+        self.token = token
+
+    def selesai(self, token_terpakai=None):
+        if token_terpakai is not None and self._penjadwal._tpm is not None:
+            with self._penjadwal._cond:
+                self._penjadwal._tpm.sesuaikan(self.token - token_terpakai)
+                self._penjadwal._cond.notify_all()
+        self._penjadwal = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._penjadwal is not None:
+            self.selesai()
+
+
+class Penjadwal:
+    """Antrian prioritas di depan token bucket RPM dan TPM"""
+
+    def __init__(self, rpm=RPM, tpm=TPM, batas_tunggu=None):
+        self._rpm = TokenBucket(rpm) if rpm > 0 else None
+        self._tpm = TokenBucket(tpm) if tpm > 0 else None
+        self.batas_tunggu = dict(BATAS_TUNGGU if batas_tunggu is None else batas_tunggu)
+        self._cond = threading.Condition()
+        self._antrian = []  # heap [prioritas, urutan, token]
+        self._urutan = itertools.count()
+
+    def _waktu_tunggu(self, jumlah_permintaan, jumlah_token, sekarang):
+        tunggu = 0.0
+        if self._rpm is not None:
+            tunggu = self._rpm.waktu_tunggu(jumlah_permintaan, sekarang)
+        if self._tpm is not None:
+            tunggu = max(tunggu, self._tpm.waktu_tunggu(jumlah_token, sekarang))
+        return tunggu
+
+    def _tolak(self, entri, sebab):
+        nama = NAMA_PRIORITAS.get(entri[0], str(entri[0]))
+        metrik.tambah("penjadwal_shed_total", prioritas=nama, sebab=sebab)
+        return GroqShedError("Error: layanan AI sedang sibuk, silakan coba beberapa saat lagi")
+
+    def izin(self, prioritas, token, batas_tunggu=..., batal=None):
+        """Tunggu giliran dan kuota; kembalikan Izin atau lempar GroqShedError
+
+        batas_tunggu: detik; default sesuai prioritas, None berarti menunggu tanpa batas.
+        batal: objek dengan is_set(); jika di-set selama menunggu, antrian ditinggalkan dengan GroqBatalError.
+        """
+        if batas_tunggu is ...:
+            batas_tunggu = self.batas_tunggu.get(prioritas)
+        mulai = time.monotonic()
+        tenggat = None if batas_tunggu is None else mulai + batas_tunggu
+        entri = [prioritas, next(self._urutan), token]
+
+        with self._cond:
+            # Perkiraan tunggu: semua permintaan berprioritas sama/lebih tinggi yang sudah antri harus dilayani dulu
+            di_depan = [e for e in self._antrian if e[0] <= prioritas]
+            perkiraan = self._waktu_tunggu(len(di_depan) + 1, sum(e[2] for e in di_depan) + token, mulai)
+            if tenggat is not None and mulai + perkiraan > tenggat:
+                raise self._tolak(entri, "perkiraan")
+
+            heapq.heappush(self._antrian, entri)
+            try:
+                while True:
+                    periksa_batal(batal)
+                    sekarang = time.monotonic()
+                    if self._antrian[0] is entri:
+                        tunggu = self._waktu_tunggu(1, token, sekarang)
+                        if tunggu <= 0:
+                            heapq.heappop(self._antrian)
+                            if self._rpm is not None:
+                                self._rpm.ambil(1)
+                            if self._tpm is not None:
+                                self._tpm.ambil(token)
+                            self._cond.notify_all()
+                            break
+                    else:
+                        tunggu = None
+                    if tenggat is not None:
+                        sisa = tenggat - sekarang
+                        if sisa <= 0:
+                            raise self._tolak(entri, "tenggat")
+                        tunggu = sisa if tunggu is None else min(tunggu, sisa)
+                    if batal is not None:
+                        tunggu = JEDA_CEK_BATAL if tunggu is None else min(tunggu, JEDA_CEK_BATAL)
+                    self._cond.wait(tunggu)
+            except BaseException:
+                if entri in self._antrian:
+                    self._antrian.remove(entri)
+                    heapq.heapify(self._antrian)
+                    self._cond.notify_all()
+                raise
+
+        metrik.amati("penjadwal_tunggu_seconds", time.monotonic() - mulai, prioritas=NAMA_PRIORITAS.get(prioritas, str(prioritas)))
+        return Izin(self, token)
+
+    def panjang_antrian(self):
+        with self._cond:
+            return len(self._antrian)
+
+
+def estimasi_token(messages, max_tokens):
+    """Token yang dicadangkan: perkiraan prompt (~4 karakter per token) + completion"""
+    prompt = sum(len(str(m.get("content", ""))) // 4 + 1 for m in messages)
+    return prompt + min(max_tokens, ESTIMASI_COMPLETION)
+
+
+class _Penerbangan:
+    """Satu panggilan API yang hasilnya dibagikan ke semua permintaan identik"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.potongan = []
+        self.selesai = False
+        self.error = None
+        # Jumlah pengikut yang masih membaca (diubah di bawah _penerbangan_lock)
+        self.pengikut = 0
+
+
+_penerbangan = {}
+_penerbangan_lock = threading.Lock()
+
+
+def _siarkan(penerbangan, token):
+    with penerbangan.cond:
+        penerbangan.potongan.append(token)
+        penerbangan.cond.notify_all()
+
+
+def _akhiri(kunci, penerbangan, error=None):
+    """Lepas penerbangan dari daftar dan set hasil akhirnya (selesai atau error) sekali saja"""
+    with _penerbangan_lock:
+        if _penerbangan.get(kunci) is penerbangan:
+            del _penerbangan[kunci]
+    with penerbangan.cond:
+        if not penerbangan.selesai and penerbangan.error is None:
+            if error is None:
+                penerbangan.selesai = True
+            else:
+                penerbangan.error = error
+        penerbangan.cond.notify_all()
+
+
+def _tinggalkan(kunci, penerbangan):
+    """Pembaca terakhir pergi: hentikan penerbangan jika tidak ada pengikut. True jika dihentikan"""
+    with _penerbangan_lock:
+        if penerbangan.pengikut > 0:
+            return False
+        # Dihapus selagi lock dipegang sehingga permintaan baru tidak ikut penerbangan yang dihentikan
+        if _penerbangan.get(kunci) is penerbangan:
+            del _penerbangan[kunci]
+    _akhiri(kunci, penerbangan, GroqBatalError())
+    return True
+
+
+def _pompa(kunci, penerbangan, hulu):
+    """Lanjutkan stream pemimpin yang dibatalkan di thread latar selama masih ada pengikut"""
+    try:
+        for token in hulu:
+            _siarkan(penerbangan, token)
+            if _tinggalkan(kunci, penerbangan):
+                return
+        _akhiri(kunci, penerbangan)
+    except Exception as e:
+        _akhiri(kunci, penerbangan, e)
+    finally:
+        hulu.close()
+
+
+class _BatalHulu:
+    """Pembatalan panggilan hulu: berlaku jika pemimpin dibatalkan dan tidak ada pengikut yang masih membaca"""
+
+    def __init__(self, batal, penerbangan):
+        self._batal = batal
+        self._penerbangan = penerbangan
+
+    def is_set(self):
+        return self._batal.is_set() and self._penerbangan.pengikut == 0
+
+
+def _pimpin(kunci, penerbangan, buat_generator, batal):
+    hulu = None
+    try:
+        hulu = buat_generator(None if batal is None else _BatalHulu(batal, penerbangan))
+        for token in hulu:
+            _siarkan(penerbangan, token)
+            yield token
+        _akhiri(kunci, penerbangan)
+    except GeneratorExit:
+        # Pemimpin dibatalkan (mis. tugasnya digantikan): pengikut yang masih membaca tetap
+        # menerima stream lengkap; panggilan API hanya dihentikan jika tidak ada pengikut
+        if hulu is not None and not _tinggalkan(kunci, penerbangan):
+            metrik.tambah("llm_coalesced_dilepas_total")
+            threading.Thread(target=_pompa, args=(kunci, penerbangan, hulu),
+                             name="arkasbul-singleflight", daemon=True).start()
+            hulu = None
+        raise
+    except BaseException as e:
+        _akhiri(kunci, penerbangan, e if isinstance(e, Exception) else GroqBatalError())
+        raise
+    finally:
+        if hulu is not None:
+            hulu.close()
+            # Pengaman (no-op jika sudah berakhir): pengikut tidak menunggu penerbangan yang tidak dijalankan lagi
+            _akhiri(kunci, penerbangan, GroqBatalError())
+
+
+def _ikuti(penerbangan, batal):
+    i = 0
+    while True:
+        with penerbangan.cond:
+            while i >= len(penerbangan.potongan) and not penerbangan.selesai and penerbangan.error is None:
+                periksa_batal(batal)
+                penerbangan.cond.wait(None if batal is None else JEDA_CEK_BATAL)
+            baru = penerbangan.potongan[i:]
+            selesai = penerbangan.selesai
+            error = penerbangan.error
+        for token in baru:
+            yield token
+        i += len(baru)
+        if not baru:
+            if selesai:
+                return
+            if error is not None:
+                # Exception baru per pengikut: objek exception pemimpin tidak dibagi antar thread
+                raise GroqError(str(error) if isinstance(error, GroqError) else f"Error: {error}")
+
+
+class _Pengikut:
+    """Iterator pengikut penerbangan; terhitung di penerbangan.pengikut sejak dibuat
+
+    Dilepas tepat sekali saat stream habis, gagal, ditutup, atau objeknya dibuang tanpa pernah
+    dibaca (generator yang belum dimulai tidak menjalankan blok finally-nya).
+    """
+
+    def __init__(self, penerbangan, batal):
+        self._penerbangan = penerbangan
+        self._stream = _ikuti(penerbangan, batal)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._stream)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        self._stream.close()
+        with _penerbangan_lock:
+            if self._penerbangan is None:
+                return
+            self._penerbangan.pengikut -= 1
+            self._penerbangan = None
+
+    __del__ = close
+
+
+def bersama(kunci, buat_generator, batal=None):
+    """Generator potongan teks; permintaan dengan kunci sama yang sedang berjalan berbagi satu panggilan
+
+    Pembaca yang berhenti lebih awal (pemimpin maupun pengikut) tidak menggagalkan pembaca lain.
+    buat_generator(batal_hulu) membuat stream hulu; batal_hulu (None jika batal None) aktif setelah
+    batal pemimpin di-set dan tidak ada pengikut, untuk diteruskan ke penjadwal/groq_client. Pengikut
+    yang batal-nya di-set berhenti menunggu dengan GroqBatalError.
+    """
+    with _penerbangan_lock:
+        penerbangan = _penerbangan.get(kunci)
+        pemimpin = penerbangan is None
+        if pemimpin:
+            penerbangan = _penerbangan[kunci] = _Penerbangan()
+        else:
+            penerbangan.pengikut += 1
+    if pemimpin:
+        return _pimpin(kunci, penerbangan, buat_generator, batal)
+    metrik.tambah("llm_coalesced_total")
+    return _Pengikut(penerbangan, batal)
+
+
+_penjadwal = None
+_penjadwal_lock = threading.Lock()
+
+
+def get_penjadwal():
+    """Ambil penjadwal bersama (dibuat sekali per proses)"""
+    global _penjadwal
+    if _penjadwal is None:
+        with _penjadwal_lock:
+            if _penjadwal is None:
+                _penjadwal = Penjadwal()
+    return _penjadwal
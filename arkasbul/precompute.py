@@ -0,0 +1,110 @@
+# Job offline untuk menghangatkan analisis setiap kelas profil alokasi
+#
+# Contoh:
+#   GROQ_API_KEY=... python -m arkasbul.precompute --workers 8
+#
+# Hasil tiap kelas juga ditulis ke berkas checkpoint (.partial.jsonl) sehingga job
+# yang terputus dapat dilanjutkan tanpa memanggil ulang API untuk kelas yang sudah selesai.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from arkasbul import groq_client, penjadwal, rute
+from arkasbul.profil import BERKAS_PROFIL, buat_prompt_profil, semua_kelas_layak, simpan_berkas
+
+# Analisis profil memakai model rute analisa (lihat arkasbul/rute.py)
+MODEL_NAME = rute.tingkat_utama(rute.RUTE["analisa"]).model
+
+
+def minta_analisis(api_url, api_key, model, kelas, max_tokens=rute.RUTE["analisa"].max_tokens, jadwal=None):
+    """Panggil API untuk satu kelas profil, melempar GroqError jika gagal"""
+    data = {
+        "model": model,
+        "messages": [{"role": "user", "content": buat_prompt_profil(kelas)}],
+        "max_tokens": max_tokens,
+        "temperature": 0.7,
+        "top_p": 0.9
+    }
+    # Worker menunggu kuota RPM/TPM tanpa batas waktu agar job tidak menabrak rate limit
+    with (jadwal or penjadwal.get_penjadwal()).izin(
+        penjadwal.PRIORITAS_ANALISA, penjadwal.estimasi_token(data["messages"], max_tokens), batas_tunggu=None
+    ) as izin:
+        response = groq_client.post_chat(api_url, api_key, data)
+        if response.status_code != 200:
+            raise groq_client.GroqError(f"Error: {response.status_code}, {response.text}")
+        hasil_json = response.json()
+        izin.selesai((hasil_json.get("usage") or {}).get("total_tokens"))
+    return hasil_json["choices"][0]["message"]["content"]
+
+
+def baca_checkpoint(path):
+    """Baca hasil yang sudah selesai dari berkas checkpoint"""
+    hasil = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for baris in f:
+                try:
+                    item = json.loads(baris)
+                except json.JSONDecodeError:
+                    # Baris terakhir bisa terpotong jika job sebelumnya terhenti
+                    continue
+                hasil[item["kelas"]] = item["analisis"]
+    return hasil
+
+
+def jalankan(output, api_url, api_key, model, workers, limit=None, rpm=penjadwal.RPM, tpm=penjadwal.TPM):
+    """Hasilkan analisis untuk semua kelas yang belum ada, lalu tulis berkas terindeks"""
+    checkpoint = output + ".partial.jsonl"
+    hasil = baca_checkpoint(checkpoint)
+    sisa = [k for k in semua_kelas_layak() if k not in hasil]
+    if limit is not None:
+        sisa = sisa[:limit]
+    print(f"{len(hasil)} kelas sudah tersedia, {len(sisa)} kelas akan diproses", file=sys.stderr)
+
+    jadwal = penjadwal.Penjadwal(rpm=rpm, tpm=tpm)
+    gagal = 0
+    mulai = time.monotonic()
+    with open(checkpoint, "a", encoding="utf-8") as cp, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(minta_analisis, api_url, api_key, model, k, jadwal=jadwal): k for k in sisa}
+        for i, future in enumerate(as_completed(futures), 1):
+            kelas = futures[future]
+            try:
+                analisis = future.result()
+            except Exception as e:
+                gagal += 1
+                print(f"Kelas {kelas} gagal: {e}", file=sys.stderr)
+                continue
+            hasil[kelas] = analisis
+            cp.write(json.dumps({"kelas": kelas, "analisis": analisis}, ensure_ascii=False) + "\n")
+            cp.flush()
+            if i % 500 == 0:
+                print(f"{i}/{len(sisa)} selesai ({time.monotonic() - mulai:.0f} detik)", file=sys.stderr)
+
+    simpan_berkas(output, hasil)
+    print(f"{len(hasil)} analisis ditulis ke {output}, {gagal} gagal", file=sys.stderr)
+    return gagal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute analisis untuk setiap kelas profil alokasi dana")
+    parser.add_argument("--output", default=BERKAS_PROFIL, help="Berkas tujuan (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=4, help="Jumlah panggilan API paralel (default: %(default)s)")
+    parser.add_argument("--limit", type=int, default=None, help="Batasi jumlah kelas yang diproses pada run ini")
+    parser.add_argument("--api-url", default=groq_client.GROQ_API_URL, help="Endpoint chat completions (default: %(default)s)")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--rpm", type=float, default=penjadwal.RPM, help="Kuota requests per menit, 0 = tanpa batas (default: %(default)s)")
+    parser.add_argument("--tpm", type=float, default=penjadwal.TPM, help="Kuota tokens per menit, 0 = tanpa batas (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("GROQ_API_KEY")
+    if not api_key:
+        parser.error("GROQ_API_KEY belum di-set")
+    gagal = jalankan(args.output, args.api_url, api_key, args.model, args.workers, args.limit, args.rpm, args.tpm)
+    return 1 if gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# Kelas profil alokasi dan berkas analisis yang dihitung sebelumnya (precomputed)
+# Kelas profil = status tiap kategori (di bawah/sesuai/melebihi rentang) x kelompok gaji x defisit.
+import mmap
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from arkasbul import AKAR
+from arkasbul.kategori import KATEGORI, RENTANG, RENTANG_MIN, RENTANG_MAX, JUMLAH_KATEGORI
+
+# Status per kategori, dipakai sebagai digit basis 3
+DI_BAWAH, SESUAI, MELEBIHI = 0, 1, 2
+LABEL_STATUS = ["di bawah rentang rujukan", "sesuai rentang rujukan", "melebihi rentang rujukan"]
+
+# Kelompok gaji: batas bawah tiap kelompok (Rp)
+BATAS_GAJI = [0, 5000000, 10000000, 20000000]
+LABEL_GAJI = [
+    "di bawah Rp 5.000.000",
+    "Rp 5.000.000 - Rp 10.000.000",
+    "Rp 10.000.000 - Rp 20.000.000",
+    "di atas Rp 20.000.000"
+]
+
+JUMLAH_STATUS = 3 ** JUMLAH_KATEGORI
+JUMLAH_KELAS = JUMLAH_STATUS * len(BATAS_GAJI) * 2
+
+_PANGKAT_3 = 3 ** np.arange(JUMLAH_KATEGORI)
+
+# Format berkas: magic, jumlah entri, lalu indeks (kelas, offset, panjang) terurut, lalu teks terkompresi zlib
+_MAGIC = b"ARKP1\0"
+_HEADER = struct.Struct("<6sI")
+_INDEKS = np.dtype([("kelas", "<u4"), ("offset", "<u8"), ("panjang", "<u4")])
+
+BERKAS_PROFIL = os.environ.get("ARKASBUL_PRECOMPUTED", os.path.join(AKAR, "data", "analisis_profil.bin"))
+
+
+def kelas_profil(hasil):
+    """Hitung id kelas profil (N,) dari HasilAlokasi atau AnalysisResult"""
+    items_dibawah = np.atleast_2d(np.asarray(hasil.items_dibawah, dtype=bool))
+    items_melebihi = np.atleast_2d(np.asarray(hasil.items_melebihi, dtype=bool))
+    status = np.full(items_dibawah.shape, SESUAI, dtype=np.int64)
+    status[items_dibawah] = DI_BAWAH
+    status[items_melebihi] = MELEBIHI
+    kode_status = status @ _PANGKAT_3
+    kelompok_gaji = np.searchsorted(BATAS_GAJI, np.atleast_1d(hasil.gaji), side="right") - 1
+    kelompok_gaji = np.clip(kelompok_gaji, 0, len(BATAS_GAJI) - 1)
+    defisit = np.atleast_1d(np.asarray(hasil.defisit, dtype=np.int64))
+    return (kode_status * len(BATAS_GAJI) + kelompok_gaji) * 2 + defisit
+
+
+def uraikan_kelas(kelas):
+    """Kebalikan kelas_profil: (daftar status per kategori, kelompok gaji, defisit)"""
+    kelas = int(kelas)
+    defisit = bool(kelas % 2)
+    kelas //= 2
+    kelompok_gaji = kelas % len(BATAS_GAJI)
+    kode_status = kelas // len(BATAS_GAJI)
+    status = [(kode_status // 3 ** j) % 3 for j in range(JUMLAH_KATEGORI)]
+    return status, kelompok_gaji, defisit
+
+
+def semua_kelas_layak():
+    """Semua id kelas yang mungkin terjadi (defisit/tidak defisit harus bisa dicapai oleh status kategorinya)"""
+    status = (np.arange(JUMLAH_STATUS)[:, None] // _PANGKAT_3) % 3
+    rentang_min = np.asarray(RENTANG_MIN, dtype=np.float64)
+    rentang_max = np.asarray(RENTANG_MAX, dtype=np.float64)
+
+    # Total persentase terkecil dan terbesar yang bisa dicapai tiap kombinasi status
+    bawah = np.select([status == DI_BAWAH, status == SESUAI], [0.0, rentang_min], rentang_max).sum(axis=1)
+    atas = np.select([status == DI_BAWAH, status == SESUAI], [rentang_min, rentang_max], np.inf).sum(axis=1)
+    bisa_aman = bawah < 100
+    bisa_defisit = atas > 100
+
+    kelas = []
+    for kode in range(JUMLAH_STATUS):
+        for kelompok_gaji in range(len(BATAS_GAJI)):
+            dasar = (kode * len(BATAS_GAJI) + kelompok_gaji) * 2
+            if bisa_aman[kode]:
+                kelas.append(dasar)
+            if bisa_defisit[kode]:
+                kelas.append(dasar + 1)
+    return kelas
+
+
+def buat_prompt_profil(kelas):
+    """Prompt analisis kanonik untuk satu kelas profil, tanpa angka rupiah spesifik pengguna"""
+    status, kelompok_gaji, defisit = uraikan_kelas(kelas)
+    prompt = f"""
+        Analisis keuangan untuk profil pengguna berikut:
+
+        Rentang gaji bulanan: {LABEL_GAJI[kelompok_gaji]}
+        Total pengeluaran: {"melebihi gaji bulanan" if defisit else "tidak melebihi gaji bulanan"}
+
+        Status alokasi dana per kategori:
+        """
+    for kat, rujukan, s in zip(KATEGORI, RENTANG, status):
+        prompt += f"- {kat} (rujukan: {rujukan}): {LABEL_STATUS[s]}\n"
+
+    prompt += """
+        Berikan analisis singkat tentang alokasi keuangan ini dan saran untuk perbaikan.
+        Fokus pada item yang melebihi atau di bawah rentang rujukan jika ada.
+        Berikan juga saran pemanfaatan insentif/lembur yang optimal.
+        Jangan menyebutkan angka rupiah tertentu karena analisis ini berlaku untuk semua pengguna dengan profil yang sama.
+        Berikan jawaban dalam Bahasa Indonesia.
+        """
+    return prompt
+
+
+def simpan_berkas(path, analisis_per_kelas):
+    """Tulis dict {kelas: teks} ke berkas terindeks"""
+    kelas_urut = sorted(analisis_per_kelas)
+    blob = [zlib.compress(analisis_per_kelas[k].encode("utf-8"), 9) for k in kelas_urut]
+    indeks = np.zeros(len(kelas_urut), dtype=_INDEKS)
+    offset = _HEADER.size + indeks.nbytes
+    for i, (k, b) in enumerate(zip(kelas_urut, blob)):
+        indeks[i] = (k, offset, len(b))
+        offset += len(b)
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    sementara = path + ".tmp"
+    with open(sementara, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(kelas_urut)))
+        f.write(indeks.tobytes())
+        for b in blob:
+            f.write(b)
+    os.replace(sementara, path)
+
+
+class BerkasProfil:
+    """Pembaca berkas analisis precomputed; hanya indeks yang dimuat, teks didekompresi saat diminta"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, jumlah = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Berkas {path} bukan berkas analisis profil")
+        self._indeks = np.frombuffer(self._mmap, dtype=_INDEKS, count=jumlah, offset=_HEADER.size)
+
+    def __len__(self):
+        return len(self._indeks)
+
+    def __contains__(self, kelas):
+        return self._cari(kelas) is not None
+
+    def _cari(self, kelas):
+        i = np.searchsorted(self._indeks["kelas"], kelas)
+        if i < len(self._indeks) and self._indeks["kelas"][i] == kelas:
+            return i
+        return None
+
+    def get(self, kelas, default=None):
+        """Ambil teks analisis untuk satu kelas"""
+        i = self._cari(kelas)
+        if i is None:
+            return default
+        _, offset, panjang = self._indeks[i]
+        return zlib.decompress(self._mmap[offset:offset + panjang]).decode("utf-8")
+
+    def kelas(self):
+        """Daftar id kelas yang tersedia"""
+        return self._indeks["kelas"].tolist()
+
+
+def muat_berkas(path=BERKAS_PROFIL):
+    """Buka berkas analisis precomputed, None jika belum dibuat"""
+    if not path or not os.path.exists(path):
+        return None
+    return BerkasProfil(path)
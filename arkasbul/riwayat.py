@@ -0,0 +1,341 @@
+# Riwayat arus kas multi-bulan dari berkas CSV/Excel
+# Berkas dibaca per potongan (chunk); yang disimpan hanya total per (bulan, kategori), sehingga
+# memori tetap terbatas berapa pun jumlah baris transaksinya. Persentase, rata-rata bergulir dan
+# tren per bulan dihitung sekaligus (vektorisasi) lewat mesin alokasi.
+import csv
+import os
+import re
+import zipfile
+from collections import namedtuple
+from xml.etree.ElementTree import ParseError
+
+import numpy as np
+import pandas as pd
+
+from arkasbul.engine import hitung_alokasi
+from arkasbul.kategori import KATEGORI, JUMLAH_KATEGORI
+from arkasbul.rupiah import parse_rupiah
+
+UKURAN_CHUNK = int(os.environ.get("ARKASBUL_CHUNK_ROWS", "100000"))
+
+# Kode baris: 0..6 = kategori pengeluaran, lalu pemasukan
+KODE_GAJI = JUMLAH_KATEGORI
+KODE_INSENTIF = JUMLAH_KATEGORI + 1
+JUMLAH_KODE = JUMLAH_KATEGORI + 2
+KODE_TIDAK_DIKENAL = -1
+
+# Nama kolom yang dikenali (huruf kecil, tanpa spasi di tepi)
+ALIAS_KOLOM = {
+    "tanggal": ("tanggal", "tgl", "date", "tanggal transaksi", "transaction date", "bulan", "periode", "month"),
+    "kategori": ("kategori", "category", "jenis", "pos", "item"),
+    "jumlah": ("jumlah", "nominal", "amount", "nilai", "mutasi", "debit", "rupiah"),
+    "keterangan": ("keterangan", "deskripsi", "description", "uraian", "catatan", "memo", "berita"),
+    # Opsional: kolom kredit terpisah (jumlah = debit) atau penanda arah per baris (D/K, DB/CR)
+    "kredit": ("kredit", "credit"),
+    "arah": ("d/k", "db/cr", "dk", "arah"),
+}
+
+# Kata kunci untuk memetakan kategori/keterangan bebas; dicek berurutan, pemasukan lebih dulu.
+# Dicocokkan sebagai kata utuh ("art" tidak cocok dengan "partner", "air" tidak dengan "airasia")
+KATA_KUNCI = [
+    (KODE_GAJI, ("gaji", "salary", "payroll", "pendapatan", "penghasilan")),
+    (KODE_INSENTIF, ("insentif", "lembur", "bonus", "overtime", "thr")),
+    (3, ("keranjang aman", "dana darurat", "darurat", "emergency")),
+    (0, ("investasi", "tabungan", "nabung", "saham", "reksadana", "reksa dana", "deposito", "emas", "logam mulia", "obligasi")),
+    (1, ("cicilan", "pinjaman", "kredit", "kpr", "asuransi", "premi", "arisan", "angsuran", "paylater", "hutang", "utang")),
+    (4, ("zakat", "infaq", "infak", "sedekah", "sumbangan", "donasi", "perpuluhan", "sosial")),
+    (5, ("pendidikan", "sekolah", "kuliah", "spp", "sks", "les", "bimba", "kursus", "buku")),
+    (6, ("gaya hidup", "hidup gaya", "hiburan", "kafe", "cafe", "nongkrong", "hobi", "hobby", "liburan", "bioskop", "langganan")),
+    (2, ("rumah tangga", "listrik", "pln", "air", "pdam", "iuran", "makan", "belanja", "transport", "bensin", "pulsa", "internet", "gas", "art")),
+]
+
+_POLA_KATA_KUNCI = [
+    (kode, re.compile(r"\b(?:" + "|".join(re.escape(k) for k in kata) + r")\b")) for kode, kata in KATA_KUNCI
+]
+_NAMA_KATEGORI = {k.lower(): i for i, k in enumerate(KATEGORI)}
+# Penanda arah kredit (uang masuk); selain itu dianggap debit
+_POLA_KREDIT = r"^\s*(?:k|c|cr|kr|kredit|credit)\s*$"
+_ANGKA_ISO = re.compile(r"^\s*\d{4}")
+
+RiwayatArusKas = namedtuple("RiwayatArusKas", [
+    "bulan",        # list label "YYYY-MM" (M,), terurut
+    "gaji",         # (M,) gaji per bulan (gaji_default jika bulan itu tanpa baris gaji)
+    "insentif",     # (M,) insentif/lembur per bulan
+    "pengeluaran",  # (M, 7) total pengeluaran per kategori
+    "hasil",        # HasilAlokasi untuk M bulan
+    "statistik",    # dict jumlah baris dibaca/terpetakan/tidak terpetakan/tidak valid
+])
+
+
+def petakan_kategori(teks):
+    """Kode kategori untuk satu nilai teks: nomor 1-7, nama kategori, atau kata kunci"""
+    if teks is None:
+        return KODE_TIDAK_DIKENAL
+    teks = str(teks).strip().lower()
+    if not teks or teks == "nan":
+        return KODE_TIDAK_DIKENAL
+    if teks.isdigit() and 1 <= int(teks) <= JUMLAH_KATEGORI:
+        return int(teks) - 1
+    if teks in _NAMA_KATEGORI:
+        return _NAMA_KATEGORI[teks]
+    for kode, pola in _POLA_KATA_KUNCI:
+        if pola.search(teks):
+            return kode
+    return KODE_TIDAK_DIKENAL
+
+
+def _kode_vektor(kolom, peta):
+    """Petakan kolom teks ke kode; setiap nilai unik hanya dipetakan sekali (peta dibagi antar chunk)"""
+    indeks, unik = pd.factorize(kolom, use_na_sentinel=True)
+    # Elemen terakhir untuk nilai kosong (indeks -1)
+    kode_unik = np.full(len(unik) + 1, KODE_TIDAK_DIKENAL, dtype=np.int64)
+    for i, nilai in enumerate(unik):
+        kode = peta.get(nilai)
+        if kode is None:
+            kode = peta[nilai] = petakan_kategori(nilai)
+        kode_unik[i] = kode
+    return kode_unik[indeks]
+
+
+def _bulan_vektor(kolom):
+    """Kunci bulan (tahun * 12 + bulan - 1) per baris, -1 jika tanggal tidak valid
+
+    Format ISO (2024-01-31) dibaca apa adanya; format lain dianggap hari lebih dulu (31/01/2024).
+    """
+    indeks, unik = pd.factorize(kolom, use_na_sentinel=True)
+    teks = pd.Index(unik).astype(str)
+    iso = np.asarray(teks.str.match(_ANGKA_ISO), dtype=bool)
+    tanggal = pd.Series(pd.NaT, index=range(len(teks)), dtype="datetime64[ns]")
+    if iso.any():
+        tanggal[iso] = pd.to_datetime(teks[iso], errors="coerce", format="mixed")
+    if (~iso).any():
+        tanggal[~iso] = pd.to_datetime(teks[~iso], errors="coerce", format="mixed", dayfirst=True)
+    kunci_unik = (tanggal.dt.year * 12 + tanggal.dt.month - 1).fillna(-1).to_numpy(dtype=np.int64)
+    return np.append(kunci_unik, -1)[indeks]
+
+
+def _jumlah_vektor(df, peta):
+    """Nilai rupiah bertanda per baris ("1.500.000", "-Rp 250.000", "1,5 jt", ...), NaN jika tidak valid
+
+    Kredit bertanda berlawanan dengan debit: kolom kredit terpisah dikurangkan dari kolom jumlah,
+    dan baris berpenanda K/CR di kolom arah dibuat negatif. Arah tiap kode ditentukan di agregasi_bulanan.
+    """
+    nilai = parse_rupiah(df[peta["jumlah"]]).nilai
+    if "kredit" in peta:
+        kredit = parse_rupiah(df[peta["kredit"]]).nilai
+        kosong = np.isnan(nilai) & np.isnan(kredit)
+        nilai = np.nan_to_num(nilai) - np.nan_to_num(kredit)
+        nilai[kosong] = np.nan
+    if "arah" in peta:
+        kredit = np.asarray(df[peta["arah"]].astype(str).str.lower().str.match(_POLA_KREDIT), dtype=bool)
+        nilai = np.where(kredit, -np.abs(nilai), np.abs(nilai))
+    return nilai
+
+
+def cari_kolom(nama_kolom):
+    """Petakan peran kolom (tanggal/kategori/jumlah/keterangan) ke nama kolom di berkas"""
+    normal = {str(n).strip().lower(): n for n in nama_kolom}
+    peta = {}
+    for peran, alias in ALIAS_KOLOM.items():
+        for a in alias:
+            if a in normal:
+                peta[peran] = normal[a]
+                break
+    if "tanggal" not in peta or "jumlah" not in peta or not ({"kategori", "keterangan"} & peta.keys()):
+        raise ValueError(
+            "Kolom tidak dikenali. Berkas harus memiliki kolom tanggal, jumlah, dan kategori atau keterangan "
+            f"(ditemukan: {', '.join(map(str, nama_kolom))})"
+        )
+    return peta
+
+
+# Galat pembaca berkas yang rusak/bukan format yang diharapkan; diubah menjadi ValueError berpesan jelas
+_GALAT_CSV = (csv.Error, UnicodeDecodeError, pd.errors.ParserError, pd.errors.EmptyDataError)
+_GALAT_EXCEL = (zipfile.BadZipFile, KeyError, OSError, ParseError)
+
+
+def _berkas_rusak(jenis, e):
+    return ValueError(f"Berkas {jenis} rusak atau tidak dapat dibaca ({type(e).__name__}: {e})")
+
+
+def _baca_potongan(potongan, jenis, galat):
+    """Iterasi potongan DataFrame; galat baca di tengah berkas diubah menjadi ValueError"""
+    try:
+        yield from potongan
+    except galat as e:
+        raise _berkas_rusak(jenis, e) from e
+
+
+def _potongan_csv(berkas, ukuran_chunk):
+    awal = berkas.read(64 * 1024)
+    berkas.seek(0)
+    if isinstance(awal, bytes):
+        awal = awal.decode("utf-8", errors="replace")
+    try:
+        pemisah = csv.Sniffer().sniff(awal.split("\n", 1)[0], delimiters=",;\t|").delimiter
+    except csv.Error:
+        pemisah = ","
+    try:
+        kolom = pd.read_csv(berkas, sep=pemisah, nrows=0, encoding_errors="replace").columns
+    except _GALAT_CSV as e:
+        raise _berkas_rusak("CSV", e) from e
+    berkas.seek(0)
+    peta = cari_kolom(kolom)
+    with pd.read_csv(
+        berkas, sep=pemisah, usecols=list(peta.values()), dtype=str,
+        chunksize=ukuran_chunk, encoding_errors="replace"
+    ) as pembaca:
+        yield _baca_potongan(pembaca, "CSV", _GALAT_CSV), peta
+
+
+def _potongan_excel(berkas, ukuran_chunk):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("Membaca berkas Excel membutuhkan paket openpyxl (pip install openpyxl)") from e
+    from openpyxl.utils.exceptions import InvalidFileException
+    galat = _GALAT_EXCEL + (InvalidFileException,)
+    try:
+        buku = load_workbook(berkas, read_only=True, data_only=True)
+    except galat as e:
+        raise _berkas_rusak("Excel", e) from e
+    try:
+        try:
+            baris = buku.worksheets[0].iter_rows(values_only=True)
+            header = [str(h) if h is not None else "" for h in next(baris, ())]
+        except (IndexError,) + galat as e:
+            raise _berkas_rusak("Excel", e) from e
+        peta = cari_kolom(header)
+        posisi = [header.index(peta[p]) for p in peta]
+
+        def potongan():
+            kumpulan = []
+            for b in baris:
+                kumpulan.append([b[i] if i < len(b) else None for i in posisi])
+                if len(kumpulan) >= ukuran_chunk:
+                    yield pd.DataFrame(kumpulan, columns=list(peta.values()))
+                    kumpulan = []
+            if kumpulan:
+                yield pd.DataFrame(kumpulan, columns=list(peta.values()))
+
+        yield _baca_potongan(potongan(), "Excel", galat), peta
+    finally:
+        buku.close()
+
+
+def agregasi_bulanan(berkas, nama, ukuran_chunk=UKURAN_CHUNK):
+    """Baca berkas per chunk dan jumlahkan per (bulan, kode)
+
+    berkas: path atau objek file biner (mis. UploadedFile Streamlit); jenis ditentukan dari
+    ekstensi `nama`. Mengembalikan (kunci bulan (M,), total (M, JUMLAH_KODE), statistik).
+
+    Nilai dijumlahkan bertanda. Arah normal tiap kode mengikuti tanda totalnya di seluruh berkas
+    (pengeluaran boleh positif semua atau negatif seperti mutasi bank), sehingga refund dan koreksi
+    yang bertanda berlawanan mengurangi total; total bulanan yang berbalik arah dihitung 0.
+    """
+    if isinstance(berkas, (str, os.PathLike)):
+        with open(berkas, "rb") as f:
+            return agregasi_bulanan(f, nama, ukuran_chunk)
+
+    excel = os.path.splitext(str(nama).lower())[1] in (".xlsx", ".xlsm")
+    sumber = _potongan_excel(berkas, ukuran_chunk) if excel else _potongan_csv(berkas, ukuran_chunk)
+    statistik = {"baris": 0, "terpetakan": 0, "tidak_terpetakan": 0, "tidak_valid": 0}
+    total = pd.Series(dtype=np.float64)
+    peta_kategori = {}
+
+    try:
+        for potongan, peta in sumber:
+            for df in potongan:
+                statistik["baris"] += len(df)
+                bulan = _bulan_vektor(df[peta["tanggal"]])
+                jumlah = _jumlah_vektor(df, peta)
+                if "kategori" in peta:
+                    kode = _kode_vektor(df[peta["kategori"]], peta_kategori)
+                    if "keterangan" in peta:
+                        # Baris dengan kategori tak dikenal dicoba dipetakan dari keterangannya
+                        sisa = kode == KODE_TIDAK_DIKENAL
+                        if sisa.any():
+                            kode[sisa] = _kode_vektor(df[peta["keterangan"]][sisa], peta_kategori)
+                else:
+                    kode = _kode_vektor(df[peta["keterangan"]], peta_kategori)
+
+                valid = (bulan >= 0) & ~np.isnan(jumlah)
+                dikenal = valid & (kode != KODE_TIDAK_DIKENAL)
+                statistik["tidak_valid"] += int((~valid).sum())
+                statistik["tidak_terpetakan"] += int((valid & ~dikenal).sum())
+                statistik["terpetakan"] += int(dikenal.sum())
+
+                indeks = bulan[dikenal] * JUMLAH_KODE + kode[dikenal]
+                total = total.add(pd.Series(jumlah[dikenal]).groupby(indeks).sum(), fill_value=0)
+    finally:
+        sumber.close()
+
+    indeks = total.index.to_numpy(dtype=np.int64)
+    kunci_bulan = np.unique(indeks // JUMLAH_KODE)
+    matriks = np.zeros((len(kunci_bulan), JUMLAH_KODE))
+    matriks[np.searchsorted(kunci_bulan, indeks // JUMLAH_KODE), indeks % JUMLAH_KODE] = total.to_numpy()
+    arah = np.where(matriks.sum(axis=0) < 0, -1.0, 1.0)
+    return kunci_bulan, np.maximum(matriks * arah, 0), statistik
+
+
+def label_bulan(kunci_bulan):
+    """Kunci bulan -> label "YYYY-MM" """
+    return [f"{k // 12:04d}-{k % 12 + 1:02d}" for k in np.asarray(kunci_bulan).tolist()]
+
+
+def hitung_riwayat(kunci_bulan, total, statistik=None, gaji_default=0):
+    """Susun RiwayatArusKas dan hitung alokasi seluruh bulan sekaligus"""
+    gaji = total[:, KODE_GAJI].copy()
+    gaji[gaji <= 0] = gaji_default
+    insentif = total[:, KODE_INSENTIF]
+    pengeluaran = total[:, :JUMLAH_KATEGORI]
+    return RiwayatArusKas(
+        bulan=label_bulan(kunci_bulan),
+        gaji=gaji,
+        insentif=insentif,
+        pengeluaran=pengeluaran,
+        hasil=hitung_alokasi(gaji, insentif, pengeluaran),
+        statistik=dict(statistik or {}),
+    )
+
+
+def muat_riwayat(berkas, nama, gaji_default=0, ukuran_chunk=UKURAN_CHUNK):
+    """Baca berkas transaksi dan kembalikan RiwayatArusKas"""
+    kunci_bulan, total, statistik = agregasi_bulanan(berkas, nama, ukuran_chunk)
+    if not len(kunci_bulan):
+        raise ValueError("Tidak ada baris transaksi yang dapat dipetakan ke kategori")
+    return hitung_riwayat(kunci_bulan, total, statistik, gaji_default)
+
+
+def rata_rata_bergulir(nilai, jendela=3):
+    """Rata-rata bergulir sepanjang sumbu bulan (axis 0); bulan awal memakai data yang tersedia"""
+    nilai = np.asarray(nilai, dtype=np.float64)
+    kumulatif = np.cumsum(nilai, axis=0)
+    hasil = kumulatif.copy()
+    hasil[jendela:] = kumulatif[jendela:] - kumulatif[:-jendela]
+    pembagi = np.minimum(np.arange(1, len(nilai) + 1), jendela).reshape((-1,) + (1,) * (nilai.ndim - 1))
+    return hasil / pembagi
+
+
+def tren(nilai):
+    """Kemiringan garis regresi per bulan untuk setiap kolom (satuan nilai per bulan)"""
+    nilai = np.asarray(nilai, dtype=np.float64)
+    if len(nilai) < 2:
+        return np.zeros(nilai.shape[1:])
+    x = np.arange(len(nilai), dtype=np.float64)
+    x -= x.mean()
+    x = x.reshape((-1,) + (1,) * (nilai.ndim - 1))
+    return (x * (nilai - nilai.mean(axis=0))).sum(axis=0) / (x * x).sum()
+
+
+def ringkasan_tren(riwayat, jendela=3):
+    """Tabel per kategori: rata-rata persentase, rata-rata bergulir terakhir, tren dan jumlah bulan di luar rentang"""
+    persentase = riwayat.hasil.persentase
+    return pd.DataFrame({
+        "Item": KATEGORI,
+        "Rata-rata (%)": persentase.mean(axis=0).round(2),
+        f"Rata-rata {jendela} bulan terakhir (%)": rata_rata_bergulir(persentase, jendela)[-1].round(2),
+        "Tren (poin %/bulan)": tren(persentase).round(2),
+        "Bulan melebihi rentang": riwayat.hasil.items_melebihi.sum(axis=0),
+        "Bulan di bawah rentang": riwayat.hasil.items_dibawah.sum(axis=0),
+    })
@@ -0,0 +1,169 @@
+# Perutean model LLM per jenis permintaan, hedging, dan pencatatan latensi/biaya per tingkat
+#
+# Analisa memakai model besar; chat memakai model kecil yang cepat. Batas max_tokens disesuaikan
+# dengan jenis permintaan (chat: mengikuti panjang pertanyaan). Hedging: jika model utama belum
+# mengirim token pertama sampai batas waktu rute, permintaan cadangan dikirim ke model yang lebih
+# cepat dan yang lebih dulu menjawab dipakai; yang kalah dihentikan pada token berikutnya.
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from arkasbul import metrik
+from arkasbul.groq_client import GroqBatalError
+
+# Harga dalam USD per 1 juta token (masukan, keluaran)
+Tingkat = namedtuple("Tingkat", ["nama", "model", "harga_masuk", "harga_keluar"])
+# hedge_setelah: detik menunggu token pertama sebelum permintaan cadangan dikirim; 0 = tanpa hedging
+Rute = namedtuple("Rute", ["nama", "tingkat", "max_tokens", "max_tokens_min", "cadangan", "hedge_setelah"])
+
+
+def _harga(nama, default):
+    masuk, keluar = os.environ.get(nama, default).split(",")
+    return float(masuk), float(keluar)
+
+
+TINGKAT = {
+    "cepat": Tingkat("cepat", os.environ.get("ARKASBUL_MODEL_CEPAT", "llama-3.1-8b-instant"),
+                     *_harga("ARKASBUL_HARGA_CEPAT", "0.05,0.08")),
+    "besar": Tingkat("besar", os.environ.get("ARKASBUL_MODEL_BESAR", "openai/gpt-oss-120b"),
+                     *_harga("ARKASBUL_HARGA_BESAR", "0.15,0.75")),
+}
+
+RUTE = {
+    "analisa": Rute(
+        "analisa",
+        os.environ.get("ARKASBUL_RUTE_ANALISA", "besar"),
+        int(os.environ.get("ARKASBUL_MAX_TOKENS_ANALISA", "4096")),
+        int(os.environ.get("ARKASBUL_MAX_TOKENS_ANALISA", "4096")),
+        os.environ.get("ARKASBUL_CADANGAN_ANALISA", "cepat") or None,
+        float(os.environ.get("ARKASBUL_HEDGE_ANALISA", "8")),
+    ),
+    "chat": Rute(
+        "chat",
+        os.environ.get("ARKASBUL_RUTE_CHAT", "cepat"),
+        int(os.environ.get("ARKASBUL_MAX_TOKENS_CHAT", "1024")),
+        int(os.environ.get("ARKASBUL_MAX_TOKENS_CHAT_MIN", "384")),
+        os.environ.get("ARKASBUL_CADANGAN_CHAT", "") or None,
+        float(os.environ.get("ARKASBUL_HEDGE_CHAT", "0")),
+    ),
+}
+
+# Penanda akhir stream di antrian hedging
+_SELESAI = object()
+
+
+def tingkat_utama(rute):
+    return TINGKAT[rute.tingkat]
+
+
+def batas_token(rute, pertanyaan=None):
+    """max_tokens untuk satu permintaan: pertanyaan chat yang panjang mendapat ruang jawaban lebih besar"""
+    if pertanyaan is None or rute.max_tokens_min >= rute.max_tokens:
+        return rute.max_tokens
+    # ~4 karakter per token; jawaban diberi ruang 8x panjang pertanyaan di atas batas minimum
+    return min(rute.max_tokens, rute.max_tokens_min + 8 * (len(pertanyaan) // 4))
+
+
+def biaya(tingkat, usage):
+    """Biaya (USD) satu panggilan dari field usage"""
+    if not usage:
+        return 0.0
+    return (usage.get("prompt_tokens", 0) * tingkat.harga_masuk
+            + usage.get("completion_tokens", 0) * tingkat.harga_keluar) / 1e6
+
+
+def catat(rute, tingkat, latensi, usage, peran="utama"):
+    """Catat latensi, token dan biaya per rute/tingkat untuk menyetel perutean"""
+    metrik.amati("llm_tingkat_latency_seconds", latensi, rute=rute.nama, tingkat=tingkat.nama, peran=peran)
+    if usage:
+        metrik.tambah("llm_tingkat_tokens_total", usage.get("total_tokens", 0), rute=rute.nama, tingkat=tingkat.nama)
+        metrik.tambah("llm_biaya_usd_total", biaya(tingkat, usage), rute=rute.nama, tingkat=tingkat.nama)
+
+
+def _jalankan(peran, generator, antrian, batal):
+    """Baca generator di thread, kirim (peran, token) ke antrian; berhenti jika batal di-set"""
+    try:
+        for token in generator:
+            if batal.is_set():
+                break
+            antrian.put((peran, token))
+        else:
+            antrian.put((peran, _SELESAI))
+    except Exception as e:
+        antrian.put((peran, e))
+    finally:
+        generator.close()
+
+
+def lindungi(rute, panggil, penjawab=None):
+    """Generator potongan teks dengan hedging sesuai rute
+
+    panggil(tingkat, peran) mengembalikan generator potongan teks untuk satu model. Tanpa cadangan
+    (atau hedge_setelah 0) generator model utama dipakai langsung. Error model utama sebelum token
+    pertama juga memicu permintaan cadangan. Jika penjawab (dict) diberikan, penjawab["tingkat"]
+    diisi Tingkat yang jawabannya dipakai.
+    """
+    utama = tingkat_utama(rute)
+    penjawab = {} if penjawab is None else penjawab
+    if rute.cadangan is None or rute.hedge_setelah <= 0:
+        penjawab["tingkat"] = utama
+        yield from panggil(utama, "utama")
+        return
+
+    antrian = queue.Queue()
+    batal = {"utama": threading.Event(), "cadangan": threading.Event()}
+    threading.Thread(target=_jalankan, args=("utama", panggil(utama, "utama"), antrian, batal["utama"]),
+                     name="arkasbul-hedge-utama", daemon=True).start()
+
+    batas = time.monotonic() + rute.hedge_setelah
+    cadangan_jalan = False
+    pemenang = None
+    error = {}
+    try:
+        while True:
+            tunggu = None if cadangan_jalan or pemenang else max(0.0, batas - time.monotonic())
+            try:
+                peran, isi = antrian.get(timeout=tunggu)
+            except queue.Empty:
+                peran, isi = None, None
+            if peran is not None and pemenang is not None and peran != pemenang:
+                continue
+
+            # Permintaan dibatalkan pemanggil: tidak ada gunanya mengirim cadangan
+            if isinstance(isi, GroqBatalError):
+                raise isi
+            # Model utama terlambat atau gagal sebelum token pertama: kirim permintaan cadangan
+            if pemenang is None and not cadangan_jalan and (peran is None or isinstance(isi, Exception)):
+                cadangan_jalan = True
+                metrik.tambah("llm_hedge_total", rute=rute.nama, sebab="gagal" if peran else "terlambat")
+                threading.Thread(target=_jalankan,
+                                 args=("cadangan", panggil(TINGKAT[rute.cadangan], "cadangan"), antrian, batal["cadangan"]),
+                                 name="arkasbul-hedge-cadangan", daemon=True).start()
+                if peran is None:
+                    continue
+
+            if isinstance(isi, Exception):
+                error[peran] = isi
+                if pemenang is not None or len(error) == 2 or not cadangan_jalan:
+                    raise isi
+                continue
+            if isi is _SELESAI:
+                if pemenang is None and peran not in error:
+                    pemenang = peran
+                    penjawab["tingkat"] = utama if peran == "utama" else TINGKAT[rute.cadangan]
+                if peran == pemenang:
+                    return
+                continue
+
+            if pemenang is None:
+                pemenang = peran
+                penjawab["tingkat"] = utama if peran == "utama" else TINGKAT[rute.cadangan]
+                if cadangan_jalan:
+                    metrik.tambah("llm_hedge_pemenang_total", rute=rute.nama, pemenang=peran)
+                    batal["cadangan" if peran == "utama" else "utama"].set()
+            yield isi
+    finally:
+        for kejadian in batal.values():
+            kejadian.set()
@@ -0,0 +1,250 @@
+# Penyimpanan sesi persisten: analisis, chat dan input pengguna tetap ada setelah reconnect/restart
+#
+# Sesi dikenali dari token acak di URL (?sesi=...). Setiap rerun hanya membuat potret ringan dari
+# session state; jika berubah, potret dititipkan ke antrian dan thread latar menulisnya ke SQLite
+# secara berkelompok (write-behind) sebagai JSON terkompresi zlib. Sesi yang sama ditulis sekali
+# per jeda walau berubah beberapa kali. Pengguna yang kembali dengan token yang sama mendapat
+# hasil analisis sebelumnya tanpa panggilan LLM baru.
+import atexit
+import json
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+
+from arkasbul import AKAR, metrik
+
+SESI_DB = os.environ.get("ARKASBUL_SESSION_DB", os.path.join(AKAR, ".cache", "sesi.sqlite3"))
+SESI_NONAKTIF = os.environ.get("ARKASBUL_SESSION_DISABLED", "") not in ("", "0")
+SESI_TTL = float(os.environ.get("ARKASBUL_SESSION_TTL", str(30 * 24 * 3600)))
+# Jeda pengumpulan penulisan (detik) sebelum satu transaksi dijalankan
+SESI_JEDA = float(os.environ.get("ARKASBUL_SESSION_FLUSH_DELAY", "0.5"))
+
+# Entri kedaluwarsa dihapus setiap sekian kali flush
+_EVICT_SETIAP = 20
+# Jeda maksimum (detik) antar percobaan ulang setelah penulisan gagal
+_JEDA_ULANG_MAKS = 30.0
+
+# Token yang dibuat buat_token(); masukan lain dari URL diabaikan
+_POLA_TOKEN = re.compile(r"[A-Za-z0-9_-]{16,64}")
+
+_log = logging.getLogger("arkasbul.sesi")
+
+# Kunci session state yang disimpan (nilai biasa yang dapat langsung menjadi JSON).
+# kategori_tetap ikut disimpan karena saran_alokasi yang dipulihkan dihitung darinya. previous_question
+# sengaja tidak: itu hanya penjaga agar callback chat tidak mengirim ulang isi kolom yang sama dalam
+# satu sesi browser; kolom chat dikosongkan setelah terkirim, dan jika dipulihkan pengguna tidak dapat
+# menanyakan ulang pertanyaan terakhirnya setelah reconnect.
+KUNCI_SESI = (
+    "gaji", "insentif", "user_inputs_rp", "saldo_keranjang", "has_analyzed", "analysis_result",
+    "ringkasan_chat", "chat_terangkum", "chat_dibuang", "kategori_tetap",
+)
+
+
+def buat_token():
+    """Token sesi acak yang aman dipakai di URL"""
+    return secrets.token_urlsafe(18)
+
+
+def token_valid(token):
+    return isinstance(token, str) and _POLA_TOKEN.fullmatch(token) is not None
+
+
+def potret(state):
+    """Potret nilai session state yang disimpan; murah dibuat dan dibandingkan setiap rerun"""
+    data = {kunci: state.get(kunci) for kunci in KUNCI_SESI}
+    data["chat_history"] = tuple(state.get("chat_history") or ())
+    data["hasil_analisis"] = state.get("hasil_analisis")
+    data["saran_alokasi"] = state.get("saran_alokasi")
+    data["simulasi_keranjang"] = state.get("simulasi_keranjang")
+    return data
+
+
+def _kodekan(data):
+    """Potret -> JSON ringkas terkompresi; objek hasil disimpan sebagai argumen pembentuknya"""
+    isi = {kunci: data[kunci] for kunci in KUNCI_SESI}
+    isi["chat_history"] = [list(giliran) for giliran in data["chat_history"]]
+    hasil = data["hasil_analisis"]
+    isi["hasil_analisis"] = list(hasil.__reduce__()[1]) if hasil is not None else None
+    isi["saran_alokasi"] = list(data["saran_alokasi"]) if data["saran_alokasi"] is not None else None
+    isi["simulasi_keranjang"] = list(data["simulasi_keranjang"]) if data["simulasi_keranjang"] is not None else None
+    return zlib.compress(json.dumps(isi, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def _tuple(nilai):
+    """List JSON kembali menjadi tuple (bertingkat), sesuai bentuk aslinya"""
+    return tuple(_tuple(v) for v in nilai) if isinstance(nilai, list) else nilai
+
+
+def _dekodekan(blob):
+    """Kebalikan _kodekan: kembalikan potret dengan objek hasil yang dibentuk ulang
+
+    Kunci yang belum ada di potret lama tidak diisi sehingga nilai awal halaman tetap berlaku.
+    """
+    isi = json.loads(zlib.decompress(blob).decode("utf-8"))
+    data = {kunci: isi[kunci] for kunci in KUNCI_SESI if kunci in isi}
+    data["chat_history"] = tuple(tuple(giliran) for giliran in isi.get("chat_history") or ())
+    data["hasil_analisis"] = data["saran_alokasi"] = data["simulasi_keranjang"] = None
+    if isi.get("hasil_analisis") is not None:
+        from arkasbul.engine import AnalysisResult
+        data["hasil_analisis"] = AnalysisResult(*_tuple(isi["hasil_analisis"]))
+    if isi.get("saran_alokasi") is not None:
+        from arkasbul.optimasi import SaranAlokasi
+        data["saran_alokasi"] = SaranAlokasi(*_tuple(isi["saran_alokasi"]))
+    if isi.get("simulasi_keranjang") is not None:
+        from arkasbul.simulasi import SimulasiKeranjang
+        data["simulasi_keranjang"] = SimulasiKeranjang(*_tuple(isi["simulasi_keranjang"]))
+    return data
+
+
+def terapkan(state, data):
+    """Tulis potret yang dipulihkan ke session state"""
+    for kunci, nilai in data.items():
+        state[kunci] = list(nilai) if kunci in ("chat_history", "user_inputs_rp") and nilai is not None else nilai
+
+
+class TokoSesi:
+    """Penyimpanan sesi SQLite dengan antrian write-behind yang di-flush oleh thread latar"""
+
+    def __init__(self, path=SESI_DB, ttl=SESI_TTL, jeda=SESI_JEDA):
+        self.path = path
+        self.ttl = ttl
+        self.jeda = jeda
+        self._antrian = {}
+        self._kondisi = threading.Condition()
+        self._lock_db = threading.Lock()
+        self._conn = None
+        self._thread = None
+        self._flush = 0
+        self.stats = {"simpan": 0, "tulis": 0, "muat": 0, "pulih": 0}
+
+    def _db(self):
+        """Buka koneksi SQLite saat pertama kali dibutuhkan"""
+        if self._conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sesi ("
+                "token TEXT PRIMARY KEY, data BLOB NOT NULL, diubah REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sesi_diubah ON sesi (diubah)")
+            self._conn = conn
+        return self._conn
+
+    def simpan(self, token, data):
+        """Titipkan potret untuk ditulis thread latar; tidak pernah memblokir render"""
+        with self._kondisi:
+            self._antrian[token] = data
+            self.stats["simpan"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._pekerja, name="arkasbul-sesi", daemon=True)
+                self._thread.start()
+            self._kondisi.notify()
+
+    def _pekerja(self):
+        gagal = 0
+        while True:
+            with self._kondisi:
+                while not self._antrian:
+                    self._kondisi.wait()
+            # Tunggu sebentar agar perubahan beruntun (mis. beberapa pesan chat) ditulis sekali;
+            # setelah gagal, jeda digandakan sampai penulisan berhasil lagi
+            time.sleep(min(self.jeda * 2 ** gagal, _JEDA_ULANG_MAKS) if gagal else self.jeda)
+            try:
+                self.flush()
+                gagal = 0
+            except Exception:
+                gagal += 1
+                metrik.tambah("sesi_gagal_total", operasi="tulis")
+
+    def flush(self):
+        """Tulis semua potret yang tertunda dalam satu transaksi
+
+        Jika transaksi gagal, potret dikembalikan ke antrian (kecuali token yang sudah mendapat
+        potret lebih baru) untuk dicoba lagi pada flush berikutnya. Potret yang tidak dapat dikodekan
+        dilewati dan dicatat tanpa menggagalkan potret lain di batch yang sama.
+        """
+        with self._kondisi:
+            antrian, self._antrian = self._antrian, {}
+        sekarang = time.time()
+        baris = []
+        for token, data in list(antrian.items()):
+            try:
+                baris.append((token, _kodekan(data), sekarang))
+            except Exception:
+                del antrian[token]
+                metrik.tambah("sesi_gagal_total", operasi="kodekan")
+                _log.warning("Potret sesi %s... tidak dapat dikodekan, dilewati", token[:6], exc_info=True)
+        if not baris:
+            return 0
+        with self._lock_db:
+            db = self._db()
+            db.execute("BEGIN")
+            try:
+                db.executemany("INSERT OR REPLACE INTO sesi (token, data, diubah) VALUES (?, ?, ?)", baris)
+                self._flush += 1
+                if self._flush % _EVICT_SETIAP == 0:
+                    db.execute("DELETE FROM sesi WHERE diubah < ?", (sekarang - self.ttl,))
+                db.execute("COMMIT")
+            except Exception:
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+                with self._kondisi:
+                    for token, data in antrian.items():
+                        self._antrian.setdefault(token, data)
+                raise
+        self.stats["tulis"] += len(baris)
+        metrik.tambah("sesi_ditulis_total", len(baris))
+        return len(baris)
+
+    def muat(self, token):
+        """Potret tersimpan untuk token, None jika tidak ada atau kedaluwarsa"""
+        self.stats["muat"] += 1
+        with self._kondisi:
+            if token in self._antrian:
+                return self._antrian[token]
+        with self._lock_db:
+            baris = self._db().execute("SELECT data, diubah FROM sesi WHERE token = ?", (token,)).fetchone()
+        if baris is None or time.time() - baris[1] > self.ttl:
+            return None
+        try:
+            data = _dekodekan(baris[0])
+        except (ValueError, TypeError, zlib.error):
+            metrik.tambah("sesi_gagal_total", operasi="baca")
+            return None
+        self.stats["pulih"] += 1
+        return data
+
+    def hapus(self, token):
+        """Lupakan sesi (mis. pengguna memulai dari awal)"""
+        # Lock database lebih dulu: flush yang gagal tidak dapat mengembalikan potret token ini ke antrian
+        with self._lock_db:
+            with self._kondisi:
+                self._antrian.pop(token, None)
+            self._db().execute("DELETE FROM sesi WHERE token = ?", (token,))
+
+
+_toko = None
+_toko_lock = threading.Lock()
+
+
+def get_toko():
+    """Ambil penyimpanan sesi bersama per proses, None jika dinonaktifkan"""
+    global _toko
+    if SESI_NONAKTIF:
+        return None
+    if _toko is None:
+        with _toko_lock:
+            if _toko is None:
+                _toko = TokoSesi()
+                # Potret yang masih tertunda ditulis saat proses berhenti normal
+                atexit.register(_toko.flush)
+    return _toko
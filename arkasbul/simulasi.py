@@ -0,0 +1,161 @@
+# Simulasi Monte Carlo kecukupan dana "Keranjang Aman" (dana darurat)
+#
+# Setiap jalur mensimulasikan arus kas bulanan: gaji dapat hilang sementara (guncangan penghasilan,
+# pulih dengan peluang tetap per bulan), insentif bervariasi, pengeluaran per kategori berfluktuasi
+# dan sesekali muncul biaya tak terduga. Surplus bulanan menambah saldo hingga sebesar alokasi
+# Keranjang Aman; defisit diambil dari saldo. Dana dianggap habis jika saldo pernah di bawah 0.
+# Semua jalur (dan semua rumah tangga pada mode batch) dihitung sekaligus dengan NumPy per bulan.
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from arkasbul.kategori import JUMLAH_KATEGORI
+
+# Horizon (bulan) yang dilaporkan
+HORIZON = (6, 12, 24)
+# Jumlah jalur untuk satu pengguna dan per rumah tangga pada mode batch
+JALUR = int(os.environ.get("ARKASBUL_SIMULASI_JALUR", "100000"))
+JALUR_BATCH = int(os.environ.get("ARKASBUL_SIMULASI_JALUR_BATCH", "2000"))
+# Batas elemen (rumah tangga x jalur) per potongan batch agar memori tetap terbatas
+ELEMEN_PER_POTONGAN = int(os.environ.get("ARKASBUL_SIMULASI_CHUNK", "2000000"))
+UKURAN_CACHE = int(os.environ.get("ARKASBUL_SIMULASI_CACHE", "256"))
+# Seed tetap: input yang sama selalu memberi angka yang sama (dan perbandingan antar input lebih stabil)
+SEED = 20240601
+
+# Indeks kategori Keranjang Aman (setoran dana darurat, bukan pengeluaran)
+KERANJANG_AMAN = 3
+
+Asumsi = namedtuple("Asumsi", [
+    "peluang_guncangan",   # peluang per bulan kehilangan gaji
+    "peluang_pulih",       # peluang per bulan penghasilan pulih setelah guncangan
+    "sisa_gaji_guncangan", # porsi gaji yang tetap diterima selama guncangan
+    "cv_insentif",         # koefisien variasi insentif bulanan
+    "cv_pengeluaran",      # koefisien variasi per kategori (7)
+    "dihentikan",          # kategori yang dihentikan selama guncangan (indeks)
+    "peluang_kejutan",     # peluang per bulan biaya tak terduga
+    "kejutan_rata",        # rata-rata biaya tak terduga, kelipatan gaji
+    "sigma_kejutan",       # sebaran lognormal biaya tak terduga
+])
+
+ASUMSI = Asumsi(
+    peluang_guncangan=0.01,
+    peluang_pulih=0.25,
+    sisa_gaji_guncangan=0.0,
+    cv_insentif=0.5,
+    cv_pengeluaran=(0.05, 0.0, 0.10, 0.0, 0.20, 0.15, 0.30),
+    dihentikan=(0, 6),
+    peluang_kejutan=0.05,
+    kejutan_rata=0.5,
+    sigma_kejutan=0.8,
+)
+
+HasilSimulasi = namedtuple("HasilSimulasi", [
+    "horizon",        # tuple bulan
+    "peluang_habis",  # (N, H) peluang saldo habis sampai horizon
+    "saldo_median",   # (N, H) median saldo di akhir horizon
+    "saldo_p10",      # (N, H) persentil 10 saldo di akhir horizon
+    "jalur",          # jumlah jalur per rumah tangga
+])
+
+# Hasil satu pengguna dengan tipe Python biasa (disimpan di session state / dikirim ke prompt)
+SimulasiKeranjang = namedtuple("SimulasiKeranjang", ["horizon", "peluang_habis", "saldo_median", "saldo_p10", "saldo_awal", "jalur"])
+
+
+def _simulasi(gaji, insentif, pengeluaran, saldo, jalur, asumsi, acak):
+    """Simulasi n rumah tangga x jalur; gaji, insentif, saldo (n,), pengeluaran (n, 7)"""
+    n = len(gaji)
+    bentuk = (n, jalur)
+    cv = np.asarray(asumsi.cv_pengeluaran, dtype=np.float64)
+    biaya = pengeluaran.copy()
+    biaya[:, KERANJANG_AMAN] = 0.0
+    dihentikan = np.isin(np.arange(JUMLAH_KATEGORI), asumsi.dihentikan)
+
+    # Fluktuasi per kategori saling bebas sehingga jumlahnya cukup diwakili satu normal per bulan
+    rata_normal = biaya.sum(axis=1)[:, None]
+    sd_normal = np.sqrt(((cv * biaya) ** 2).sum(axis=1))[:, None]
+    rata_guncangan = biaya[:, ~dihentikan].sum(axis=1)[:, None]
+    sd_guncangan = np.sqrt(((cv * biaya)[:, ~dihentikan] ** 2).sum(axis=1))[:, None]
+    setoran = pengeluaran[:, KERANJANG_AMAN][:, None]
+    gaji = gaji[:, None]
+    insentif = insentif[:, None]
+    mu_kejutan = -0.5 * asumsi.sigma_kejutan ** 2
+    ada_insentif = bool(np.any(insentif > 0))
+
+    dana = np.repeat(saldo[:, None], jalur, axis=1)
+    habis = np.zeros(bentuk, dtype=bool)
+    terguncang = np.zeros(bentuk, dtype=bool)
+    peluang_habis, saldo_median, saldo_p10 = [], [], []
+    for bulan in range(1, max(HORIZON) + 1):
+        u = acak.random(bentuk)
+        terguncang = np.where(terguncang, u >= asumsi.peluang_pulih, u < asumsi.peluang_guncangan)
+
+        pemasukan = gaji * np.where(terguncang, asumsi.sisa_gaji_guncangan, 1.0)
+        if ada_insentif:
+            pemasukan += np.where(terguncang, 0.0, insentif * np.maximum(1.0 + asumsi.cv_insentif * acak.standard_normal(bentuk), 0.0))
+
+        keluar = np.where(terguncang, rata_guncangan, rata_normal) + np.where(terguncang, sd_guncangan, sd_normal) * acak.standard_normal(bentuk)
+        np.maximum(keluar, 0.0, out=keluar)
+        # Biaya tak terduga jarang terjadi: nilai lognormal hanya diambil untuk jalur yang terkena
+        baris, kolom = np.nonzero(acak.random(bentuk) < asumsi.peluang_kejutan)
+        keluar[baris, kolom] += gaji[baris, 0] * asumsi.kejutan_rata * acak.lognormal(mu_kejutan, asumsi.sigma_kejutan, len(baris))
+
+        bersih = pemasukan - keluar
+        dana += np.where(bersih >= 0, np.minimum(bersih, setoran), bersih)
+        habis |= dana < 0
+
+        if bulan in HORIZON:
+            peluang_habis.append(habis.mean(axis=1))
+            persentil = np.percentile(dana, [10, 50], axis=1)
+            saldo_p10.append(persentil[0])
+            saldo_median.append(persentil[1])
+    return np.stack(peluang_habis, axis=1), np.stack(saldo_median, axis=1), np.stack(saldo_p10, axis=1)
+
+
+def simulasi_batch(gaji, insentif, pengeluaran, saldo, jalur=JALUR_BATCH, asumsi=ASUMSI, seed=SEED):
+    """Simulasi N rumah tangga sekaligus; gaji, insentif, saldo skalar atau (N,), pengeluaran (N, 7) atau (7,)"""
+    pengeluaran = np.atleast_2d(np.asarray(pengeluaran, dtype=np.float64))
+    if pengeluaran.shape[1] != JUMLAH_KATEGORI:
+        raise ValueError(f"Pengeluaran harus memiliki {JUMLAH_KATEGORI} kolom kategori, bukan {pengeluaran.shape[1]}")
+    n = pengeluaran.shape[0]
+    gaji = np.broadcast_to(np.asarray(gaji, dtype=np.float64), (n,))
+    insentif = np.broadcast_to(np.asarray(insentif, dtype=np.float64), (n,))
+    saldo = np.broadcast_to(np.asarray(saldo, dtype=np.float64), (n,))
+
+    acak = np.random.default_rng(seed)
+    per_potongan = max(1, ELEMEN_PER_POTONGAN // jalur)
+    bagian = [
+        _simulasi(gaji[i:i + per_potongan], insentif[i:i + per_potongan], pengeluaran[i:i + per_potongan],
+                  saldo[i:i + per_potongan], jalur, asumsi, acak)
+        for i in range(0, n, per_potongan)
+    ]
+    return HasilSimulasi(
+        horizon=HORIZON,
+        peluang_habis=np.concatenate([b[0] for b in bagian]),
+        saldo_median=np.concatenate([b[1] for b in bagian]),
+        saldo_p10=np.concatenate([b[2] for b in bagian]),
+        jalur=jalur,
+    )
+
+
+def baris_simulasi(hasil, baris, saldo_awal):
+    """Ambil SimulasiKeranjang satu baris dari HasilSimulasi"""
+    return SimulasiKeranjang(
+        horizon=hasil.horizon,
+        peluang_habis=tuple(hasil.peluang_habis[baris].tolist()),
+        saldo_median=tuple(int(v) for v in hasil.saldo_median[baris]),
+        saldo_p10=tuple(int(v) for v in hasil.saldo_p10[baris]),
+        saldo_awal=int(saldo_awal),
+        jalur=hasil.jalur,
+    )
+
+
+@lru_cache(maxsize=UKURAN_CACHE)
+def _simulasi_tersimpan(gaji, insentif, pengeluaran, saldo, jalur, asumsi):
+    return baris_simulasi(simulasi_batch(gaji, insentif, pengeluaran, saldo, jalur, asumsi), 0, saldo)
+
+
+def simulasi_keranjang(gaji, insentif, pengeluaran, saldo, jalur=JALUR, asumsi=ASUMSI):
+    """Peluang dana Keranjang Aman habis dalam 6/12/24 bulan untuk satu pengguna (di-cache per input)"""
+    return _simulasi_tersimpan(int(gaji), int(insentif), tuple(int(p) for p in pengeluaran), int(saldo), int(jalur), asumsi)
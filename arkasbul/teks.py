@@ -0,0 +1,198 @@
+# Helper teks: format angka Rupiah, prompt LLM dan analisis sederhana
+# Tidak bergantung pada Streamlit sehingga dapat dipakai ulang dan di-benchmark secara terpisah.
+from arkasbul.kategori import KATEGORI, RENTANG
+
+# --- Fungsi Helper untuk Format Angka ---
+def format_currency(value):
+    """Format angka menjadi string dengan pemisah ribuan (titik)"""
+    if value is None or value == "":
+        return ""
+    try:
+        # Konversi ke int jika masih string
+        num = int(float(value))
+        return f"{num:,}".replace(",", ".")
+    except (ValueError, TypeError):
+        return ""
+
+def parse_currency(input_str):
+    """Parse string angka dengan titik sebagai pemisah ribuan menjadi integer"""
+    if not input_str:
+        return 0
+    # Hapus semua titik
+    cleaned = input_str.replace(".", "").strip()
+    try:
+        return int(cleaned)
+    except ValueError:
+        return 0
+
+def format_indo_currency(amount):
+    """Format angka menjadi string dengan Rp dan pemisah ribuan (titik)"""
+    return f"Rp {amount:,.0f}".replace(",", ".")
+
+def susun_ringkasan_markdown(pengeluaran, persentase_dari_gaji, kategori=KATEGORI, rentang=RENTANG):
+    """Tabel ringkasan alokasi dalam Markdown (tanpa pandas)"""
+    baris = [
+        "| No | Item | Besar Pengeluaran (Rp) | Rujukan (%) | Hasil Simulasi (%) |",
+        "|---:|:-----|-----------------------:|:-----------:|-------------------:|"
+    ]
+    for i, (kat, val, rujukan, persen) in enumerate(zip(kategori, pengeluaran, rentang, persentase_dari_gaji), start=1):
+        baris.append(f"| {i} | {kat} | {format_indo_currency(int(val))} | {rujukan} | {persen:.2f}% |")
+    return "\n".join(baris)
+
+def susun_saran_markdown(pengeluaran, saran, kategori=KATEGORI, rentang=RENTANG):
+    """Tabel saran alokasi (SaranAlokasi) dalam Markdown, berdampingan dengan pengeluaran saat ini"""
+    baris = [
+        "| No | Item | Saat Ini (Rp) | Saran (Rp) | Perubahan (Rp) | Saran (%) | Rujukan (%) |",
+        "|---:|:-----|--------------:|-----------:|---------------:|----------:|:-----------:|"
+    ]
+    for i, kat in enumerate(kategori):
+        perubahan = "tetap" if i in saran.tetap else ("+" if saran.selisih[i] > 0 else "") + format_currency(saran.selisih[i])
+        baris.append(
+            f"| {i + 1} | {kat} | {format_indo_currency(int(pengeluaran[i]))} | {format_indo_currency(saran.saran[i])} | "
+            f"{perubahan} | {saran.persentase[i]:.2f}% | {rentang[i]} |"
+        )
+    return "\n".join(baris)
+
+def _teks_saran(saran, kategori):
+    """Daftar target alokasi untuk prompt dan analisis sederhana"""
+    teks = ""
+    for i, kategori_item in enumerate(kategori):
+        if i in saran.tetap:
+            keterangan = "dipertahankan"
+        else:
+            keterangan = f"{saran.selisih[i]:+,.0f}" if saran.selisih[i] else "tidak berubah"
+        teks += f"- {kategori_item}: Rp {saran.saran[i]:,.0f} ({saran.persentase[i]:.2f}% dari gaji, perubahan: {keterangan})\n"
+    if not saran.layak:
+        teks += "Catatan: pengeluaran yang dipertahankan terlalu besar sehingga tidak semua item dapat masuk rentang rujukan.\n"
+    return teks
+
+def _teks_simulasi(simulasi):
+    """Peluang dana Keranjang Aman habis per horizon, mis. 6 bulan: 5.7%, 12 bulan: 10.8%"""
+    return ", ".join(f"{bulan} bulan: {peluang * 100:.1f}%" for bulan, peluang in zip(simulasi.horizon, simulasi.peluang_habis))
+
+def susun_prompt_analisis(hasil, kategori=KATEGORI, rentang=RENTANG, saran=None, simulasi=None):
+    """Susun prompt analisis keuangan dari AnalysisResult
+
+    saran (SaranAlokasi, opsional): target alokasi yang sudah dihitung lokal sehingga model
+    cukup menjelaskan langkahnya tanpa menghitung sendiri.
+    simulasi (SimulasiKeranjang, opsional): peluang dana Keranjang Aman habis hasil simulasi.
+    """
+    gaji = hasil.gaji
+    insentif = hasil.insentif
+    persen_insentif = hasil.persen_insentif
+    user_inputs_rp = hasil.pengeluaran
+    persentase_dari_gaji = hasil.persentase
+    total_pengeluaran = hasil.total_pengeluaran
+    items_melebihi, items_dibawah = hasil.di_luar_rentang(kategori)
+
+    prompt = f"""
+        Analisis keuangan berdasarkan data berikut:
+
+        Gaji bulanan: Rp {gaji:,.0f}
+        Insentif/lembur: Rp {insentif:,.0f} ({persen_insentif:.2f}% dari gaji)
+        Total pendapatan: Rp {(gaji + insentif):,.0f}
+
+        Alokasi dana berdasarkan input pengguna:
+        """
+
+    for i, kategori_item in enumerate(kategori):
+        prompt += f"- {kategori_item}: Rp {int(user_inputs_rp[i]):,.0f} ({persentase_dari_gaji[i]:.2f}% dari gaji, rujukan: {rentang[i]})\n"
+
+    if items_melebihi:
+        prompt += "\nItem yang melebihi rentang rujukan:\n"
+        for item, persen, max_val in items_melebihi:
+            prompt += f"- {item}: {persen:.2f}% (melebihi batas atas {max_val}%)\n"
+
+    if items_dibawah:
+        prompt += "\nItem yang di bawah rentang rujukan:\n"
+        for item, persen, min_val in items_dibawah:
+            prompt += f"- {item}: {persen:.2f}% (di bawah batas bawah {min_val}%)\n"
+
+    if total_pengeluaran > gaji:
+        prompt += f"\nTotal pengeluaran (Rp {int(total_pengeluaran):,}) melebihi gaji bulanan (Rp {int(gaji):,}).\n"
+
+    if saran is not None:
+        prompt += "\nTarget alokasi terdekat yang sudah dihitung (di dalam rentang rujukan dan tidak melebihi gaji):\n"
+        prompt += _teks_saran(saran, kategori)
+        prompt += "Gunakan angka target ini apa adanya; jangan menghitung ulang alokasinya.\n"
+
+    if simulasi is not None:
+        prompt += f"\nSaldo dana Keranjang Aman saat ini: Rp {simulasi.saldo_awal:,.0f}\n"
+        prompt += f"Peluang dana Keranjang Aman habis menurut simulasi ({simulasi.jalur:,} skenario): {_teks_simulasi(simulasi)}\n"
+
+    prompt += """
+        Berikan analisis singkat tentang alokasi keuangan ini dan saran untuk perbaikan.
+        Fokus pada item yang melebihi atau di bawah rentang rujukan jika ada.
+        Berikan juga saran pemanfaatan insentif/lembur yang optimal.
+        Berikan jawaban dalam Bahasa Indonesia.
+        """
+    return prompt
+
+def susun_prompt_chat(gaji, insentif, hasil, user_question, kategori=KATEGORI):
+    """Susun prompt chat dari data keuangan dan pertanyaan pengguna"""
+    chat_prompt = f"""
+        Berdasarkan data keuangan berikut:
+
+        Gaji bulanan: Rp {gaji:,.0f}
+        Insentif/lembur: Rp {insentif:,.0f}
+
+        Alokasi dana pengguna:
+        """
+
+    if hasil is not None:
+        for kategori_item, persen, nilai in zip(kategori, hasil.persentase, hasil.pengeluaran):
+            chat_prompt += f"- {kategori_item}: {persen:.2f}% (Rp {int(nilai):,.0f})\n"
+
+    chat_prompt += f"""
+        Pertanyaan pengguna: {user_question}
+
+        Berikan jawaban yang informatif dan bermanfaat dalam Bahasa Indonesia:
+        """
+    return chat_prompt
+
+def generate_simple_analysis(gaji, insentif, persen_insentif, items_melebihi, items_dibawah, total_pengeluaran, saran=None, simulasi=None):
+    """Fungsi untuk menghasilkan analisis sederhana jika API tidak tersedia"""
+    analisis = f"""
+    Berdasarkan gaji bulanan Anda sebesar Rp {gaji:,.0f} dan insentif/lembur sebesar Rp {insentif:,.0f}, berikut adalah analisis keuangan Anda:
+
+    1. Total pendapatan: Rp {(gaji + insentif):,.0f}
+    2. Total pengeluaran: Rp {int(total_pengeluaran):,.0f}
+    """
+
+    if total_pengeluaran > gaji:
+        analisis += f"\nTotal pengeluaran Anda melebihi gaji bulanan sebesar Rp {int(total_pengeluaran - gaji):,.0f}. Sebaiknya kurangi beberapa pengeluaran atau gunakan insentif/lembur untuk menutupi kekurangan.\n"
+    else:
+        analisis += f"\nAnda memiliki sisa gaji sebesar Rp {int(gaji - total_pengeluaran):,.0f} yang dapat dialokasikan untuk tabungan tambahan atau kebutuhan lain.\n"
+
+    if items_melebihi:
+        analisis += "\nItem yang melebihi rentang rujukan:\n"
+        for item, persen, max_val in items_melebihi:
+            analisis += f"- {item}: {persen:.2f}% (melebihi batas atas {max_val}%)\n"
+        analisis += "\nSebaiknya Anda mengurangi alokasi untuk item-item tersebut dan menyesuaikannya dengan rentang yang direkomendasikan.\n"
+
+    if items_dibawah:
+        analisis += "\nItem yang di bawah rentang rujukan:\n"
+        for item, persen, min_val in items_dibawah:
+            analisis += f"- {item}: {persen:.2f}% (di bawah batas bawah {min_val}%)\n"
+        analisis += "\nSebaiknya Anda meningkatkan alokasi untuk item-item tersebut agar sesuai dengan rentang yang direkomendasikan.\n"
+
+    if saran is not None and any(saran.selisih):
+        analisis += "\nSaran alokasi terdekat yang sesuai rentang rujukan:\n"
+        analisis += _teks_saran(saran, KATEGORI)
+
+    if simulasi is None:
+        keranjang = 'Pastikan dana "Keranjang Aman" mencukupi untuk 3-6 bulan pengeluaran'
+    else:
+        keranjang = (f'Dengan saldo "Keranjang Aman" Rp {simulasi.saldo_awal:,.0f}, peluang dana tersebut habis adalah '
+                     f'{_teks_simulasi(simulasi)}')
+
+    analisis += f"""
+    Rekomendasi:
+    - Jika Anda memiliki cicilan yang besar, pertimbangkan untuk mengurangi pengeluaran gaya hidup
+    - {keranjang}
+    - Investasi jangka panjang sangat penting untuk masa depan finansial Anda
+
+    Dengan insentif/lembur sebesar {persen_insentif:.2f}% dari gaji, Anda dapat mengalokasikan tambahan ini untuk mempercepat pembayaran hutang atau meningkatkan investasi.
+    """
+
+    return analisis
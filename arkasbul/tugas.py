@@ -0,0 +1,161 @@
+# Tugas latar untuk panggilan LLM: script thread Streamlit tidak ikut menunggu API
+#
+# Halaman mengirim generator potongan teks (stream_groq_response) ke pool pekerja bersama per proses
+# lalu langsung kembali; objek Tugas disimpan di session state dan teksnya bertambah selama stream
+# berjalan. Bagian hasil di halaman memeriksa tugas secara berkala (fragment run_every) sampai
+# selesai. Tugas dapat dibatalkan: yang masih antri tidak pernah dijalankan, yang sedang berjalan
+# berhenti pada potongan berikutnya dan stream HTTP-nya ditutup. Event pembatalan juga diteruskan
+# ke stream sehingga tugas yang masih menunggu antrian penjadwal atau slot koneksi segera berhenti.
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from arkasbul import metrik
+
+# Jumlah panggilan LLM yang berjalan bersamaan (thread pekerja) per proses
+PEKERJA = int(os.environ.get("ARKASBUL_TASK_WORKERS", os.environ.get("GROQ_MAX_CONCURRENCY", "16")))
+# Tugas yang boleh menunggu pekerja; di atas batas ini tugas langsung gagal dan halaman memakai cadangan
+MAKS_ANTRIAN = int(os.environ.get("ARKASBUL_TASK_QUEUE", "256"))
+
+ANTRI, JALAN, SELESAI, GAGAL, BATAL = "antri", "jalan", "selesai", "gagal", "batal"
+
+_nomor = itertools.count(1)
+
+
+class Tugas:
+    """Satu panggilan LLM di pool; teks bertambah per potongan selama stream berlangsung"""
+
+    def __init__(self, jenis, data=None):
+        self.id = next(_nomor)
+        self.jenis = jenis
+        # Konteks milik pemanggil (mis. pertanyaan chat, analisis cadangan)
+        self.data = data or {}
+        self.status = ANTRI
+        self.potongan = []
+        self.galat = None
+        self.dibuat = time.monotonic()
+        self._batal = threading.Event()
+        self._lock = threading.Lock()
+        self._future = None
+
+    @property
+    def teks(self):
+        return "".join(self.potongan)
+
+    @property
+    def selesai(self):
+        return self.status in (SELESAI, GAGAL, BATAL)
+
+    def _akhiri(self, status, galat=None):
+        """Set status akhir sekali saja; kembalikan False jika tugas sudah berakhir"""
+        with self._lock:
+            if self.selesai:
+                return False
+            self.status = status
+            self.galat = galat
+        metrik.tambah("tugas_total", jenis=self.jenis, status=status)
+        metrik.amati("tugas_durasi_seconds", time.monotonic() - self.dibuat, jenis=self.jenis, status=status)
+        return True
+
+    def batalkan(self):
+        """Hentikan tugas; yang masih antri dibatalkan sebelum dijalankan, yang menunggu API dilepas"""
+        self._batal.set()
+        if self._future is not None and self._future.cancel():
+            self._akhiri(BATAL)
+
+
+def tugas_gagal(jenis, galat, data=None):
+    """Tugas yang langsung gagal tanpa dijalankan (mis. antrian penuh atau API key belum ada)"""
+    tugas = Tugas(jenis, data)
+    tugas._akhiri(GAGAL, galat)
+    return tugas
+
+
+class PoolTugas:
+    """Pool pekerja terbatas untuk tugas LLM, dipakai bersama oleh semua sesi"""
+
+    def __init__(self, pekerja=PEKERJA, maks_antrian=MAKS_ANTRIAN):
+        self.pekerja = pekerja
+        self.maks_antrian = maks_antrian
+        self._executor = ThreadPoolExecutor(max_workers=pekerja, thread_name_prefix="arkasbul-tugas")
+        self._lock = threading.Lock()
+        self._aktif = 0
+        self._jalan = 0
+
+    def kirim(self, jenis, buat_stream, data=None):
+        """Jadwalkan buat_stream(batal) (generator potongan teks) dan kembalikan Tugas-nya segera
+
+        batal: threading.Event yang di-set saat tugas dibatalkan, untuk diteruskan ke penjadwal/klien API.
+        """
+        with self._lock:
+            penuh = self._aktif >= self.pekerja + self.maks_antrian
+            if not penuh:
+                self._aktif += 1
+        if penuh:
+            from arkasbul.groq_client import GroqError
+            return tugas_gagal(jenis, GroqError("Error: antrian permintaan penuh, coba beberapa saat lagi"), data)
+        tugas = Tugas(jenis, data)
+        tugas._future = self._executor.submit(self._jalankan, tugas, buat_stream)
+        tugas._future.add_done_callback(self._kurangi)
+        return tugas
+
+    def _kurangi(self, _future):
+        with self._lock:
+            self._aktif -= 1
+
+    def _jalankan(self, tugas, buat_stream):
+        if tugas._batal.is_set():
+            tugas._akhiri(BATAL)
+            return
+        with self._lock:
+            self._jalan += 1
+        tugas.status = JALAN
+        metrik.amati("tugas_tunggu_seconds", time.monotonic() - tugas.dibuat, jenis=tugas.jenis)
+        generator = None
+        try:
+            generator = buat_stream(tugas._batal)
+            for potongan in generator:
+                if tugas._batal.is_set():
+                    break
+                tugas.potongan.append(potongan)
+            tugas._akhiri(BATAL if tugas._batal.is_set() else SELESAI)
+        except Exception as e:
+            # Pembatalan yang menghentikan penantian di penjadwal/klien API muncul sebagai exception
+            if tugas._batal.is_set():
+                tugas._akhiri(BATAL)
+            else:
+                tugas._akhiri(GAGAL, e)
+        finally:
+            # Menutup generator menghentikan stream HTTP (dan permintaan hedging) yang dibatalkan
+            if generator is not None:
+                generator.close()
+            with self._lock:
+                self._jalan -= 1
+
+    def statistik(self):
+        with self._lock:
+            return {"jalan": self._jalan, "antri": self._aktif - self._jalan}
+
+
+def _kolektor_metrik():
+    """Jumlah tugas berjalan dan antri sebagai gauge untuk ekspor metrik"""
+    if _pool is None:
+        return []
+    return [("tugas_aktif", {"status": k}, v) for k, v in _pool.statistik().items()]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Ambil pool tugas bersama (dibuat sekali per proses)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolTugas()
+                metrik.daftarkan_kolektor(_kolektor_metrik)
+    return _pool
@@ -0,0 +1,136 @@
+# Uji beban API JSON (arkasbul/api.py) dengan server tiruan Groq
+#
+# Contoh:
+#   python benchmarks/api_load.py                       # konkurensi 16 dan 64
+#   python benchmarks/api_load.py --concurrency 128 --requests 5000 --latency 0.5
+#
+# Server API dijalankan di proses terpisah (uvicorn, satu worker = satu core) agar klien
+# pengukur tidak berbagi GIL dengannya. Setiap skenario diukur dengan N klien keep-alive paralel.
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_groq  # noqa: E402
+from loadtest import persentil  # noqa: E402
+
+# (nama, path, mode analisis, ukuran batch)
+SKENARIO = [
+    ("hitung", "/v1/analisis", "tidak", 1),
+    ("sederhana", "/v1/analisis", "sederhana", 1),
+    ("llm", "/v1/analisis", "llm", 1),
+    ("batch100", "/v1/analisis/batch", "tidak", 100),
+]
+
+
+def buat_input(acak):
+    gaji = acak.randrange(3000000, 30000000, 50000)
+    return {"gaji": gaji, "insentif": acak.randrange(0, 2000000, 50000),
+            "pengeluaran": [int(gaji * acak.uniform(0.03, 0.35)) for _ in range(7)]}
+
+
+def buat_body(acak, mode, ukuran):
+    if ukuran == 1:
+        return json.dumps(dict(buat_input(acak), analisis=mode)).encode("utf-8")
+    return json.dumps({"analisis": mode, "items": [buat_input(acak) for _ in range(ukuran)]}).encode("utf-8")
+
+
+def tunggu_siap(port, batas=20.0):
+    akhir = time.monotonic() + batas
+    while time.monotonic() < akhir:
+        try:
+            koneksi = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            koneksi.request("GET", "/health")
+            if koneksi.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Server API tidak siap")
+
+
+def uji(port, path, mode, ukuran, konkurensi, jumlah):
+    """Kirim `jumlah` permintaan dengan `konkurensi` klien; kembalikan ringkasan"""
+    latensi = []
+    status = {}
+    kunci = threading.Lock()
+    sisa = iter(range(jumlah))
+
+    def klien(nomor):
+        acak = random.Random(nomor)
+        koneksi = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        catatan = []
+        while True:
+            with kunci:
+                if next(sisa, None) is None:
+                    break
+            body = buat_body(acak, mode, ukuran)
+            mulai = time.perf_counter()
+            koneksi.request("POST", path, body, {"Content-Type": "application/json"})
+            respons = koneksi.getresponse()
+            respons.read()
+            catatan.append((time.perf_counter() - mulai, respons.status))
+        koneksi.close()
+        with kunci:
+            for d, s in catatan:
+                latensi.append(d)
+                status[s] = status.get(s, 0) + 1
+
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=konkurensi) as pool:
+        list(pool.map(klien, range(konkurensi)))
+    durasi = time.perf_counter() - mulai
+    latensi.sort()
+    return {
+        "permintaan_per_s": round(jumlah / durasi, 1),
+        "item_per_s": round(jumlah * ukuran / durasi, 1),
+        "p50_ms": round(persentil(latensi, 50) * 1000, 1),
+        "p95_ms": round(persentil(latensi, 95) * 1000, 1),
+        "p99_ms": round(persentil(latensi, 99) * 1000, 1),
+        "status": status,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban API JSON HGarkasbul")
+    parser.add_argument("--concurrency", default="16,64", help="Daftar jumlah klien paralel (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=1000, help="Permintaan per skenario (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    mock_groq.tambah_argumen(parser)
+    args = parser.parse_args(argv)
+
+    _, url, _ = mock_groq.jalankan_server(konfigurasi=mock_groq.konfigurasi_dari_argumen(args))
+    env = dict(os.environ, PYTHONPATH=ROOT, GROQ_API_URL=url, GROQ_API_KEY="loadtest",
+               ARKASBUL_PRECOMPUTED="", ARKASBUL_RPM="0", ARKASBUL_TPM="0", ARKASBUL_CACHE_DISABLED="1")
+    server = subprocess.Popen([sys.executable, "-m", "arkasbul.api", "--port", str(args.port)], cwd=ROOT, env=env)
+    laporan = []
+    try:
+        tunggu_siap(args.port)
+        for nama, path, mode, ukuran in SKENARIO:
+            for n in (int(x) for x in args.concurrency.split(",") if x.strip()):
+                hasil = dict(skenario=nama, konkurensi=n, **uji(args.port, path, mode, ukuran, n, args.requests))
+                laporan.append(hasil)
+                if not args.json:
+                    print(f"{nama:<10} N={n:<4} {hasil['permintaan_per_s']:>9.1f} req/s {hasil['item_per_s']:>10.1f} item/s  "
+                          f"p50 {hasil['p50_ms']:>8.1f} ms  p95 {hasil['p95_ms']:>8.1f} ms  p99 {hasil['p99_ms']:>8.1f} ms  "
+                          f"status {json.dumps(hasil['status'])}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.json:
+        print(json.dumps(laporan, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+# Uji beban: N sesi bersamaan menjalankan alur gaji -> alokasi -> Analisa -> chat
+#
+# Contoh:
+#   python benchmarks/loadtest.py                          # N = 1,5,10,20 dengan server tiruan lokal
+#   python benchmarks/loadtest.py --sessions 50 --rate-429 0.05 --latency 1.0
+#   python benchmarks/loadtest.py --url http://127.0.0.1:8765/openai/v1/chat/completions
+#
+# Setiap sesi adalah AppTest terpisah (session state sendiri) yang berjalan di thread sendiri
+# dalam satu proses, sama seperti sesi pengguna pada satu instance server Streamlit. Cache
+# hasil fungsi dan pool koneksi dibagi antar sesi. Pemanggilan LLM diarahkan ke
+# benchmarks/mock_groq.py kecuali --url diberikan.
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_groq  # noqa: E402
+
+APP = os.path.join(ROOT, "HG_arkasbul.py")
+
+PERTANYAAN = [
+    "Bagaimana cara menambah dana darurat?",
+    "Apakah cicilan saya terlalu besar?",
+    "Berapa idealnya porsi investasi?",
+    "Bagaimana memanfaatkan insentif bulan ini?",
+]
+
+
+def rss_bytes():
+    """Resident set size proses saat ini (Linux), atau puncak RSS jika /proc tidak tersedia"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def persentil(nilai, p):
+    """Persentil nearest-rank dari daftar terurut"""
+    if not nilai:
+        return 0.0
+    return nilai[min(len(nilai) - 1, max(0, int(round(p / 100 * len(nilai) + 0.5)) - 1))]
+
+
+def siapkan_apptest_bersamaan():
+    """AppTest memasang lalu menghapus Runtime global dan opsi global.appTest di setiap run.
+
+    Jika beberapa AppTest berjalan bersamaan, satu sesi bisa menghapus runtime milik sesi
+    lain di tengah run. Runtime pertama dipakai bersama oleh semua sesi, seperti satu server
+    Streamlit, dan global.appTest dipasang permanen selama uji beban. Bytecode script juga
+    dikompilasi sekali dan dibagi (seperti ScriptCache server); kompilasi AST paralel di
+    beberapa thread tidak aman pada sebagian versi CPython.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1.util import patch_config_options
+
+    bytecode = {}
+    kunci_bytecode = threading.Lock()
+    get_bytecode_asli = ScriptCache.get_bytecode
+
+    def get_bytecode(self, script_path):
+        with kunci_bytecode:
+            if script_path not in bytecode:
+                bytecode[script_path] = get_bytecode_asli(self, script_path)
+            return bytecode[script_path]
+
+    ScriptCache.get_bytecode = get_bytecode
+
+    patch_config_options({"global.appTest": True}).__enter__()
+    bersama = []
+    instance_asli = Runtime.instance.__func__
+
+    def instance(cls):
+        if not bersama and cls._instance is not None:
+            bersama.append(cls._instance)
+        return bersama[0] if bersama else instance_asli(cls)
+
+    def exists(cls):
+        return bool(bersama) or cls._instance is not None
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+
+def jalankan_sesi(nomor, jumlah_chat, mulai_bersama, hasil_sesi, interval):
+    """Satu pengguna: buka halaman, isi gaji dan alokasi, Analisa, lalu bertanya di chat"""
+    from streamlit.testing.v1 import AppTest
+
+    acak = random.Random(nomor)
+    gaji = acak.randrange(3000000, 30000000, 50000)
+    langkah = []
+    error = 0
+
+    at = AppTest.from_file(APP, default_timeout=300)
+    mulai_bersama.wait()
+
+    def ukur(nama, fungsi, tugas=None):
+        """Catat (langkah, durasi sampai hasil tampil, waktu script thread terpakai)"""
+        nonlocal error
+        mulai = time.perf_counter()
+        fungsi()
+        script = time.perf_counter() - mulai
+        # Tugas LLM berjalan di pool pekerja; halaman dirender ulang berkala seperti pemantauan browser
+        while tugas is not None and at.session_state[tugas] is not None:
+            time.sleep(interval)
+            mulai_run = time.perf_counter()
+            at.run()
+            script += time.perf_counter() - mulai_run
+        langkah.append((nama, time.perf_counter() - mulai, script))
+        error += len(at.exception) + len(at.error)
+
+    ukur("buka", at.run)
+    at.text_input(key="gaji_input").input(f"{gaji:,}".replace(",", "."))
+    for i in range(7):
+        at.text_input(key=f"input_rp_{i}").input(str(int(gaji * acak.uniform(0.03, 0.35))))
+    ukur("analisa", lambda: at.button[0].click().run(), "tugas_analisa")
+    for q in acak.sample(PERTANYAAN, min(jumlah_chat, len(PERTANYAAN))):
+        ukur("chat", lambda: at.text_input(key="chat_input").input(q).run(), "tugas_chat")
+
+    # AppTest disimpan agar session state tetap hidup saat memori diukur
+    hasil_sesi[nomor] = {"langkah": langkah, "error": error, "app": at}
+
+
+def uji(jumlah_sesi, jumlah_chat, interval=0.5):
+    """Jalankan N sesi bersamaan dan kembalikan ringkasan latensi, throughput dan memori"""
+    gc.collect()
+    rss_awal = rss_bytes()
+    mulai_bersama = threading.Barrier(jumlah_sesi + 1)
+    hasil_sesi = {}
+    with ThreadPoolExecutor(max_workers=jumlah_sesi) as pool:
+        futures = [pool.submit(jalankan_sesi, i, jumlah_chat, mulai_bersama, hasil_sesi, interval) for i in range(jumlah_sesi)]
+        mulai_bersama.wait()
+        mulai = time.perf_counter()
+        for f in futures:
+            f.result()
+        durasi = time.perf_counter() - mulai
+    gc.collect()
+    rss_akhir = rss_bytes()
+
+    semua = sorted(d for s in hasil_sesi.values() for _, d, _ in s["langkah"])
+    per_langkah = {}
+    for s in hasil_sesi.values():
+        for nama, d, _ in s["langkah"]:
+            per_langkah.setdefault(nama, []).append(d)
+    # Rata-rata script thread yang sibuk selama uji (panggilan LLM tidak lagi menahan script thread)
+    script = sum(t for s in hasil_sesi.values() for _, _, t in s["langkah"])
+
+    def ringkas(nilai):
+        nilai = sorted(nilai)
+        return {f"p{p}_ms": round(persentil(nilai, p) * 1000, 1) for p in (50, 95, 99)}
+
+    hasil = {
+        "sesi": jumlah_sesi,
+        "durasi_s": round(durasi, 3),
+        "sesi_per_s": round(jumlah_sesi / durasi, 3),
+        "halaman_per_s": round(len(semua) / durasi, 3),
+        "latensi": ringkas(semua),
+        "latensi_per_langkah": {nama: ringkas(v) for nama, v in per_langkah.items()},
+        "script_thread_rata": round(script / durasi, 3),
+        "error": sum(s["error"] for s in hasil_sesi.values()),
+        "memori_per_sesi_kb": round(max(0, rss_akhir - rss_awal) / jumlah_sesi / 1024, 1),
+    }
+    hasil_sesi.clear()
+    return hasil
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban sesi bersamaan HGarkasbul")
+    parser.add_argument("--sessions", default="1,5,10,20", help="Daftar N sesi bersamaan (default: %(default)s)")
+    parser.add_argument("--chat", type=int, default=2, help="Jumlah pertanyaan chat per sesi (default: %(default)s)")
+    parser.add_argument("--url", default=None, help="Endpoint chat completions; default server tiruan lokal")
+    parser.add_argument("--cache", action="store_true", help="Aktifkan cache respons LLM (default: nonaktif)")
+    parser.add_argument("--poll", type=float, default=0.5,
+                        help="Interval rerun selama tugas LLM berjalan, seperti ARKASBUL_TASK_POLL (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    mock_groq.tambah_argumen(parser)
+    args = parser.parse_args(argv)
+
+    konfigurasi = None
+    url = args.url
+    if url is None:
+        _, url, konfigurasi = mock_groq.jalankan_server(konfigurasi=mock_groq.konfigurasi_dari_argumen(args))
+
+    # Harus di-set sebelum halaman dijalankan pertama kali
+    os.environ["GROQ_API_URL"] = url
+    os.environ.setdefault("GROQ_API_KEY", "loadtest")
+    os.environ.setdefault("ARKASBUL_PRECOMPUTED", "")
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    # Kuota RPM/TPM penjadwal dimatikan kecuali di-set, agar yang terukur adalah kapasitas instance
+    os.environ.setdefault("ARKASBUL_RPM", "0")
+    os.environ.setdefault("ARKASBUL_TPM", "0")
+    if not args.cache:
+        os.environ["ARKASBUL_CACHE_DISABLED"] = "1"
+
+    siapkan_apptest_bersamaan()
+
+    # Pemanasan: impor modul dan inisialisasi cache/pool tidak ikut terukur
+    uji(1, args.chat, args.poll)
+
+    laporan = []
+    for n in (int(x) for x in args.sessions.split(",") if x.strip()):
+        stats_awal = dict(konfigurasi.stats) if konfigurasi else {}
+        hasil = uji(n, args.chat, args.poll)
+        if konfigurasi:
+            hasil["mock"] = {k: v - stats_awal.get(k, 0) for k, v in konfigurasi.stats.items()}
+        laporan.append(hasil)
+        if not args.json:
+            lat = hasil["latensi"]
+            print(f"N={n:<4} {hasil['sesi_per_s']:>7.2f} sesi/s {hasil['halaman_per_s']:>7.2f} halaman/s  "
+                  f"p50 {lat['p50_ms']:>8.1f} ms  p95 {lat['p95_ms']:>8.1f} ms  p99 {lat['p99_ms']:>8.1f} ms  "
+                  f"memori/sesi {hasil['memori_per_sesi_kb']:>8.1f} KB  script thread {hasil['script_thread_rata']:>6.2f}  "
+                  f"error {hasil['error']}")
+            for nama, l in hasil["latensi_per_langkah"].items():
+                print(f"       {nama:<8} p50 {l['p50_ms']:>8.1f} ms  p95 {l['p95_ms']:>8.1f} ms  p99 {l['p99_ms']:>8.1f} ms")
+            if "mock" in hasil:
+                print(f"       mock     {json.dumps(hasil['mock'])}")
+
+    if args.json:
+        print(json.dumps(laporan, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
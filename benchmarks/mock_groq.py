@@ -0,0 +1,209 @@
+# Server tiruan API Groq (OpenAI-compatible) untuk uji beban lokal
+#
+# Contoh:
+#   python benchmarks/mock_groq.py --port 8765 --latency 0.5 --rate-429 0.05
+#   GROQ_API_URL=http://127.0.0.1:8765/openai/v1/chat/completions GROQ_API_KEY=x streamlit run HG_arkasbul.py
+#
+# Mendukung respons biasa dan streaming SSE (termasuk usage di x_groq), latensi token pertama
+# dan jeda antar token yang dapat diatur, serta error 5xx dan 429 (dengan Retry-After) secara acak.
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+KATA = (
+    "alokasi dana darurat sebaiknya disisihkan lebih dulu sebelum pengeluaran gaya hidup "
+    "pertimbangkan mengurangi cicilan konsumtif dan menambah porsi investasi secara bertahap"
+).split()
+
+
+class KonfigurasiMock:
+    """Perilaku server tiruan; dapat diubah saat server berjalan"""
+
+    def __init__(self, latency=0.3, jitter=0.2, token_delay=0.01, tokens=64,
+                 error_rate=0.0, rate_429=0.0, retry_after=1.0, seed=None, latency_model=None):
+        self.latency = latency          # detik sampai header/token pertama
+        self.jitter = jitter            # variasi relatif latensi (0.2 = +/-20%)
+        self.token_delay = token_delay  # jeda antar token saat streaming
+        self.tokens = tokens            # jumlah token per respons
+        self.error_rate = error_rate    # peluang respons 500
+        self.rate_429 = rate_429        # peluang respons 429
+        self.retry_after = retry_after  # nilai header Retry-After untuk 429
+        self.latency_model = dict(latency_model or {})  # latensi khusus per nama model (uji hedging)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"request": 0, "stream": 0, "status_429": 0, "status_500": 0}
+        self.per_model = {}
+
+    def undi(self, model=None):
+        """Tentukan nasib satu request: (status, latensi)"""
+        with self.lock:
+            u = self.random.random()
+            latensi = self.latency_model.get(model, self.latency) * (1 + self.jitter * (2 * self.random.random() - 1))
+        if u < self.rate_429:
+            return 429, latensi
+        if u < self.rate_429 + self.error_rate:
+            return 500, latensi
+        return 200, latensi
+
+    def catat(self, kunci):
+        with self.lock:
+            self.stats[kunci] += 1
+
+    def catat_model(self, model):
+        with self.lock:
+            self.per_model[model] = self.per_model.get(model, 0) + 1
+
+
+def _hitung_token_prompt(payload):
+    return sum(len(str(m.get("content", ""))) // 4 + 1 for m in payload.get("messages", []))
+
+
+class _HandlerMock(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    konfigurasi = None
+
+    def log_message(self, *args):
+        pass
+
+    def _kirim_json(self, status, data, header=()):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for nama, nilai in header:
+            self.send_header(nama, nilai)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _tulis_chunk(self, teks):
+        data = teks.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        konfigurasi = self.konfigurasi
+        panjang = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(panjang) or b"{}")
+        except ValueError:
+            self._kirim_json(400, {"error": {"message": "JSON tidak valid"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._kirim_json(404, {"error": {"message": "endpoint tidak dikenal"}})
+            return
+
+        konfigurasi.catat("request")
+        konfigurasi.catat_model(payload.get("model", "mock"))
+        status, latensi = konfigurasi.undi(payload.get("model"))
+        time.sleep(max(0.0, latensi))
+        if status == 429:
+            konfigurasi.catat("status_429")
+            self._kirim_json(429, {"error": {"message": "rate limit tiruan"}},
+                             [("Retry-After", f"{konfigurasi.retry_after:g}")])
+            return
+        if status == 500:
+            konfigurasi.catat("status_500")
+            self._kirim_json(500, {"error": {"message": "error tiruan"}})
+            return
+
+        jumlah = min(konfigurasi.tokens, int(payload.get("max_tokens") or konfigurasi.tokens))
+        token = [KATA[i % len(KATA)] + " " for i in range(jumlah)]
+        usage = {"prompt_tokens": _hitung_token_prompt(payload), "completion_tokens": jumlah}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        dasar = {"id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()),
+                 "model": payload.get("model", "mock")}
+
+        if not payload.get("stream"):
+            time.sleep(konfigurasi.token_delay * jumlah)
+            self._kirim_json(200, dict(dasar, choices=[{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "".join(token)}
+            }], usage=usage))
+            return
+
+        konfigurasi.catat("stream")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, t in enumerate(token):
+                if i:
+                    time.sleep(konfigurasi.token_delay)
+                potongan = dict(dasar, object="chat.completion.chunk",
+                                choices=[{"index": 0, "delta": {"content": t}, "finish_reason": None}])
+                self._tulis_chunk(f"data: {json.dumps(potongan)}\n\n")
+            akhir = dict(dasar, object="chat.completion.chunk",
+                         choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}], x_groq={"usage": usage})
+            self._tulis_chunk(f"data: {json.dumps(akhir)}\n\n")
+            self._tulis_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class _ServerMock(ThreadingHTTPServer):
+    # Backlog listen default (5) terlalu kecil untuk banyak sesi yang terhubung bersamaan
+    request_queue_size = 256
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Klien menutup koneksi keep-alive yang menganggur (mis. pool penuh) adalah hal normal
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def jalankan_server(host="127.0.0.1", port=0, konfigurasi=None):
+    """Jalankan server di thread latar; kembalikan (server, url endpoint, konfigurasi)"""
+    konfigurasi = konfigurasi or KonfigurasiMock()
+    handler = type("HandlerMock", (_HandlerMock,), {"konfigurasi": konfigurasi})
+    server = _ServerMock((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="mock-groq", daemon=True).start()
+    url = f"http://{host}:{server.server_address[1]}/openai/v1/chat/completions"
+    return server, url, konfigurasi
+
+
+def tambah_argumen(parser):
+    """Argumen perilaku server tiruan (dipakai juga oleh benchmarks/loadtest.py)"""
+    parser.add_argument("--latency", type=float, default=0.3, help="Latensi token pertama, detik (default: %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Variasi relatif latensi (default: %(default)s)")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Jeda antar token, detik (default: %(default)s)")
+    parser.add_argument("--tokens", type=int, default=64, help="Jumlah token per respons (default: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Peluang respons 500 (default: %(default)s)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Peluang respons 429 (default: %(default)s)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Header Retry-After untuk 429 (default: %(default)s)")
+    parser.add_argument("--latency-model", action="append", default=[], metavar="MODEL=DETIK",
+                        help="Latensi token pertama khusus untuk satu model, dapat diulang (uji hedging)")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def konfigurasi_dari_argumen(args):
+    return KonfigurasiMock(
+        latency=args.latency, jitter=args.jitter, token_delay=args.token_delay, tokens=args.tokens,
+        error_rate=args.error_rate, rate_429=args.rate_429, retry_after=args.retry_after, seed=args.seed,
+        latency_model={model: float(detik) for model, detik in (x.rsplit("=", 1) for x in args.latency_model)}
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server tiruan API Groq")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    tambah_argumen(parser)
+    args = parser.parse_args(argv)
+
+    server, url, _ = jalankan_server(args.host, args.port, konfigurasi_dari_argumen(args))
+    print(f"Mock Groq berjalan di {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+# Microbenchmark untuk helper format angka, penyusun prompt dan rerun halaman penuh
+#
+# Contoh:
+#   python benchmarks/run.py                     # bandingkan dengan baseline, gagal jika regresi
+#   python benchmarks/run.py --update-baseline   # simpan hasil sebagai baseline baru
+#   python benchmarks/run.py --filter prompt     # hanya benchmark yang namanya mengandung "prompt"
+#
+# Tidak membutuhkan jaringan maupun API key: pemanggilan LLM diganti stub.
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Cache dan berkas precomputed dimatikan agar setiap iterasi mengukur pekerjaan yang sama
+os.environ.setdefault("ARKASBUL_CACHE_DISABLED", "1")
+os.environ.setdefault("ARKASBUL_PRECOMPUTED", "")
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+from arkasbul import groq_client  # noqa: E402
+from arkasbul.engine import AnalysisResult  # noqa: E402
+from arkasbul.optimasi import saran_alokasi  # noqa: E402
+from arkasbul.teks import (  # noqa: E402
+    format_currency, parse_currency, format_indo_currency, susun_ringkasan_markdown,
+    susun_prompt_analisis, susun_prompt_chat, generate_simple_analysis
+)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+APP = os.path.join(ROOT, "HG_arkasbul.py")
+
+GAJI = 5000000
+INSENTIF = 750000
+PENGELUARAN = [750000, 1000000, 1750000, 375000, 375000, 750000, 375000]
+
+
+def _stub_stream(url, api_key, payload, timeout=None, max_retries=None, on_usage=None):
+    """Pengganti groq_client.stream_chat: respons instan tanpa jaringan"""
+    yield "Analisis "
+    yield "uji benchmark."
+    if on_usage is not None:
+        on_usage({"prompt_tokens": 200, "completion_tokens": 4, "total_tokens": 204})
+
+
+def _buat_apptest():
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.secrets["GROQ_API_KEY"] = "benchmark"
+    return at
+
+
+def _tunggu_analisis(at):
+    """Rerun (seperti pemantauan di browser) sampai tugas analisis di pool pekerja selesai"""
+    while at.session_state.tugas_analisa is not None:
+        time.sleep(0.001)
+        at.run()
+
+
+def bench_rerun_halaman():
+    """Rerun penuh halaman setelah analisis (jalur has_analyzed)"""
+    at = _buat_apptest()
+    at.run()
+    at.button[0].click().run()
+    _tunggu_analisis(at)
+    return at.run
+
+
+def bench_klik_analisa():
+    """Klik Analisa dengan respons LLM stub, sampai analisis tampil"""
+    at = _buat_apptest()
+    at.run()
+
+    def klik():
+        at.button[0].click().run()
+        _tunggu_analisis(at)
+    return klik
+
+
+def _data_rupiah(n=100000):
+    """Nominal acak dan teksnya (pemisah ribuan titik) untuk benchmark codec rupiah"""
+    import numpy as np
+    from arkasbul.rupiah import format_currency_vektor
+    nilai = np.random.default_rng(0).integers(0, 10**10, n).astype(np.float64)
+    return nilai, format_currency_vektor(nilai)
+
+
+def bench_rupiah_format_vektor():
+    """Format 100 ribu nominal sekaligus"""
+    from arkasbul.rupiah import format_indo_currency_vektor
+    nilai, _ = _data_rupiah()
+    return lambda: format_indo_currency_vektor(nilai)
+
+
+def bench_rupiah_format_skalar():
+    """Format 100 ribu nominal satu per satu (pembanding)"""
+    nilai, _ = _data_rupiah()
+    daftar = nilai.tolist()
+    return lambda: [format_indo_currency(x) for x in daftar]
+
+
+def bench_rupiah_parse_vektor():
+    """Parse 100 ribu teks rupiah sekaligus"""
+    import pandas as pd
+    from arkasbul.rupiah import parse_rupiah
+    _, teks = _data_rupiah()
+    kolom = pd.Series(teks)
+    return lambda: parse_rupiah(kolom)
+
+
+def bench_rupiah_parse_skalar():
+    """Parse 100 ribu teks rupiah satu per satu (pembanding)"""
+    _, teks = _data_rupiah()
+    daftar = teks.tolist()
+    return lambda: [parse_currency(x) for x in daftar]
+
+
+def bench_optimasi_vektor():
+    """Saran alokasi untuk 100 ribu rumah tangga sekaligus"""
+    import numpy as np
+    from arkasbul.optimasi import optimasi_alokasi
+    acak = np.random.default_rng(0)
+    gaji = acak.integers(3, 40, 100000) * 1e6
+    pengeluaran = np.floor(gaji[:, None] * acak.uniform(0.0, 0.45, (100000, 7)))
+    return lambda: optimasi_alokasi(gaji, 0, pengeluaran)
+
+
+def bench_simulasi_keranjang():
+    """Simulasi Keranjang Aman satu pengguna, 100 ribu jalur (tanpa cache)"""
+    from arkasbul.simulasi import JALUR, simulasi_batch
+    return lambda: simulasi_batch(GAJI, INSENTIF, PENGELUARAN, 3 * GAJI, jalur=JALUR)
+
+
+def bench_simulasi_batch():
+    """Simulasi Keranjang Aman 100 rumah tangga sekaligus (JALUR_BATCH jalur per rumah tangga)"""
+    import numpy as np
+    from arkasbul.simulasi import simulasi_batch
+    acak = np.random.default_rng(0)
+    gaji = acak.integers(3, 40, 100) * 1e6
+    pengeluaran = np.floor(gaji[:, None] * acak.uniform(0.03, 0.2, (100, 7)))
+    return lambda: simulasi_batch(gaji, 0, pengeluaran, 3 * gaji)
+
+
+def daftar_benchmark():
+    """Nama benchmark -> fungsi setup yang mengembalikan callable untuk diukur"""
+    hasil = AnalysisResult.hitung(GAJI, INSENTIF, PENGELUARAN)
+    items_melebihi, items_dibawah = hasil.di_luar_rentang()
+    return {
+        "format_currency": lambda: (lambda: format_currency(5375000)),
+        "parse_currency": lambda: (lambda: parse_currency("5.375.000")),
+        "format_indo_currency": lambda: (lambda: format_indo_currency(5375000)),
+        "prompt_analisis": lambda: (lambda: susun_prompt_analisis(hasil)),
+        "prompt_chat": lambda: (lambda: susun_prompt_chat(GAJI, INSENTIF, hasil, "Bagaimana cara menambah dana darurat?")),
+        "generate_simple_analysis": lambda: (lambda: generate_simple_analysis(
+            GAJI, INSENTIF, hasil.persen_insentif, items_melebihi, items_dibawah, hasil.total_pengeluaran
+        )),
+        "ringkasan_markdown": lambda: (lambda: susun_ringkasan_markdown(hasil.pengeluaran, hasil.persentase)),
+        "saran_alokasi": lambda: (lambda: saran_alokasi(hasil)),
+        "optimasi_vektor": bench_optimasi_vektor,
+        "simulasi_keranjang": bench_simulasi_keranjang,
+        "simulasi_batch": bench_simulasi_batch,
+        "rupiah_format_vektor": bench_rupiah_format_vektor,
+        "rupiah_format_skalar": bench_rupiah_format_skalar,
+        "rupiah_parse_vektor": bench_rupiah_parse_vektor,
+        "rupiah_parse_skalar": bench_rupiah_parse_skalar,
+        "rerun_halaman": bench_rerun_halaman,
+        "klik_analisa": bench_klik_analisa,
+    }
+
+
+def ukur(fungsi, repeat, min_waktu):
+    """Ukur waktu per panggilan (detik) untuk `repeat` sampel; jumlah loop dikalibrasi seperti timeit"""
+    loops = 1
+    while True:
+        mulai = time.perf_counter()
+        for _ in range(loops):
+            fungsi()
+        durasi = time.perf_counter() - mulai
+        if durasi >= min_waktu or loops >= 1 << 20:
+            break
+        loops *= 2 if durasi == 0 else max(2, min(10, int(min_waktu / durasi) + 1))
+
+    sampel = []
+    gc_aktif = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            mulai = time.perf_counter()
+            for _ in range(loops):
+                fungsi()
+            sampel.append((time.perf_counter() - mulai) / loops)
+    finally:
+        if gc_aktif:
+            gc.enable()
+    return sampel, loops
+
+
+def statistik(sampel, loops):
+    """Statistik ringkas dalam mikrodetik"""
+    urut = sorted(sampel)
+    us = [s * 1e6 for s in urut]
+    p95 = us[min(len(us) - 1, int(round(0.95 * (len(us) - 1))))]
+    return {
+        "min_us": round(us[0], 3),
+        "median_us": round(statistics.median(us), 3),
+        "mean_us": round(statistics.fmean(us), 3),
+        "stdev_us": round(statistics.stdev(us), 3) if len(us) > 1 else 0.0,
+        "p95_us": round(p95, 3),
+        "loops": loops,
+        "repeat": len(us),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark HGarkasbul")
+    parser.add_argument("--filter", default="", help="Hanya jalankan benchmark yang namanya mengandung teks ini")
+    parser.add_argument("--repeat", type=int, default=15, help="Jumlah sampel per benchmark (default: %(default)s)")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Durasi minimum satu sampel, detik (default: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("ARKASBUL_BENCH_THRESHOLD", "0.5")),
+                        help="Batas regresi waktu minimum relatif terhadap baseline (default: %(default)s)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Simpan hasil sebagai baseline")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("benchmark", {})
+
+    hasil = {}
+    regresi = []
+    with mock.patch.object(groq_client, "stream_chat", _stub_stream):
+        for nama, setup in daftar_benchmark().items():
+            if args.filter not in nama:
+                continue
+            sampel, loops = ukur(setup(), args.repeat, args.min_time)
+            hasil[nama] = statistik(sampel, loops)
+
+            acuan = baseline.get(nama)
+            keterangan = ""
+            if acuan:
+                # Minimum sampel dipakai sebagai pembanding karena paling tahan terhadap noise sistem
+                rasio = hasil[nama]["min_us"] / acuan["min_us"] - 1
+                keterangan = f"{rasio:+.1%} vs baseline"
+                if rasio > args.threshold:
+                    regresi.append(nama)
+                    keterangan += "  REGRESI"
+            if not args.json:
+                s = hasil[nama]
+                print(f"{nama:<26} median {s['median_us']:>12.2f} us  min {s['min_us']:>12.2f} us  "
+                      f"p95 {s['p95_us']:>12.2f} us  {keterangan}")
+
+    if args.json:
+        print(json.dumps(hasil, indent=2))
+
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            data = {}
+        data["meta"] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "prosesor": platform.machine(),
+        }
+        data.setdefault("benchmark", {}).update(hasil)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline disimpan ke {args.baseline}", file=sys.stderr)
+        return 0
+
+    if regresi:
+        print(f"Regresi melebihi {args.threshold:.0%}: {', '.join(regresi)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# Ukur waktu cold start: proses Python baru sampai render pertama halaman selesai
+#
+# Contoh:
+#   python benchmarks/startup.py                 # gagal jika median melebihi budget
+#   python benchmarks/startup.py --budget 2.0
+#
+# Setiap sampel dijalankan di proses terpisah (seperti worker/container baru). Script halaman
+# dieksekusi dalam mode bare Streamlit, tanpa server, tanpa secrets dan tanpa jaringan.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "HG_arkasbul.py")
+
+# Modul yang tidak boleh dimuat sebelum tombol Analisa ditekan
+MODUL_BERAT = ("numpy", "pandas", "pyarrow", "requests")
+
+_ANAK = """
+import json, runpy, sys, time
+mulai = time.perf_counter()
+import streamlit
+siap = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name="__main__")
+selesai = time.perf_counter()
+print(json.dumps({
+    "import_streamlit": siap - mulai,
+    "halaman": selesai - siap,
+    "modul_berat": [m for m in sys.argv[2].split(",") if m in sys.modules],
+}))
+"""
+
+
+def ukur_sekali():
+    """Jalankan satu proses baru, kembalikan dict durasi (detik) dan modul berat yang termuat"""
+    env = dict(os.environ, STREAMLIT_LOGGER_LEVEL="error", PYTHONPATH=ROOT)
+    env.pop("GROQ_API_KEY", None)
+    mulai = time.perf_counter()
+    hasil = subprocess.run(
+        [sys.executable, "-c", _ANAK, APP, ",".join(MODUL_BERAT)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    data = json.loads(hasil.stdout.strip().splitlines()[-1])
+    data["total"] = time.perf_counter() - mulai
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ukur cold start halaman HGarkasbul")
+    parser.add_argument("--repeat", type=int, default=5, help="Jumlah proses yang diukur (default: %(default)s)")
+    parser.add_argument("--budget", type=float, default=float(os.environ.get("ARKASBUL_STARTUP_BUDGET", "1.5")),
+                        help="Batas median waktu total per proses, detik (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args(argv)
+
+    sampel = [ukur_sekali() for _ in range(args.repeat)]
+    ringkasan = {
+        fase: {
+            "min_s": round(min(s[fase] for s in sampel), 4),
+            "median_s": round(statistics.median(s[fase] for s in sampel), 4),
+        }
+        for fase in ("import_streamlit", "halaman", "total")
+    }
+    modul_berat = sorted({m for s in sampel for m in s["modul_berat"]})
+
+    if args.json:
+        print(json.dumps({"fase": ringkasan, "modul_berat": modul_berat, "budget_s": args.budget}, indent=2))
+    else:
+        for fase, s in ringkasan.items():
+            print(f"{fase:<18} median {s['median_s']:>8.3f} s  min {s['min_s']:>8.3f} s")
+        print(f"modul berat termuat: {', '.join(modul_berat) or '-'}")
+
+    gagal = False
+    if ringkasan["total"]["median_s"] > args.budget:
+        print(f"Cold start {ringkasan['total']['median_s']:.3f} s melebihi budget {args.budget:.3f} s", file=sys.stderr)
+        gagal = True
+    if modul_berat:
+        print(f"Modul berat dimuat sebelum Analisa: {', '.join(modul_berat)}", file=sys.stderr)
+        gagal = True
+    return 1 if gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+# Modul arkasbul diimpor dari akar repo tanpa instalasi paket
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
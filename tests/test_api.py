@@ -0,0 +1,83 @@
+import pytest
+
+from arkasbul import api, metrik
+from arkasbul.groq_client import GroqError
+
+# TestClient starlette membutuhkan httpx
+TestClient = pytest.importorskip("starlette.testclient").TestClient
+
+INPUT = {"gaji": 10_000_000, "insentif": 500_000,
+         "pengeluaran": [1_500_000, 2_000_000, 3_500_000, 700_000, 500_000, 1_000_000, 500_000]}
+
+
+@pytest.fixture
+def klien(monkeypatch):
+    monkeypatch.setattr(api, "_profil", None)
+    monkeypatch.setattr(api, "_limiter", None)
+    with TestClient(api.buat_app()) as klien:
+        yield klien
+
+
+def test_analisis_tunggal_sederhana(klien):
+    respons = klien.post("/v1/analisis", json=dict(INPUT, analisis="sederhana"))
+    assert respons.status_code == 200
+    item = respons.json()
+    assert item["gaji"] == 10_000_000 and item["total_pengeluaran"] == 9_700_000
+    assert len(item["kategori"]) == 7 and item["sumber_analisis"] == "sederhana"
+    assert item["saran"]["kategori"][0]["item"] == item["kategori"][0]["item"]
+
+
+def test_analisis_batch_dengan_item_tidak_valid(klien):
+    respons = klien.post("/v1/analisis/batch", json={"analisis": "tidak", "items": [
+        INPUT, {"gaji": -1, "pengeluaran": [0] * 7}, dict(INPUT, saldo_keranjang=5_000_000)]})
+    assert respons.status_code == 200
+    data = respons.json()
+    assert data["jumlah"] == 3 and data["gagal"] == 1
+    assert "tidak boleh negatif" in data["items"][1]["error"]
+    assert "analisis" not in data["items"][0]
+    assert data["items"][2]["simulasi_keranjang"]["saldo_awal"] == 5_000_000
+
+
+@pytest.mark.parametrize("jalur, body", [
+    ("/v1/analisis", b"bukan json"),
+    ("/v1/analisis", b'{"gaji": 1000000, "pengeluaran": [1, 2]}'),
+    ("/v1/analisis", b'{"gaji": 1000000, "pengeluaran": [0, 0, 0, 0, 0, 0, 0], "analisis": "lain"}'),
+    ("/v1/analisis/batch", b'{"items": "bukan list"}'),
+])
+def test_validasi_422(klien, jalur, body):
+    respons = klien.post(jalur, content=body)
+    assert respons.status_code == 422
+    assert respons.json()["error"]
+
+
+def test_galat_llm_tidak_bocor_ke_klien(klien, monkeypatch):
+    def gagal(prompt):
+        raise GroqError("HTTP 500: {\"detail\": \"rahasia hulu\"}")
+
+    monkeypatch.setattr(api, "minta_analisis_llm", gagal)
+    item = klien.post("/v1/analisis", json=INPUT).json()
+    assert item["sumber_analisis"] == "sederhana" and item["analisis"]
+    assert item["error_analisis"] == api.ERROR_ANALISIS["api"]
+    assert "rahasia" not in str(item)
+
+
+def test_batas_konkurensi_503():
+    with TestClient(api.buat_app(maks_inflight=0)) as klien:
+        respons = klien.get("/health")
+    assert respons.status_code == 503
+    assert respons.headers["Retry-After"] == "1"
+
+
+def test_metrics(klien, monkeypatch):
+    monkeypatch.setattr(metrik, "AKTIF", False)
+    assert klien.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(metrik, "AKTIF", True)
+    monkeypatch.setattr(metrik, "MODE", "prometheus")
+    monkeypatch.setattr(metrik, "_counter", {})
+    monkeypatch.setattr(metrik, "_histogram", {})
+    klien.post("/v1/analisis", json=dict(INPUT, analisis="tidak"))
+    respons = klien.get("/metrics")
+    assert respons.status_code == 200
+    assert respons.headers["content-type"].startswith("text/plain")
+    assert 'arkasbul_api_request_seconds_count{endpoint="/v1/analisis"} 1' in respons.text
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from arkasbul import AKAR, cache, profil, sesi
+from arkasbul.cache import LLMCache
+
+
+@pytest.fixture
+def waktu(monkeypatch):
+    sekarang = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: sekarang[0])
+    return sekarang
+
+
+def test_hit_memori_lalu_disk(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    toko = LLMCache(path=path)
+    assert toko.get("k") is None
+    toko.set("k", "jawaban")
+    assert toko.get("k") == "jawaban"
+    # Proses baru: memori kosong, nilai dibaca dari disk lalu dari memori
+    baru = LLMCache(path=path)
+    assert baru.get("k") == "jawaban"
+    assert baru.get("k") == "jawaban"
+    assert (toko.stats["hit_memori"], toko.stats["miss"]) == (1, 1)
+    assert (baru.stats["hit_disk"], baru.stats["hit_memori"]) == (1, 1)
+    assert baru.hit_rate() == 1.0
+
+
+@pytest.mark.parametrize("path", [None, "disk"])
+def test_ttl_berlaku_di_memori_dan_disk(tmp_path, waktu, path):
+    toko = LLMCache(path=str(tmp_path / "cache.sqlite3") if path else None, ttl=60)
+    toko.set("k", "jawaban")
+    waktu[0] += 60
+    assert toko.get("k") == "jawaban"
+    waktu[0] += 1
+    assert toko.get("k") is None
+    assert "k" not in toko._memori
+
+
+def test_ttl_entri_disk_dihitung_dari_waktu_dibuat(tmp_path, waktu):
+    path = str(tmp_path / "cache.sqlite3")
+    LLMCache(path=path, ttl=60).set("k", "jawaban")
+    waktu[0] += 50
+    toko = LLMCache(path=path, ttl=60)
+    assert toko.get("k") == "jawaban"
+    # Dimuat ulang dari disk tidak memperpanjang umur entri di memori
+    waktu[0] += 11
+    assert toko.get("k") is None
+
+
+def test_lru_memori_membuang_entri_paling_lama(tmp_path):
+    toko = LLMCache(path=None, max_memori=2)
+    toko.set("a", "1")
+    toko.set("b", "2")
+    toko.get("a")
+    toko.set("c", "3")
+    assert list(toko._memori) == ["a", "c"]
+    assert toko.get("b") is None
+
+
+def test_eviction_disk_menjaga_batas_ukuran(tmp_path, waktu, monkeypatch):
+    monkeypatch.setattr(cache, "_EVICT_SETIAP", 1)
+    toko = LLMCache(path=str(tmp_path / "cache.sqlite3"), max_memori=1, max_bytes=25, ttl=100)
+    for i in range(4):
+        waktu[0] += 1
+        toko.set(f"k{i}", "x" * 10)
+    # Hanya dua entri terakhir (20 byte) yang muat; yang paling lama tidak diakses dibuang
+    kunci = [b[0] for b in toko._db().execute("SELECT kunci FROM llm_cache ORDER BY kunci")]
+    assert kunci == ["k2", "k3"]
+    assert toko.stats["evict"] == 2
+
+
+def test_cache_nonaktif(monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_NONAKTIF", True)
+    monkeypatch.setattr(cache, "_cache", None)
+    assert cache.get_cache() is None
+
+
+@pytest.mark.parametrize("modul, nama, env", [
+    (cache, "CACHE_DB", "ARKASBUL_CACHE_DB"),
+    (sesi, "SESI_DB", "ARKASBUL_SESSION_DB"),
+    (profil, "BERKAS_PROFIL", "ARKASBUL_PRECOMPUTED"),
+])
+def test_lokasi_default_di_folder_aplikasi(modul, nama, env):
+    assert os.path.isfile(os.path.join(AKAR, "HG_arkasbul.py"))
+    if env not in os.environ:
+        assert os.path.isabs(getattr(modul, nama)) and getattr(modul, nama).startswith(AKAR + os.sep)
@@ -0,0 +1,67 @@
+import pytest
+
+from arkasbul import chat
+
+
+def giliran(i, panjang=200):
+    return (f"Pertanyaan {i}? " + "q" * panjang, f"Jawaban {i}. " + "a" * panjang)
+
+
+def tambah_giliran(n, **kwargs):
+    """Simulasikan n giliran yang ditambahkan satu per satu seperti di halaman"""
+    riwayat, ringkasan, terangkum, dibuang = [], "", 0, 0
+    for i in range(n):
+        riwayat, ringkasan, terangkum, baru = chat.padatkan_riwayat(riwayat + [giliran(i)], ringkasan, terangkum, **kwargs)
+        dibuang += baru
+    return riwayat, ringkasan, terangkum, dibuang
+
+
+def token_jendela(riwayat, terangkum):
+    return sum(chat.estimasi_token(q) + chat.estimasi_token(a) for q, a in riwayat[terangkum:])
+
+
+def test_giliran_lama_dilipat_ke_ringkasan_dalam_anggaran():
+    riwayat, ringkasan, terangkum, dibuang = tambah_giliran(12, budget=400, budget_ringkasan=10_000)
+    assert dibuang == 0 and len(riwayat) == 12
+    assert 0 < terangkum < 12
+    assert token_jendela(riwayat, terangkum) <= 400
+    # Setiap giliran di luar jendela terwakili tepat satu baris ringkasan, berurutan
+    baris = ringkasan.splitlines()
+    assert len(baris) == terangkum
+    assert all(b.startswith(f"- Pengguna bertanya: Pertanyaan {i}?") for i, b in enumerate(baris))
+    assert "Inti jawaban: Jawaban 0." in baris[0]
+
+    pesan = chat.pesan_konteks(riwayat, ringkasan, terangkum)
+    assert pesan[0]["role"] == "system" and ringkasan in pesan[0]["content"]
+    assert [p["role"] for p in pesan[1:]] == ["user", "assistant"] * (12 - terangkum)
+    assert pesan[-1]["content"] == riwayat[-1][1]
+
+
+def test_giliran_terbaru_selalu_dikirim_walau_melebihi_anggaran():
+    riwayat, ringkasan, terangkum, _ = chat.padatkan_riwayat([giliran(0, panjang=5_000)], "", 0, budget=100)
+    assert terangkum == 0 and ringkasan == ""
+    assert chat.pesan_konteks(riwayat, ringkasan, terangkum)[0] == {"role": "user", "content": riwayat[0][0]}
+
+
+def test_ringkasan_dibatasi_anggaran_token():
+    _, ringkasan, terangkum, _ = tambah_giliran(30, budget=200, budget_ringkasan=150)
+    assert chat.estimasi_token(ringkasan) <= 150
+    # Baris tertua dibuang lebih dulu
+    assert ringkasan.splitlines()[-1].startswith(f"- Pengguna bertanya: Pertanyaan {terangkum - 1}?")
+
+
+def test_batas_keras_lima_puluh_giliran():
+    riwayat, ringkasan, terangkum, dibuang = tambah_giliran(55, budget=100_000, budget_ringkasan=100_000)
+    assert chat.CHAT_MAKS_GILIRAN == 50
+    assert len(riwayat) == 50 and dibuang == 5
+    assert riwayat[0] == giliran(5)
+    # Giliran yang dibuang dari transkrip tetap terwakili di ringkasan
+    assert len(ringkasan.splitlines()) == 5 and terangkum == 0
+    assert "Pertanyaan 4?" in ringkasan
+
+
+@pytest.mark.parametrize("jumlah, halaman, awal", [
+    (0, 1, 0), (3, 1, 0), (5, 1, 0), (12, 1, 7), (12, 2, 2), (12, 3, 0),
+])
+def test_awal_halaman(jumlah, halaman, awal):
+    assert chat.awal_halaman(jumlah, halaman, per_halaman=5) == awal
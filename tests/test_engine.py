@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from arkasbul.engine import AnalysisResult, hitung_alokasi
+from arkasbul.kategori import KATEGORI, RENTANG_MAX, RENTANG_MIN
+
+GAJI = 7_500_000
+INSENTIF = 750_000
+PENGELUARAN = [750_000, 1_000_000, 3_400_000, 375_000, 375_000, 750_000, 900_000]
+
+
+def hitung_halaman_lama(gaji, insentif, pengeluaran):
+    """Perhitungan asli di main() sebelum mesin alokasi (loop per item)"""
+    persen_insentif = (insentif / gaji) * 100 if gaji > 0 else 0
+    persentase_dari_gaji = [(p / gaji) * 100 if gaji > 0 else 0 for p in pengeluaran]
+    items_melebihi, items_dibawah = [], []
+    for min_val, max_val, persen, kat in zip(RENTANG_MIN, RENTANG_MAX, persentase_dari_gaji, KATEGORI):
+        if persen > max_val:
+            items_melebihi.append((kat, persen, max_val))
+        elif persen < min_val:
+            items_dibawah.append((kat, persen, min_val))
+    return persen_insentif, persentase_dari_gaji, items_melebihi, items_dibawah, sum(pengeluaran), sum(persentase_dari_gaji)
+
+
+@pytest.mark.parametrize("gaji, insentif, pengeluaran", [
+    (GAJI, INSENTIF, PENGELUARAN),
+    (3_833_333, 0, [383_333, 575_000, 1_150_000, 191_667, 191_667, 383_333, 191_667]),
+    (0, 100_000, PENGELUARAN),
+    (10_000_000, 0, [0] * 7),
+])
+def test_analysis_result_sama_dengan_perhitungan_halaman_lama(gaji, insentif, pengeluaran):
+    persen_insentif, persentase, melebihi, dibawah, total, total_persen = hitung_halaman_lama(gaji, insentif, pengeluaran)
+    hasil = AnalysisResult.hitung(gaji, insentif, pengeluaran)
+    assert hasil.persen_insentif == pytest.approx(persen_insentif)
+    assert hasil.persentase == pytest.approx(persentase)
+    assert hasil.di_luar_rentang() == (pytest.approx(melebihi), pytest.approx(dibawah))
+    assert hasil.total_pengeluaran == total
+    assert hasil.total_persen == pytest.approx(total_persen)
+    assert hasil.defisit == (total > gaji)
+
+
+def test_hitung_alokasi_vektor_sama_dengan_per_baris():
+    rng = np.random.default_rng(1)
+    gaji = rng.integers(1, 30, 50) * 1_000_000
+    insentif = rng.integers(0, 3, 50) * 500_000
+    pengeluaran = rng.integers(0, 5_000_000, (50, 7))
+    gaji[3] = 0
+    hasil = hitung_alokasi(gaji, insentif, pengeluaran)
+    assert hasil.persentase.shape == (50, 7)
+    for i in range(50):
+        persen_insentif, persentase, melebihi, dibawah, total, _ = hitung_halaman_lama(
+            int(gaji[i]), int(insentif[i]), pengeluaran[i].tolist())
+        np.testing.assert_allclose(hasil.persentase[i], persentase)
+        assert hasil.persen_insentif[i] == pytest.approx(persen_insentif)
+        assert [KATEGORI[j] for j in np.flatnonzero(hasil.items_melebihi[i])] == [m[0] for m in melebihi]
+        assert [KATEGORI[j] for j in np.flatnonzero(hasil.items_dibawah[i])] == [d[0] for d in dibawah]
+        assert hasil.total_pengeluaran[i] == total
+        assert hasil.defisit[i] == (total > gaji[i])
+
+
+def test_hitung_alokasi_menolak_jumlah_kolom_salah():
+    with pytest.raises(ValueError):
+        hitung_alokasi(GAJI, 0, [1, 2, 3])
+
+
+def test_analysis_result_tidak_dapat_diubah():
+    hasil = AnalysisResult.hitung(GAJI, INSENTIF, PENGELUARAN)
+    with pytest.raises(AttributeError):
+        hasil.gaji = 1
+    with pytest.raises(AttributeError):
+        del hasil.persentase
+    with pytest.raises(AttributeError):
+        hasil.atribut_baru = 1
+    assert hasil.gaji == GAJI
+
+
+def test_perbarui_sama_dengan_hitung_ulang():
+    hasil = AnalysisResult.hitung(GAJI, INSENTIF, PENGELUARAN)
+    assert hasil.perbarui(GAJI, INSENTIF, PENGELUARAN) is hasil
+
+    baru = list(PENGELUARAN)
+    baru[2] = 2_000_000
+    baru[6] = 100_000
+    for gaji, insentif, pengeluaran in [(GAJI, INSENTIF, baru), (GAJI, 0, PENGELUARAN), (9_000_000, INSENTIF, baru)]:
+        diperbarui = hasil.perbarui(gaji, insentif, pengeluaran)
+        penuh = AnalysisResult.hitung(gaji, insentif, pengeluaran)
+        assert diperbarui == penuh
+        assert diperbarui.__reduce__() == penuh.__reduce__()
+        assert diperbarui.total_persen == pytest.approx(penuh.total_persen)
@@ -0,0 +1,91 @@
+import io
+import json
+import threading
+
+import pytest
+import requests
+
+from arkasbul import groq_client
+
+
+def response_sse(token, status=200):
+    """requests.Response nyata dengan body SSE dari daftar token"""
+    baris = [f"data: {json.dumps({'choices': [{'delta': {'content': t}}]})}\n\n" for t in token]
+    response = requests.Response()
+    response.status_code = status
+    response.raw = io.BytesIO(("".join(baris) + "data: [DONE]\n\n").encode("utf-8"))
+    return response
+
+
+@pytest.fixture
+def satu_slot(monkeypatch):
+    slot = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(groq_client, "_slot", slot)
+    return slot
+
+
+def pasang_post(monkeypatch, buat_response):
+    monkeypatch.setattr(groq_client.get_session(), "post", lambda *a, **k: buat_response())
+
+
+def test_slot_dipegang_selama_body_stream_dibaca(monkeypatch, satu_slot):
+    pasang_post(monkeypatch, lambda: response_sse(["a", "b"]))
+    stream = groq_client.stream_chat("http://mock", "x", {"model": "m"}, max_retries=0)
+    assert next(stream) == "a"
+    assert not satu_slot.acquire(blocking=False)
+    assert list(stream) == ["b"]
+    assert satu_slot.acquire(blocking=False)
+
+
+def test_slot_dilepas_saat_stream_dibatalkan(monkeypatch, satu_slot):
+    pasang_post(monkeypatch, lambda: response_sse(["a", "b"]))
+    stream = groq_client.stream_chat("http://mock", "x", {"model": "m"}, max_retries=0)
+    next(stream)
+    stream.close()
+    assert satu_slot.acquire(blocking=False)
+
+
+def test_slot_dilepas_saat_status_gagal(monkeypatch, satu_slot):
+    pasang_post(monkeypatch, lambda: response_sse([], status=400))
+    with pytest.raises(groq_client.GroqError):
+        list(groq_client.stream_chat("http://mock", "x", {"model": "m"}, max_retries=0))
+    assert satu_slot.acquire(blocking=False)
+
+
+def test_slot_dilepas_sekali_walau_ditutup_berulang(monkeypatch, satu_slot):
+    pasang_post(monkeypatch, lambda: response_sse(["a"]))
+    response = groq_client.post_chat("http://mock", "x", {"model": "m"}, max_retries=0, stream=True)
+    response.close()
+    response.close()
+    assert satu_slot.acquire(blocking=False)
+    # BoundedSemaphore melempar ValueError jika dilepas lebih sering daripada diambil
+    satu_slot.release()
+
+
+def test_non_stream_langsung_melepas_slot(monkeypatch, satu_slot):
+    pasang_post(monkeypatch, lambda: response_sse(["a"]))
+    groq_client.post_chat("http://mock", "x", {"model": "m"}, max_retries=0)
+    assert satu_slot.acquire(blocking=False)
+
+
+def test_batal_menghentikan_penantian_slot_dan_retry(monkeypatch, satu_slot):
+    batal = threading.Event()
+    satu_slot.acquire()
+    threading.Timer(0.05, batal.set).start()
+    with pytest.raises(groq_client.GroqBatalError):
+        groq_client.post_chat("http://mock", "x", {"model": "m"}, batal=batal)
+    satu_slot.release()
+
+    # Jeda retry yang panjang (Retry-After) juga terpotong oleh pembatalan
+    def sibuk():
+        response = response_sse([], status=429)
+        response.headers["Retry-After"] = "30"
+        threading.Timer(0.05, batal.set).start()
+        return response
+
+    batal.clear()
+    pasang_post(monkeypatch, sibuk)
+    monkeypatch.setattr(groq_client, "BACKOFF_MAX", 30)
+    with pytest.raises(groq_client.GroqBatalError):
+        groq_client.post_chat("http://mock", "x", {"model": "m"}, max_retries=1, batal=batal)
+    assert satu_slot.acquire(blocking=False)
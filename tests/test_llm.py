@@ -0,0 +1,80 @@
+import pytest
+
+from arkasbul import api, groq_client, llm, penjadwal, rute
+from arkasbul.groq_client import GroqError
+
+
+class CachePalsu(dict):
+    def set(self, kunci, nilai):
+        self[kunci] = nilai
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = CachePalsu()
+    monkeypatch.setattr(llm, "get_cache", lambda: cache)
+    monkeypatch.setattr(penjadwal, "_penjadwal", penjadwal.Penjadwal(rpm=0, tpm=0))
+    return cache
+
+
+@pytest.fixture
+def api_palsu(monkeypatch):
+    """Ganti groq_client.stream_chat; catat payload dan mode setiap panggilan"""
+    panggilan = []
+
+    def stream_chat(url, api_key, payload, on_usage=None, mode="stream", **kwargs):
+        panggilan.append({"api_key": api_key, "model": payload["model"], "mode": mode,
+                          "max_tokens": payload["max_tokens"], "messages": payload["messages"]})
+        yield "jawaban "
+        yield payload["model"]
+        on_usage({"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12})
+
+    monkeypatch.setattr(groq_client, "stream_chat", stream_chat)
+    return panggilan
+
+
+def test_jawaban_disimpan_dan_dilayani_dari_cache(cache, api_palsu):
+    model = rute.tingkat_utama(rute.RUTE["chat"]).model
+    assert llm.jawab("halo", api_key="k") == "jawaban " + model
+    assert llm.jawab("  halo \n", api_key="k") == "jawaban " + model
+    assert len(api_palsu) == 1
+    assert api_palsu[0]["max_tokens"] == rute.RUTE["chat"].max_tokens
+    assert len(cache) == 1
+
+
+def test_riwayat_chat_ikut_menentukan_kunci_cache(cache, api_palsu):
+    riwayat = [{"role": "user", "content": "sebelumnya"}, {"role": "assistant", "content": "ya"}]
+    llm.jawab("halo", api_key="k")
+    llm.jawab("halo", api_key="k", history=riwayat)
+    assert len(api_palsu) == 2
+    assert api_palsu[1]["messages"][:2] == riwayat
+
+
+def test_halaman_dan_api_berbagi_jalur_dan_cache(cache, api_palsu, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "kunci-env")
+    teks = api.minta_analisis_llm("prompt analisis")
+    assert api_palsu[0]["api_key"] == "kunci-env" and api_palsu[0]["mode"] == "api"
+    assert api_palsu[0]["model"] == rute.tingkat_utama(rute.RUTE["analisa"]).model
+    # Halaman (stream) dengan prompt sama dilayani dari entri cache yang dibuat API
+    assert "".join(llm.stream_jawaban("prompt analisis", jenis="analisa", api_key="lain")) == teks
+    assert len(api_palsu) == 1
+
+
+def test_api_key_hanya_dibutuhkan_saat_memanggil_api(cache, api_palsu, monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    with pytest.raises(GroqError):
+        llm.jawab("tanpa kunci")
+    assert not api_palsu
+    llm.jawab("tersimpan", api_key="k")
+    assert llm.jawab("tersimpan") == "jawaban " + rute.tingkat_utama(rute.RUTE["chat"]).model
+
+
+@pytest.mark.parametrize("peran, disimpan", [("utama", True), ("cadangan", False)])
+def test_cache_hanya_menyimpan_jawaban_model_utama(cache, monkeypatch, peran, disimpan):
+    def lindungi_palsu(jalur, panggil, penjawab):
+        penjawab["tingkat"] = rute.tingkat_utama(jalur) if peran == "utama" else rute.TINGKAT[jalur.cadangan]
+        yield "jawaban"
+
+    monkeypatch.setattr(rute, "lindungi", lindungi_palsu)
+    assert api.minta_analisis_llm("prompt cache " + peran) == "jawaban"
+    assert bool(cache) == disimpan
@@ -0,0 +1,93 @@
+import os
+import urllib.request
+
+import pytest
+
+from arkasbul import metrik
+
+
+@pytest.fixture
+def aktif(monkeypatch):
+    """Instrumentasi prometheus dengan penyimpanan kosong"""
+    monkeypatch.setattr(metrik, "AKTIF", True)
+    monkeypatch.setattr(metrik, "MODE", "prometheus")
+    monkeypatch.setattr(metrik, "_counter", {})
+    monkeypatch.setattr(metrik, "_histogram", {})
+    monkeypatch.setattr(metrik, "_kolektor", [])
+
+
+def test_ekspor_prometheus(aktif):
+    metrik.tambah("fallback_total", jalur="chat", sebab="api")
+    metrik.tambah("fallback_total", 2, jalur="chat", sebab="api")
+    metrik.tambah("fallback_total", jalur="analisa", sebab="exception")
+    metrik.amati("llm_latency_seconds", 0.2, mode="stream")
+    metrik.amati("llm_latency_seconds", 99, mode="stream")
+    metrik.amati("llm_prompt_tokens", 100, mode="api")
+    metrik.daftarkan_kolektor(lambda: [("tugas_aktif", {"status": "jalan"}, 3)])
+
+    baris = metrik.ekspor_prometheus().splitlines()
+    assert "# TYPE arkasbul_fallback_total counter" in baris
+    assert 'arkasbul_fallback_total{jalur="chat",sebab="api"} 3' in baris
+    assert 'arkasbul_fallback_total{jalur="analisa",sebab="exception"} 1' in baris
+
+    assert "# TYPE arkasbul_llm_latency_seconds histogram" in baris
+    assert 'arkasbul_llm_latency_seconds_bucket{mode="stream",le="0.1"} 0' in baris
+    assert 'arkasbul_llm_latency_seconds_bucket{mode="stream",le="0.25"} 1' in baris
+    assert 'arkasbul_llm_latency_seconds_bucket{mode="stream",le="60"} 1' in baris
+    assert 'arkasbul_llm_latency_seconds_bucket{mode="stream",le="+Inf"} 2' in baris
+    assert 'arkasbul_llm_latency_seconds_sum{mode="stream"} 99.2' in baris
+    assert 'arkasbul_llm_latency_seconds_count{mode="stream"} 2' in baris
+    # Histogram token memakai bucket token, bukan bucket durasi
+    assert 'arkasbul_llm_prompt_tokens_bucket{mode="api",le="128"} 1' in baris
+
+    assert "# TYPE arkasbul_tugas_aktif gauge" in baris
+    assert 'arkasbul_tugas_aktif{status="jalan"} 3' in baris
+
+
+def test_stopwatch_mencatat_fase_dan_total(aktif):
+    stopwatch = metrik.stopwatch("rerun_seconds", jenis="penuh")
+    stopwatch.tandai("input")
+    stopwatch.selesai()
+    teks = metrik.ekspor_prometheus()
+    assert 'arkasbul_rerun_seconds_count{fase="input",jenis="penuh"} 1' in teks
+    assert 'arkasbul_rerun_seconds_count{fase="total",jenis="penuh"} 1' in teks
+
+
+def test_nonaktif_tidak_mencatat_apa_pun(monkeypatch):
+    monkeypatch.setattr(metrik, "AKTIF", False)
+    monkeypatch.setattr(metrik, "_counter", {})
+    monkeypatch.setattr(metrik, "_histogram", {})
+    monkeypatch.setattr(metrik, "_kolektor", [])
+    monkeypatch.setattr(metrik, "_server", None)
+    monkeypatch.setattr(metrik, "PORT", "0")
+
+    metrik.tambah("fallback_total", jalur="chat")
+    metrik.amati("llm_latency_seconds", 1.0)
+    metrik.daftarkan_kolektor(lambda: [("tugas_aktif", {}, 1)])
+    stopwatch = metrik.stopwatch("rerun_seconds")
+    assert stopwatch is metrik._STOPWATCH_NONAKTIF
+    stopwatch.tandai("x")
+    stopwatch.selesai()
+    metrik.mulai_server()
+
+    assert metrik._server is None
+    assert metrik.ekspor_prometheus() == "\n"
+
+
+def test_server_metrik_default_hanya_lokal(aktif, monkeypatch):
+    if "ARKASBUL_METRICS_HOST" not in os.environ:
+        assert metrik.HOST == "127.0.0.1"
+    monkeypatch.setattr(metrik, "HOST", "127.0.0.1")
+    monkeypatch.setattr(metrik, "PORT", "0")
+    monkeypatch.setattr(metrik, "_server", None)
+    metrik.tambah("api_ditolak_total")
+    metrik.mulai_server()
+    server = metrik._server
+    try:
+        host, port = server.server_address[:2]
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as respons:
+            assert "arkasbul_api_ditolak_total 1" in respons.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
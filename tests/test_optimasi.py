@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from arkasbul.kategori import JUMLAH_KATEGORI, RENTANG_MAX, RENTANG_MIN
+from arkasbul.optimasi import optimasi_alokasi
+
+TETAP = np.isin(np.arange(JUMLAH_KATEGORI), (1,))
+
+
+def input_halaman(gaji):
+    """Nilai default halaman: titik tengah rentang tiap kategori, rupiah penuh"""
+    return [int(gaji * ((lo + hi) / 2) / 100) for lo, hi in zip(RENTANG_MIN, RENTANG_MAX)]
+
+
+def input_acak(n, seed=0):
+    acak = np.random.default_rng(seed)
+    gaji = acak.integers(1_000_000, 50_000_000, n)
+    pengeluaran = (gaji[:, None] * acak.uniform(0.0, 0.3, (n, JUMLAH_KATEGORI))).astype(np.int64)
+    # Cicilan (tetap) dijaga cukup kecil agar semua baris layak
+    pengeluaran[:, 1] = (gaji * acak.uniform(0.0, 0.2, n)).astype(np.int64)
+    return gaji, pengeluaran
+
+
+def test_contoh_pembulatan_tidak_melewati_anggaran():
+    hasil = optimasi_alokasi(3_833_333, 0, input_halaman(3_833_333))
+    assert hasil.layak[0]
+    assert hasil.sisa[0] >= 0
+    assert hasil.saran[0].sum() <= hasil.anggaran[0]
+
+
+def test_input_bulat_layak_dan_total_dalam_anggaran():
+    gaji, pengeluaran = input_acak(3000)
+    hasil = optimasi_alokasi(gaji, 0, pengeluaran)
+    assert hasil.layak.all()
+    assert (hasil.saran.sum(axis=1) <= hasil.anggaran).all()
+    assert (hasil.saran == np.round(hasil.saran)).all()
+
+
+def test_saran_di_dalam_rentang_dan_kategori_tetap_tidak_berubah():
+    gaji, pengeluaran = input_acak(3000, seed=1)
+    hasil = optimasi_alokasi(gaji, 0, pengeluaran)
+    bebas = hasil.persentase[:, ~TETAP]
+    assert (bebas >= np.asarray(RENTANG_MIN)[~TETAP] - 1e-9).all()
+    assert (bebas <= np.asarray(RENTANG_MAX)[~TETAP] + 1e-9).all()
+    assert (hasil.saran[:, TETAP] == pengeluaran[:, TETAP]).all()
+
+
+def test_pengeluaran_dalam_rentang_tidak_diubah():
+    gaji = 10_000_000
+    # Batas bawah tiap rentang: totalnya 80% gaji sehingga anggaran tidak mengikat
+    pengeluaran = [int(gaji * lo / 100) for lo in RENTANG_MIN]
+    hasil = optimasi_alokasi(gaji, 0, pengeluaran)
+    assert hasil.layak[0]
+    assert (hasil.selisih == 0).all()
+
+
+def test_cicilan_terlalu_besar_tidak_layak():
+    gaji = 5_000_000
+    pengeluaran = input_halaman(gaji)
+    pengeluaran[1] = 4_500_000
+    hasil = optimasi_alokasi(gaji, 0, pengeluaran)
+    assert not hasil.layak[0]
+    assert hasil.saran[0, 1] == 4_500_000
+    assert (hasil.saran[0] >= 0).all()
+
+
+def test_bobot_harus_positif():
+    with pytest.raises(ValueError):
+        optimasi_alokasi(5_000_000, 0, input_halaman(5_000_000), bobot=(0.0,) * JUMLAH_KATEGORI)
@@ -0,0 +1,241 @@
+import threading
+import time
+
+import pytest
+
+from arkasbul import penjadwal
+from arkasbul.groq_client import GroqError
+
+TOKEN = ["a", "b", "c", "d"]
+
+
+def hulu_bertahap(lanjut, ditutup):
+    """Generator token yang menunggu izin per token; ditutup di-set saat generator ditutup"""
+    def buat(batal=None):
+        try:
+            for token in TOKEN:
+                assert lanjut.acquire(timeout=5)
+                yield token
+        finally:
+            ditutup.set()
+    return buat
+
+
+def test_pengikut_mendapat_keluaran_pemimpin():
+    lanjut, ditutup = threading.Semaphore(0), threading.Event()
+    panggilan = []
+
+    def buat(batal=None):
+        panggilan.append(1)
+        return hulu_bertahap(lanjut, ditutup)()
+
+    pemimpin = penjadwal.bersama("kunci-ikut", buat)
+    lanjut.release()
+    assert next(pemimpin) == "a"
+    # Pengikut bergabung di tengah stream dan tetap menerima teks lengkap dari awal
+    pengikut = penjadwal.bersama("kunci-ikut", buat)
+    for _ in TOKEN[1:]:
+        lanjut.release()
+    assert "a" + "".join(pemimpin) == "abcd"
+    assert "".join(pengikut) == "abcd"
+    assert len(panggilan) == 1
+
+
+def test_pemimpin_batal_pengikut_tetap_dapat_teks_lengkap():
+    lanjut, ditutup = threading.Semaphore(0), threading.Event()
+    pemimpin = penjadwal.bersama("kunci-batal", hulu_bertahap(lanjut, ditutup))
+    lanjut.release()
+    assert next(pemimpin) == "a"
+    pengikut = penjadwal.bersama("kunci-batal", hulu_bertahap(lanjut, ditutup))
+
+    pemimpin.close()
+    assert not ditutup.is_set()
+    for _ in TOKEN[1:]:
+        lanjut.release()
+    assert "".join(pengikut) == "abcd"
+    assert ditutup.wait(5)
+
+
+def test_pemimpin_batal_tanpa_pengikut_menutup_hulu():
+    lanjut, ditutup = threading.Semaphore(0), threading.Event()
+    pemimpin = penjadwal.bersama("kunci-sendiri", hulu_bertahap(lanjut, ditutup))
+    lanjut.release()
+    assert next(pemimpin) == "a"
+    pemimpin.close()
+    assert ditutup.is_set()
+    # Permintaan berikutnya memulai panggilan baru, bukan mengikuti yang dibatalkan
+    lanjut.release(len(TOKEN))
+    assert "".join(penjadwal.bersama("kunci-sendiri", hulu_bertahap(lanjut, threading.Event()))) == "abcd"
+
+
+def test_semua_pembaca_batal_menghentikan_hulu():
+    lanjut, ditutup = threading.Semaphore(0), threading.Event()
+    pemimpin = penjadwal.bersama("kunci-semua", hulu_bertahap(lanjut, ditutup))
+    lanjut.release()
+    next(pemimpin)
+    pengikut = penjadwal.bersama("kunci-semua", hulu_bertahap(lanjut, ditutup))
+    assert next(pengikut) == "a"
+    pemimpin.close()
+    pengikut.close()
+    # Pompa latar berhenti pada token berikutnya karena tidak ada pembaca tersisa
+    lanjut.release(len(TOKEN))
+    assert ditutup.wait(5)
+
+
+@pytest.mark.parametrize("lepas", ["close", "del", "habis"])
+def test_pengikut_dilepas_sekali(lepas):
+    lanjut, ditutup = threading.Semaphore(0), threading.Event()
+    pemimpin = penjadwal.bersama("kunci-lepas", hulu_bertahap(lanjut, ditutup))
+    lanjut.release()
+    next(pemimpin)
+    pengikut = penjadwal.bersama("kunci-lepas", hulu_bertahap(lanjut, ditutup))
+    penerbangan = penjadwal._penerbangan["kunci-lepas"]
+    assert penerbangan.pengikut == 1
+    if lepas == "close":
+        pengikut.close()
+        pengikut.close()
+    elif lepas == "del":
+        # Pengikut yang tidak pernah dibaca tidak boleh menahan panggilan API
+        del pengikut
+    else:
+        lanjut.release(len(TOKEN))
+        assert "a" + "".join(pemimpin) == "".join(pengikut) == "abcd"
+        pengikut.close()
+    assert penerbangan.pengikut == 0
+    pemimpin.close()
+    assert ditutup.wait(5)
+
+
+def test_error_pemimpin_diteruskan_ke_pengikut():
+    mulai = threading.Event()
+    lanjut = threading.Event()
+
+    def buat(batal=None):
+        yield "a"
+        mulai.set()
+        assert lanjut.wait(5)
+        raise GroqError("Error: 500, down")
+
+    pemimpin = penjadwal.bersama("kunci-error", buat)
+    assert next(pemimpin) == "a"
+    pengikut = penjadwal.bersama("kunci-error", buat)
+    assert next(pengikut) == "a"
+    lanjut.set()
+    with pytest.raises(GroqError):
+        next(pemimpin)
+    with pytest.raises(GroqError, match="500"):
+        next(pengikut)
+
+
+def test_token_bucket_terisi_ulang_merata():
+    ember = penjadwal.TokenBucket(60)
+    t0 = ember.terakhir
+    ember.ambil(60)
+    assert ember.waktu_tunggu(1, t0) == pytest.approx(1.0)
+    assert ember.waktu_tunggu(1, t0 + 0.5) == pytest.approx(0.5)
+    assert ember.waktu_tunggu(1, t0 + 1.0) == 0.0
+    # Isi tidak melebihi kapasitas; permintaan di atas kapasitas dibatasi ke kapasitas
+    assert ember.waktu_tunggu(1000, t0 + 600) == 0.0
+    assert ember.isi == 60
+    ember.sesuaikan(100)
+    assert ember.isi == 60
+
+
+def test_izin_selesai_mengoreksi_cadangan_tpm():
+    jadwal = penjadwal.Penjadwal(rpm=0, tpm=6000)
+    with jadwal.izin(penjadwal.PRIORITAS_CHAT, 1500) as izin:
+        assert jadwal._tpm.isi == pytest.approx(4500, abs=1)
+        izin.selesai(300)
+    assert jadwal._tpm.isi == pytest.approx(5700, abs=1)
+    # Tanpa usage, cadangan dianggap terpakai seluruhnya
+    with jadwal.izin(penjadwal.PRIORITAS_CHAT, 1000):
+        pass
+    assert jadwal._tpm.isi == pytest.approx(4700, abs=1)
+
+
+def izin_di_thread(jadwal, prioritas, urutan, galat):
+    def jalan():
+        try:
+            with jadwal.izin(prioritas, 10):
+                urutan.append(penjadwal.NAMA_PRIORITAS[prioritas])
+        except penjadwal.GroqShedError as e:
+            galat.append((penjadwal.NAMA_PRIORITAS[prioritas], e))
+    thread = threading.Thread(target=jalan)
+    thread.start()
+    return thread
+
+
+def test_analisa_dilayani_sebelum_chat_yang_antri_lebih_dulu():
+    jadwal = penjadwal.Penjadwal(rpm=120, tpm=0, batas_tunggu={})
+    jadwal._rpm.isi = 0
+    urutan, galat = [], []
+    chat = izin_di_thread(jadwal, penjadwal.PRIORITAS_CHAT, urutan, galat)
+    time.sleep(0.05)
+    analisa = izin_di_thread(jadwal, penjadwal.PRIORITAS_ANALISA, urutan, galat)
+    chat.join(5)
+    analisa.join(5)
+    assert urutan == ["analisa", "chat"]
+    assert not galat
+
+
+def test_ditolak_jika_perkiraan_tunggu_melebihi_batas():
+    jadwal = penjadwal.Penjadwal(rpm=60, tpm=0, batas_tunggu={penjadwal.PRIORITAS_CHAT: 0.5})
+    jadwal._rpm.isi = 0
+    mulai = time.monotonic()
+    with pytest.raises(penjadwal.GroqShedError):
+        jadwal.izin(penjadwal.PRIORITAS_CHAT, 10)
+    # Ditolak seketika tanpa menunggu, dan tidak meninggalkan entri di antrian
+    assert time.monotonic() - mulai < 0.2
+    assert jadwal.panjang_antrian() == 0
+
+
+def test_chat_ditolak_saat_tenggat_karena_didahului_analisa():
+    jadwal = penjadwal.Penjadwal(rpm=120, tpm=0, batas_tunggu={penjadwal.PRIORITAS_CHAT: 0.7})
+    jadwal._rpm.isi = 0
+    urutan, galat = [], []
+    chat = izin_di_thread(jadwal, penjadwal.PRIORITAS_CHAT, urutan, galat)
+    time.sleep(0.05)
+    analisa = [izin_di_thread(jadwal, penjadwal.PRIORITAS_ANALISA, urutan, galat) for _ in range(2)]
+    for thread in [chat] + analisa:
+        thread.join(5)
+    assert urutan == ["analisa", "analisa"]
+    assert [nama for nama, _ in galat] == ["chat"]
+    assert jadwal.panjang_antrian() == 0
+
+
+def test_izin_yang_menunggu_dilepas_saat_dibatalkan():
+    jadwal = penjadwal.Penjadwal(rpm=1, tpm=0, batas_tunggu={})
+    jadwal.izin(penjadwal.PRIORITAS_CHAT, 1)
+    batal = threading.Event()
+    threading.Timer(0.05, batal.set).start()
+    mulai = time.monotonic()
+    with pytest.raises(penjadwal.GroqBatalError):
+        jadwal.izin(penjadwal.PRIORITAS_CHAT, 1, batas_tunggu=None, batal=batal)
+    assert time.monotonic() - mulai < 2
+    assert jadwal.panjang_antrian() == 0
+
+
+def test_batal_hulu_hanya_berlaku_tanpa_pengikut():
+    lanjut, ditutup = threading.Semaphore(0), threading.Event()
+    batal_pemimpin, batal_pengikut = threading.Event(), threading.Event()
+    hulu = {}
+
+    def buat(batal_hulu):
+        hulu["batal"] = batal_hulu
+        return hulu_bertahap(lanjut, ditutup)()
+
+    pemimpin = penjadwal.bersama("kunci-batal-hulu", buat, batal=batal_pemimpin)
+    lanjut.release()
+    assert next(pemimpin) == "a"
+    pengikut = penjadwal.bersama("kunci-batal-hulu", buat, batal=batal_pengikut)
+    assert next(pengikut) == "a"
+
+    batal_pemimpin.set()
+    assert not hulu["batal"].is_set()
+    # Pengikut yang dibatalkan berhenti menunggu token berikutnya
+    batal_pengikut.set()
+    with pytest.raises(penjadwal.GroqBatalError):
+        next(pengikut)
+    assert hulu["batal"].is_set()
+    pemimpin.close()
+    assert ditutup.is_set()
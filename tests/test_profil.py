@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from arkasbul import precompute, profil
+from arkasbul.engine import AnalysisResult, hitung_alokasi
+from arkasbul.kategori import JUMLAH_KATEGORI, RENTANG_MAX, RENTANG_MIN
+
+# Pengeluaran di dalam rentang rujukan setiap kategori (persen gaji) dengan total di bawah gaji
+PERSEN_SESUAI = [lo + 1 for lo in RENTANG_MIN]
+
+
+def pengeluaran_persen(gaji, persen):
+    return [gaji * p / 100 for p in persen]
+
+
+@pytest.mark.parametrize("gaji, kelompok", [
+    (0, 0), (4_999_999, 0), (5_000_000, 1), (9_999_999, 1), (10_000_000, 2), (20_000_000, 3), (90_000_000, 3),
+])
+def test_kelompok_gaji_mengikuti_batas(gaji, kelompok):
+    hasil = AnalysisResult.hitung(gaji, 0, pengeluaran_persen(gaji, PERSEN_SESUAI))
+    status, kelompok_gaji, defisit = profil.uraikan_kelas(profil.kelas_profil(hasil)[0])
+    assert kelompok_gaji == kelompok
+    assert not defisit
+
+
+def test_status_per_kategori_dan_defisit_terurai_kembali():
+    persen = list(PERSEN_SESUAI)
+    persen[0] = RENTANG_MIN[0] / 2
+    persen[2] = RENTANG_MAX[2] + 40
+    hasil = AnalysisResult.hitung(8_000_000, 0, pengeluaran_persen(8_000_000, persen))
+    kelas = profil.kelas_profil(hasil)[0]
+    status, kelompok_gaji, defisit = profil.uraikan_kelas(kelas)
+    harapan = [profil.SESUAI] * JUMLAH_KATEGORI
+    harapan[0], harapan[2] = profil.DI_BAWAH, profil.MELEBIHI
+    assert status == harapan
+    assert kelompok_gaji == 1
+    assert defisit == bool(hasil.defisit)
+    assert kelas in set(profil.semua_kelas_layak())
+
+
+def test_kelas_vektor_sama_dengan_per_baris():
+    rng = np.random.default_rng(5)
+    gaji = rng.integers(1, 40, 200) * 1_000_000
+    pengeluaran = rng.integers(0, 8_000_000, (200, JUMLAH_KATEGORI))
+    kelas = profil.kelas_profil(hitung_alokasi(gaji, 0, pengeluaran))
+    assert kelas.shape == (200,)
+    assert (kelas >= 0).all() and (kelas < profil.JUMLAH_KELAS).all()
+    for i in range(0, 200, 17):
+        tunggal = AnalysisResult.hitung(int(gaji[i]), 0, pengeluaran[i].tolist())
+        assert profil.kelas_profil(tunggal)[0] == kelas[i]
+    assert set(kelas.tolist()) <= set(profil.semua_kelas_layak())
+
+
+def test_berkas_profil_pulang_pergi(tmp_path):
+    path = str(tmp_path / "profil" / "analisis.bin")
+    analisis = {7: "Analisis tujuh", 2: "Analisis dua — ünïcode", 4000: "x" * 10_000}
+    profil.simpan_berkas(path, analisis)
+    berkas = profil.muat_berkas(path)
+    assert len(berkas) == 3
+    assert berkas.kelas() == [2, 7, 4000]
+    for kelas, teks in analisis.items():
+        assert kelas in berkas
+        assert berkas.get(kelas) == teks
+    assert 3 not in berkas and berkas.get(3) is None and berkas.get(99_999, "cadangan") == "cadangan"
+
+
+def test_berkas_tidak_ada_atau_bukan_profil(tmp_path):
+    assert profil.muat_berkas(str(tmp_path / "tidak_ada.bin")) is None
+    lain = tmp_path / "lain.bin"
+    lain.write_bytes(b"BUKAN!" + bytes(16))
+    with pytest.raises(ValueError):
+        profil.muat_berkas(str(lain))
+
+
+def test_precompute_memakai_endpoint_groq_client(monkeypatch):
+    monkeypatch.setattr(precompute.groq_client, "GROQ_API_URL", "http://mock/v1/chat/completions")
+    monkeypatch.setenv("GROQ_API_KEY", "k")
+    dipanggil = {}
+    monkeypatch.setattr(precompute, "jalankan", lambda output, api_url, *a: dipanggil.setdefault("url", api_url) and 0)
+    assert precompute.main([]) == 0
+    assert dipanggil["url"] == "http://mock/v1/chat/completions"
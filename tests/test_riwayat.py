@@ -0,0 +1,111 @@
+import io
+import zipfile
+
+import numpy as np
+import pytest
+
+from arkasbul import riwayat
+from arkasbul.riwayat import KODE_GAJI, KODE_TIDAK_DIKENAL, agregasi_bulanan, petakan_kategori
+
+
+@pytest.mark.parametrize("teks", ["partner", "smart tv", "Airasia", "gasing", "sales", "dessert"])
+def test_kata_kunci_tidak_cocok_di_tengah_kata(teks):
+    assert petakan_kategori(teks) == KODE_TIDAK_DIKENAL
+
+
+@pytest.mark.parametrize("teks, kode", [
+    ("Bayar air PDAM", 2),
+    ("bayar ART", 2),
+    ("isi gas elpiji", 2),
+    ("les piano", 5),
+    ("Gaji Januari", KODE_GAJI),
+    ("reksa dana", 0),
+    ("ngopi di kafe", 6),
+    ("3", 2),
+    ("Zakat, infaq", 4),
+])
+def test_kata_kunci_utuh_dan_nama_kategori(teks, kode):
+    assert petakan_kategori(teks) == kode
+
+
+def agregasi(isi):
+    return agregasi_bulanan(io.BytesIO(isi.encode()), "uji.csv")
+
+
+def test_refund_mengurangi_pengeluaran():
+    kunci, total, statistik = agregasi(
+        "tanggal,keterangan,jumlah\n"
+        "2024-01-02,gaji,5.000.000\n"
+        "2024-01-05,kafe,300.000\n"
+        "2024-01-09,kafe,-100.000\n"
+        "2024-02-05,kafe,50.000\n"
+        "2024-02-07,kafe,-80.000\n"
+    )
+    assert riwayat.label_bulan(kunci) == ["2024-01", "2024-02"]
+    assert total[0, 6] == 200_000
+    # Refund melebihi pengeluaran bulan itu: tidak dihitung sebagai pengeluaran
+    assert total[1, 6] == 0
+    assert total[0, KODE_GAJI] == 5_000_000
+    assert statistik["terpetakan"] == 5
+
+
+def test_mutasi_bank_bertanda_negatif():
+    _, total, _ = agregasi(
+        "tanggal;keterangan;mutasi\n"
+        "2024-01-02;gaji;5000000\n"
+        "2024-01-05;listrik;-400000\n"
+        "2024-01-06;listrik;150000\n"
+    )
+    assert total[0, 2] == 250_000
+    assert total[0, KODE_GAJI] == 5_000_000
+
+
+def test_kolom_debit_dan_kredit_terpisah():
+    _, total, statistik = agregasi(
+        "tanggal,keterangan,debit,kredit\n"
+        "2024-01-02,gaji,,5.000.000\n"
+        "2024-01-05,cicilan,1.000.000,\n"
+        "2024-01-08,cicilan,,200.000\n"
+        "2024-01-09,cicilan,,\n"
+    )
+    assert total[0, 1] == 800_000
+    assert total[0, KODE_GAJI] == 5_000_000
+    assert statistik["tidak_valid"] == 1
+
+
+def test_penanda_arah_debit_kredit():
+    _, total, _ = agregasi(
+        "tanggal,keterangan,jumlah,D/K\n"
+        "2024-01-02,gaji,5.000.000,CR\n"
+        "2024-01-05,bioskop,120.000,DB\n"
+        "2024-01-06,bioskop,20.000,CR\n"
+    )
+    assert total[0, 6] == 100_000
+    assert total[0, KODE_GAJI] == 5_000_000
+
+
+def test_pengeluaran_tanpa_tanda_tetap_positif():
+    _, total, _ = agregasi(
+        "tanggal,kategori,jumlah\n"
+        "2024-03-01,1,1.000.000\n"
+        "2024-03-02,Cicilan,500.000\n"
+    )
+    np.testing.assert_array_equal(total[0, :2], [1_000_000, 500_000])
+
+
+def zip_bukan_workbook():
+    isi = io.BytesIO()
+    with zipfile.ZipFile(isi, "w") as z:
+        z.writestr("catatan.txt", "bukan workbook")
+    return isi.getvalue()
+
+
+@pytest.mark.parametrize("nama, isi", [
+    ("rusak.xlsx", b"bukan berkas zip"),
+    ("rusak.xlsx", zip_bukan_workbook()),
+    ("kosong.csv", b""),
+    ("rusak.csv", b'tanggal,keterangan,jumlah\n2024-01-02,kafe,1\n2024-01-03,"kafe,300.000\n'),
+])
+def test_berkas_rusak_menjadi_value_error(nama, isi):
+    with pytest.raises(ValueError, match="tidak dapat dibaca"):
+        agregasi_bulanan(io.BytesIO(isi), nama)
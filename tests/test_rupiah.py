@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from arkasbul.rupiah import (
+    GALAT_FORMAT, GALAT_KOSONG, GALAT_VALID, format_currency_vektor, format_indo_currency_vektor, parse_rupiah,
+)
+from arkasbul.teks import format_currency, format_indo_currency
+
+
+def nilai_uji():
+    rng = np.random.default_rng(16)
+    acak = np.concatenate([
+        rng.integers(-10**12, 10**12, 500).astype(np.float64),
+        rng.uniform(-1e7, 1e7, 500),
+        rng.integers(0, 1000, 200) + 0.5,
+    ])
+    khusus = [0.0, -0.0, -0.4, 0.5, 1.5, 2.5, -2.5, 999.5, 1e3, 999_999.999, 9.99e17, 1e18, -1e19, 1e300]
+    return np.concatenate([acak, khusus])
+
+
+def test_format_currency_vektor_identik_dengan_skalar():
+    nilai = np.append(nilai_uji(), [np.nan, np.inf, -np.inf])
+    harapan = [format_currency(v) if np.isfinite(v) else "" for v in nilai.tolist()]
+    assert format_currency_vektor(nilai).tolist() == harapan
+
+
+def test_format_indo_currency_vektor_identik_dengan_skalar():
+    nilai = np.append(nilai_uji(), [np.nan, np.inf, -np.inf])
+    assert format_indo_currency_vektor(nilai).tolist() == [format_indo_currency(v) for v in nilai.tolist()]
+
+
+def test_format_kolom_kecil_dan_series():
+    seri = pd.Series([1500000, -250, 0], index=[5, 6, 7], name="x")
+    hasil = format_indo_currency_vektor(seri)
+    assert hasil.index.tolist() == [5, 6, 7] and hasil.name == "x"
+    assert hasil.tolist() == ["Rp 1.500.000", "Rp -250", "Rp 0"]
+    assert format_currency_vektor([1234.9, -1234.9]).tolist() == ["1.234", "-1.234"]
+
+
+@pytest.mark.parametrize("teks, nilai", [
+    ("1.500.000", 1_500_000),
+    ("Rp 1.500.000", 1_500_000),
+    ("rp. 1.000", 1_000),
+    ("-Rp 250.000", -250_000),
+    ("Rp -250.000", -250_000),
+    ("1.234,56", 1234.56),
+    ("1,5", 1.5),
+])
+def test_parse_ketat_format_baku(teks, nilai):
+    hasil = parse_rupiah([teks], ketat=True)
+    assert hasil.galat[0] == GALAT_VALID
+    assert hasil.nilai[0] == pytest.approx(nilai)
+
+
+@pytest.mark.parametrize("teks", ["1,5 jt", "250rb", "1.5", "1,500,000", "--1.000", "-Rp-1.000", "1.000-", "1.23.4"])
+def test_parse_ketat_menolak_format_longgar(teks):
+    hasil = parse_rupiah([teks], ketat=True)
+    assert hasil.galat[0] == GALAT_FORMAT
+    assert np.isnan(hasil.nilai[0])
+
+
+def test_parse_longgar_satuan_dan_galat_per_baris():
+    hasil = parse_rupiah(["1,5 jt", "750rb", "2 M", "1,500,000", "", None, "abc"])
+    np.testing.assert_allclose(hasil.nilai[:4], [1_500_000, 750_000, 2e9, 1_500_000])
+    assert hasil.galat.tolist() == [GALAT_VALID] * 4 + [GALAT_KOSONG, GALAT_KOSONG, GALAT_FORMAT]
+
+
+def test_parse_kebalikan_format():
+    nilai = np.arange(-5000, 5000, 7, dtype=np.float64) * 123_457
+    hasil = parse_rupiah(format_indo_currency_vektor(nilai), ketat=True)
+    assert (hasil.galat == GALAT_VALID).all()
+    np.testing.assert_array_equal(hasil.nilai, nilai)
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from arkasbul import rute
+from arkasbul.groq_client import GroqError
+
+
+def buat_rute(cadangan="cepat", hedge_setelah=0.05):
+    return rute.Rute("uji", "besar", 1024, 384, cadangan, hedge_setelah)
+
+
+class Model:
+    """Generator palsu per peran; tunda menahan token pertama, ditutup di-set saat generator ditutup"""
+
+    def __init__(self, token, tunda=0.0, error=None):
+        self.token = token
+        self.tunda = tunda
+        self.error = error
+        self.dipanggil = 0
+        self.terkirim = 0
+        self.ditutup = threading.Event()
+
+    def __call__(self):
+        self.dipanggil += 1
+        try:
+            time.sleep(self.tunda)
+            if self.error is not None:
+                raise self.error
+            for token in self.token:
+                self.terkirim += 1
+                yield token
+                time.sleep(0.01)
+        finally:
+            self.ditutup.set()
+
+
+def jalankan(jalur, utama, cadangan, penjawab=None):
+    model = {"utama": utama, "cadangan": cadangan}
+    return "".join(rute.lindungi(jalur, lambda tingkat, peran: model[peran](), penjawab))
+
+
+def test_tanpa_hedging_hanya_model_utama():
+    utama, cadangan = Model(["a", "b"], tunda=0.1), Model(["x"])
+    penjawab = {}
+    assert jalankan(buat_rute(hedge_setelah=0), utama, cadangan, penjawab) == "ab"
+    assert cadangan.dipanggil == 0
+    assert penjawab["tingkat"] == rute.TINGKAT["besar"]
+
+
+def test_cadangan_menang_saat_utama_terlambat_dan_utama_dihentikan():
+    utama, cadangan = Model(["a"] * 50, tunda=0.3), Model(["x", "y"])
+    penjawab = {}
+    assert jalankan(buat_rute(), utama, cadangan, penjawab) == "xy"
+    assert penjawab["tingkat"] == rute.TINGKAT["cepat"]
+    # Model yang kalah berhenti pada token berikutnya dan generatornya ditutup
+    assert utama.ditutup.wait(2)
+    assert utama.terkirim < 50
+
+
+def test_utama_menang_dan_cadangan_dihentikan():
+    utama, cadangan = Model(["a", "b"], tunda=0.1), Model(["x"] * 50, tunda=0.5)
+    penjawab = {}
+    assert jalankan(buat_rute(), utama, cadangan, penjawab) == "ab"
+    assert cadangan.dipanggil == 1
+    assert penjawab["tingkat"] == rute.TINGKAT["besar"]
+    assert cadangan.ditutup.wait(2)
+    assert cadangan.terkirim <= 1
+
+
+def test_error_utama_memicu_cadangan_sebelum_batas_waktu():
+    utama, cadangan = Model(["a"], error=GroqError("Error: 500")), Model(["x"])
+    mulai = time.monotonic()
+    assert jalankan(buat_rute(hedge_setelah=5), utama, cadangan) == "x"
+    assert time.monotonic() - mulai < 2
+
+
+def test_kedua_model_gagal_melempar_error():
+    utama = Model(["a"], error=GroqError("Error: utama"))
+    cadangan = Model(["x"], error=GroqError("Error: cadangan"))
+    with pytest.raises(GroqError):
+        jalankan(buat_rute(hedge_setelah=5), utama, cadangan)
+
+
+def test_batas_token_mengikuti_panjang_pertanyaan():
+    jalur = buat_rute()
+    assert rute.batas_token(jalur) == 1024
+    assert rute.batas_token(jalur, "hai") == 384
+    assert rute.batas_token(jalur, "x" * 40) == 384 + 80
+    assert rute.batas_token(jalur, "x" * 4000) == 1024
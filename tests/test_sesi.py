@@ -0,0 +1,128 @@
+import json
+import sqlite3
+import zlib
+
+import pytest
+
+from arkasbul import sesi
+from arkasbul.engine import AnalysisResult
+from arkasbul.kategori import KATEGORI
+
+TOKEN = "tokenujisesi-0123456789"
+
+
+def buat_potret(gaji=5_000_000, pesan="Apa itu dana darurat?"):
+    pengeluaran = [500_000, 1_000_000, 1_500_000, 250_000, 100_000, 300_000, 400_000]
+    return sesi.potret({
+        "gaji": gaji,
+        "insentif": 0,
+        "user_inputs_rp": [f"{p:,}".replace(",", ".") for p in pengeluaran],
+        "has_analyzed": True,
+        "analysis_result": "Analisis tersimpan",
+        "chat_history": [(pesan, "Dana untuk keadaan mendesak.")],
+        "hasil_analisis": AnalysisResult.hitung(gaji, 0, pengeluaran),
+    })
+
+
+def test_simpan_flush_muat_kembali_di_toko_baru(tmp_path):
+    path = str(tmp_path / "sesi.sqlite3")
+    toko = sesi.TokoSesi(path=path, jeda=0)
+    data = buat_potret()
+    toko.simpan(TOKEN, data)
+    # Sebelum ditulis, potret dilayani dari antrian
+    assert toko.muat(TOKEN) is data
+    assert toko.flush() == 1
+    assert toko.flush() == 0
+
+    pulih = sesi.TokoSesi(path=path).muat(TOKEN)
+    assert pulih["gaji"] == data["gaji"]
+    assert pulih["chat_history"] == data["chat_history"]
+    assert pulih["analysis_result"] == "Analisis tersimpan"
+    assert pulih["hasil_analisis"].__reduce__() == data["hasil_analisis"].__reduce__()
+
+
+def test_sesi_kedaluwarsa_tidak_dipulihkan_dan_dihapus(tmp_path, monkeypatch):
+    path = str(tmp_path / "sesi.sqlite3")
+    toko = sesi.TokoSesi(path=path, ttl=60, jeda=0)
+    sekarang = [1_000_000.0]
+    monkeypatch.setattr(sesi.time, "time", lambda: sekarang[0])
+    toko.simpan(TOKEN, buat_potret())
+    toko.flush()
+    sekarang[0] += 59
+    assert toko.muat(TOKEN) is not None
+    sekarang[0] += 2
+    assert toko.muat(TOKEN) is None
+
+    # Entri kedaluwarsa dibuang saat flush ke-_EVICT_SETIAP
+    for i in range(sesi._EVICT_SETIAP - 1):
+        toko.simpan(f"tokenlain-{i:016d}", buat_potret())
+        toko.flush()
+    jumlah = toko._db().execute("SELECT COUNT(*) FROM sesi WHERE token = ?", (TOKEN,)).fetchone()[0]
+    assert jumlah == 0
+
+
+class DbGagal:
+    """Koneksi palsu yang gagal saat menulis; sebelum gagal, sesi lain menyimpan potret lebih baru"""
+
+    in_transaction = False
+
+    def __init__(self, sebelum_gagal):
+        self.sebelum_gagal = sebelum_gagal
+
+    def execute(self, sql, *args):
+        self.in_transaction = sql == "BEGIN"
+
+    def executemany(self, sql, baris):
+        self.sebelum_gagal()
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_flush_gagal_mengembalikan_potret_tanpa_menimpa_yang_lebih_baru(tmp_path):
+    toko = sesi.TokoSesi(path=str(tmp_path / "sesi.sqlite3"), jeda=0)
+    lama, baru, lain = buat_potret(gaji=1), buat_potret(gaji=2), buat_potret(gaji=3)
+    toko.simpan(TOKEN, lama)
+    toko.simpan("tokenlain-0000000000000000", lain)
+    toko._conn = DbGagal(lambda: toko.simpan(TOKEN, baru))
+    with pytest.raises(sqlite3.OperationalError):
+        toko.flush()
+    assert toko._antrian[TOKEN] is baru
+    assert toko._antrian["tokenlain-0000000000000000"] is lain
+
+    # Setelah database pulih, batch yang tertunda tertulis pada flush berikutnya
+    toko._conn = None
+    assert toko.flush() == 2
+    assert sesi.TokoSesi(path=toko.path).muat(TOKEN)["gaji"] == 2
+
+
+class TidakJson:
+    """Nilai yang tidak dapat dijadikan JSON"""
+
+
+def test_potret_rusak_tidak_menggagalkan_batch(tmp_path):
+    toko = sesi.TokoSesi(path=str(tmp_path / "sesi.sqlite3"), jeda=0)
+    rusak = dict(buat_potret(), analysis_result=TidakJson())
+    toko.simpan(TOKEN, rusak)
+    toko.simpan("tokenlain-0000000000000000", buat_potret(gaji=3))
+    assert toko.flush() == 1
+    # Potret rusak dibuang, tidak dikembalikan ke antrian untuk dicoba berulang kali
+    assert not toko._antrian
+    pulih = sesi.TokoSesi(path=toko.path)
+    assert pulih.muat(TOKEN) is None
+    assert pulih.muat("tokenlain-0000000000000000")["gaji"] == 3
+
+
+def test_kategori_tetap_ikut_dipulihkan_dan_potret_lama_tetap_terbaca(tmp_path):
+    toko = sesi.TokoSesi(path=str(tmp_path / "sesi.sqlite3"), jeda=0)
+    data = dict(buat_potret(), kategori_tetap=[KATEGORI[0], KATEGORI[1]])
+    toko.simpan(TOKEN, data)
+    toko.flush()
+    assert sesi.TokoSesi(path=toko.path).muat(TOKEN)["kategori_tetap"] == data["kategori_tetap"]
+    assert "previous_question" not in sesi.potret({"previous_question": "halo"})
+
+    # Potret yang ditulis sebelum kategori_tetap disimpan: kunci itu tidak menimpa nilai awal halaman
+    isi = json.loads(zlib.decompress(sesi._kodekan(data)))
+    del isi["kategori_tetap"]
+    state = {"kategori_tetap": [KATEGORI[1]]}
+    sesi.terapkan(state, sesi._dekodekan(zlib.compress(json.dumps(isi).encode())))
+    assert state["kategori_tetap"] == [KATEGORI[1]]
+    assert state["gaji"] == data["gaji"]
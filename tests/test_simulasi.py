@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from arkasbul import simulasi
+
+GAJI = 6_000_000
+PENGELUARAN = (600_000, 1_200_000, 2_100_000, 600_000, 150_000, 450_000, 600_000)
+
+
+@pytest.fixture(autouse=True)
+def cache_kosong():
+    simulasi._simulasi_tersimpan.cache_clear()
+    yield
+    simulasi._simulasi_tersimpan.cache_clear()
+
+
+def test_simulasi_keranjang_deterministik_untuk_seed_tetap():
+    pertama = simulasi.simulasi_keranjang(GAJI, 500_000, PENGELUARAN, 5_000_000, jalur=500)
+    simulasi._simulasi_tersimpan.cache_clear()
+    kedua = simulasi.simulasi_keranjang(GAJI, 500_000, PENGELUARAN, 5_000_000, jalur=500)
+    assert pertama == kedua
+    assert pertama is not kedua
+
+    batch = simulasi.simulasi_batch(GAJI, 500_000, PENGELUARAN, 5_000_000, jalur=500)
+    assert simulasi.baris_simulasi(batch, 0, 5_000_000) == pertama
+    lain = simulasi.simulasi_batch(GAJI, 500_000, PENGELUARAN, 5_000_000, jalur=500, seed=simulasi.SEED + 1)
+    assert not np.array_equal(lain.saldo_median, batch.saldo_median)
+
+
+def test_hasil_dicache_per_input():
+    pertama = simulasi.simulasi_keranjang(GAJI, 0, list(PENGELUARAN), 1_000_000.4, jalur=200)
+    assert simulasi.simulasi_keranjang(GAJI, 0, PENGELUARAN, 1_000_000, jalur=200) is pertama
+    assert simulasi._simulasi_tersimpan.cache_info().hits == 1
+
+
+def test_bentuk_dan_batas_hasil():
+    hasil = simulasi.simulasi_keranjang(GAJI, 0, PENGELUARAN, 2_000_000, jalur=500)
+    assert hasil.horizon == simulasi.HORIZON
+    assert hasil.jalur == 500 and hasil.saldo_awal == 2_000_000
+    peluang = np.array(hasil.peluang_habis)
+    assert ((peluang >= 0) & (peluang <= 1)).all()
+    # Dana yang sudah pernah habis tetap terhitung pada horizon yang lebih panjang
+    assert (np.diff(peluang) >= 0).all()
+    assert all(p10 <= median for p10, median in zip(hasil.saldo_p10, hasil.saldo_median))
+
+
+def test_pengeluaran_di_atas_gaji_menghabiskan_dana():
+    boros = simulasi.simulasi_keranjang(GAJI, 0, [0, 0, 2 * GAJI, 0, 0, 0, 0], 1_000_000, jalur=300)
+    hemat = simulasi.simulasi_keranjang(GAJI, 0, [0, 0, GAJI // 10, 0, 0, 0, 0], 50 * GAJI, jalur=300)
+    assert boros.peluang_habis == (1.0, 1.0, 1.0)
+    assert hemat.peluang_habis[0] == 0.0
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from arkasbul import penjadwal
+from arkasbul.tugas import BATAL, SELESAI, PoolTugas
+
+
+def tunggu_selesai(tugas, batas=5):
+    akhir = time.monotonic() + batas
+    while not tugas.selesai and time.monotonic() < akhir:
+        time.sleep(0.01)
+    return tugas.selesai
+
+
+def test_tugas_dibatalkan_tidak_menggagalkan_tugas_identik():
+    lanjut = threading.Semaphore(0)
+    panggilan = []
+
+    def hulu(batal=None):
+        panggilan.append(1)
+        for token in ("Analisis ", "lengkap."):
+            assert lanjut.acquire(timeout=5)
+            yield token
+
+    pool = PoolTugas(pekerja=2, maks_antrian=2)
+    a = pool.kirim("analisa", lambda batal: penjadwal.bersama("kunci-tugas", hulu, batal=batal))
+    lanjut.release()
+    while a.teks != "Analisis ":
+        time.sleep(0.01)
+    b = pool.kirim("analisa", lambda batal: penjadwal.bersama("kunci-tugas", hulu, batal=batal))
+    while b.teks != "Analisis ":
+        time.sleep(0.01)
+
+    a.batalkan()
+    lanjut.release()
+    assert tunggu_selesai(a) and tunggu_selesai(b)
+    assert a.status == BATAL
+    assert b.status == SELESAI and b.galat is None
+    assert b.teks == "Analisis lengkap."
+    assert len(panggilan) == 1
+
+
+def test_tugas_antri_dibatalkan_tidak_dijalankan():
+    tahan = threading.Event()
+    dijalankan = []
+
+    def lambat(batal):
+        assert tahan.wait(5)
+        yield "x"
+
+    def hulu(batal):
+        dijalankan.append(1)
+        yield "y"
+
+    pool = PoolTugas(pekerja=1, maks_antrian=1)
+    pertama = pool.kirim("chat", lambat)
+    kedua = pool.kirim("chat", hulu)
+    kedua.batalkan()
+    tahan.set()
+    assert tunggu_selesai(pertama) and kedua.status == BATAL
+    assert dijalankan == []
+
+
+def test_antrian_penuh_langsung_gagal():
+    tahan = threading.Event()
+
+    def lambat(batal):
+        assert tahan.wait(5)
+        yield "x"
+
+    pool = PoolTugas(pekerja=1, maks_antrian=0)
+    pertama = pool.kirim("chat", lambat)
+    kedua = pool.kirim("chat", lambat)
+    assert kedua.selesai and kedua.galat is not None
+    tahan.set()
+    assert tunggu_selesai(pertama) and pertama.teks == "x"
+
+
+def test_tugas_yang_menunggu_penjadwal_melepas_pekerja_saat_dibatalkan(monkeypatch):
+    from arkasbul import groq_client, llm
+
+    jadwal = penjadwal.Penjadwal(rpm=1, tpm=0, batas_tunggu={penjadwal.PRIORITAS_CHAT: None})
+    jadwal.izin(penjadwal.PRIORITAS_CHAT, 1)
+    monkeypatch.setattr(penjadwal, "_penjadwal", jadwal)
+    monkeypatch.setattr(llm, "get_cache", lambda: None)
+    monkeypatch.setattr(groq_client, "stream_chat", lambda *a, **k: iter(["tidak pernah"]))
+
+    pool = PoolTugas(pekerja=1, maks_antrian=0)
+    tugas = pool.kirim("chat", lambda batal: llm.stream_jawaban("tunggu kuota", api_key="k", batal=batal))
+    while jadwal.panjang_antrian() == 0:
+        time.sleep(0.01)
+    tugas.batalkan()
+    assert tunggu_selesai(tugas, batas=2)
+    assert tugas.status == BATAL and tugas.teks == ""
+    assert jadwal.panjang_antrian() == 0
+    # Slot pekerja kembali tersedia
+    assert tunggu_selesai(pool.kirim("chat", lambda batal: iter(["y"])))